@@ -0,0 +1,276 @@
+import hashlib
+import json
+import sqlite3
+import pandas as pd
+from frequencia_jogos import contar_jogos
+
+#banco com as contagens de jogos (lido também pela questão 4)
+BANCO_JOGOS = 'jogos.db'
+
+#esquema normalizado: cada título é gravado uma vez em games e as contagens apontam para o id;
+#as tabelas antigas (lidas pela questão 4) viram views calculadas a partir das contagens
+ESQUEMA = '''
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS game_counts (
+    game_id INTEGER PRIMARY KEY REFERENCES games(id),
+    users INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_game_counts_users ON game_counts(users);
+--id persistido da questão 2 (ids_usuarios), não a posição: inserir ou remover usuários não muda o dos outros
+CREATE TABLE IF NOT EXISTS usuarios_processados (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL,
+    jogos TEXT NOT NULL
+);
+CREATE VIEW IF NOT EXISTS jogos_totais AS
+    SELECT g.title AS jogo FROM game_counts c JOIN games g ON g.id = c.game_id;
+CREATE VIEW IF NOT EXISTS jogos_um_usuario AS
+    SELECT g.title AS jogo FROM game_counts c JOIN games g ON g.id = c.game_id WHERE c.users = 1;
+CREATE TABLE IF NOT EXISTS contagens_aproximadas (
+    game_id INTEGER PRIMARY KEY REFERENCES games(id),
+    users INTEGER NOT NULL
+);
+CREATE VIEW IF NOT EXISTS jogos_max_aparicoes AS
+    SELECT g.title AS jogo FROM game_counts c JOIN games g ON g.id = c.game_id
+    WHERE NOT EXISTS (SELECT 1 FROM contagens_aproximadas)
+      AND c.users = (SELECT MAX(users) FROM game_counts)
+    UNION ALL
+    SELECT g.title AS jogo FROM contagens_aproximadas a JOIN games g ON g.id = a.game_id
+    WHERE a.users = (SELECT MAX(users) FROM contagens_aproximadas);
+'''
+
+#tabelas das versões anteriores, substituídas pelas views
+TABELAS_ANTIGAS = ['jogos_totais', 'jogos_um_usuario', 'jogos_max_aparicoes']
+
+def conectar(nome_banco=BANCO_JOGOS):
+    """
+    Abre o banco em modo WAL e cria (ou migra) o esquema, se necessário.
+
+    Args:
+    - nome_banco (str): Caminho do banco SQLite.
+
+    Returns:
+    - sqlite3.Connection: Conexão aberta.
+    """
+    conexao = sqlite3.connect(nome_banco)
+    #WAL => leitores (questão 4) não bloqueiam a escrita; NORMAL é seguro com WAL e faz menos fsync
+    conexao.execute('PRAGMA journal_mode=WAL')
+    conexao.execute('PRAGMA synchronous=NORMAL')
+    with conexao:
+        _migrar(conexao)
+        conexao.executescript(ESQUEMA)
+    return conexao
+
+def _migrar(conexao):
+    """
+    Remove as tabelas de texto das versões anteriores e leva as contagens do modo incremental
+    antigo (contagem_jogos) para games/game_counts.
+    """
+    objetos = dict(conexao.execute("SELECT name, type FROM sqlite_master WHERE type IN ('table', 'view')"))
+    for tabela in TABELAS_ANTIGAS:
+        if objetos.get(tabela) == 'table':
+            conexao.execute(f'DROP TABLE {tabela}')
+
+    #view de máximos anterior à contagem aproximada: recriada pelo ESQUEMA
+    definicao = conexao.execute("SELECT sql FROM sqlite_master WHERE type = 'view' AND name = 'jogos_max_aparicoes'").fetchone()
+    if definicao and 'contagens_aproximadas' not in definicao[0]:
+        conexao.execute('DROP VIEW jogos_max_aparicoes')
+
+    if objetos.get('contagem_jogos') == 'table':
+        conexao.executescript(ESQUEMA)
+        conexao.execute('INSERT OR IGNORE INTO games (title) SELECT jogo FROM contagem_jogos')
+        conexao.execute('INSERT OR REPLACE INTO game_counts (game_id, users) '
+                        'SELECT g.id, c.usuarios FROM contagem_jogos c JOIN games g ON g.title = c.jogo')
+        conexao.execute('DROP TABLE contagem_jogos')
+
+def ids_jogos(conexao, titulos, tamanho_lote=500):
+    """
+    Id de cada título em games, inserindo os títulos que ainda não existem.
+
+    Args:
+    - conexao (sqlite3.Connection): Conexão aberta (dentro da transação de quem chama).
+    - titulos (list): Títulos.
+    - tamanho_lote (int): Títulos por consulta (limite de parâmetros do SQLite).
+
+    Returns:
+    - dict: Título -> id.
+    """
+    conexao.executemany('INSERT OR IGNORE INTO games (title) VALUES (?)', ((titulo,) for titulo in titulos))
+    ids = {}
+    for inicio in range(0, len(titulos), tamanho_lote):
+        lote = titulos[inicio:inicio + tamanho_lote]
+        marcadores = ', '.join('?' * len(lote))
+        ids.update((titulo, id_jogo) for id_jogo, titulo in
+                   conexao.execute(f'SELECT id, title FROM games WHERE title IN ({marcadores})', lote))
+    return ids
+
+def gravar_contagens(contagens, nome_banco=BANCO_JOGOS):
+    """
+    Substitui todas as contagens do banco numa só transação (modo completo da questão 3).
+
+    O controle do modo incremental é zerado: a próxima execução incremental recomeça do zero.
+    Estimativas do modo aproximado são descartadas (as contagens exatas passam a valer).
+
+    Args:
+    - contagens (pandas Series): Título -> número de usuários (saída de frequencia_jogos.contar_jogos).
+    - nome_banco (str): Caminho do banco SQLite.
+    """
+    conexao = conectar(nome_banco)
+    try:
+        with conexao:
+            ids = ids_jogos(conexao, list(contagens.index))
+            conexao.execute('DELETE FROM game_counts')
+            conexao.executemany('INSERT INTO game_counts (game_id, users) VALUES (?, ?)',
+                                ((ids[titulo], int(usuarios)) for titulo, usuarios in contagens.items()))
+            conexao.execute('DELETE FROM usuarios_processados')
+            conexao.execute('DELETE FROM contagens_aproximadas')
+    finally:
+        conexao.close()
+
+def gravar_contagens_aproximadas(contagens, nome_banco=BANCO_JOGOS):
+    """
+    Grava as estimativas do modo aproximado (só os jogos candidatos a mais frequentes) em
+    contagens_aproximadas, numa só transação.
+
+    As contagens exatas (game_counts) e o controle do modo incremental não são alterados: só a view
+    jogos_max_aparicoes passa a usar as estimativas, até a próxima gravação exata.
+
+    Args:
+    - contagens (pandas Series): Título -> número estimado de usuários.
+    - nome_banco (str): Caminho do banco SQLite.
+    """
+    conexao = conectar(nome_banco)
+    try:
+        with conexao:
+            ids = ids_jogos(conexao, list(contagens.index))
+            conexao.execute('DELETE FROM contagens_aproximadas')
+            conexao.executemany('INSERT INTO contagens_aproximadas (game_id, users) VALUES (?, ?)',
+                                ((ids[titulo], int(usuarios)) for titulo, usuarios in contagens.items()))
+    finally:
+        conexao.close()
+
+def jogos_distintos(jogos):
+    """
+    Jogos distintos de um usuário, em ordem alfabética ([] se o valor não for lista).
+    """
+    return sorted(set(jogos)) if isinstance(jogos, list) else []
+
+def hash_usuario(jogos):
+    """
+    Hash do conteúdo que importa para a contagem: os jogos distintos do usuário.
+    """
+    return hashlib.sha1(json.dumps(jogos, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def comparar_usuarios(processados, dataframe, remover_ausentes=True):
+    """
+    Compara os usuários atuais com os já processados, só pelo hash.
+
+    A chave é o id gravado pela questão 2, que vem das chaves naturais do usuário (ids_usuarios) e não
+    da posição dele nos arquivos: um usuário inserido ou removido não faz os seguintes parecerem alterados.
+
+    Args:
+    - processados (dict): id -> hash do que já está somado no banco.
+    - dataframe (pandas DataFrame): Usuários atuais com 'id' e 'jogos_preferidos'.
+    - remover_ausentes (bool): Se True, usuários processados que não estão no DataFrame
+      são tratados como removidos (o DataFrame é a base completa, não só as novidades).
+
+    Returns:
+    - tuple: (linhas a gravar [(id, hash, jogos)] dos usuários novos e alterados,
+      ids cujos jogos antigos devem ser subtraídos, ids removidos, resumo {'novos', 'alterados', 'removidos'}).
+    """
+    gravar = []
+    saindo = []
+    resumo = {'novos': 0, 'alterados': 0, 'removidos': 0}
+
+    if dataframe['id'].duplicated().any():
+        raise ValueError('ids de usuário repetidos: a marca do modo incremental precisa de um id por usuário')
+
+    ids_atuais = set()
+    for id_usuario, jogos in zip(dataframe['id'], dataframe['jogos_preferidos']):
+        id_usuario = int(id_usuario)
+        ids_atuais.add(id_usuario)
+        jogos = jogos_distintos(jogos)
+        codigo = hash_usuario(jogos)
+
+        anterior = processados.get(id_usuario)
+        if anterior == codigo:
+            continue
+        if anterior is None:
+            resumo['novos'] += 1
+        else:
+            resumo['alterados'] += 1
+            saindo.append(id_usuario)
+        gravar.append((id_usuario, codigo, jogos))
+
+    removidos = []
+    if remover_ausentes:
+        removidos = [id_usuario for id_usuario in processados if id_usuario not in ids_atuais]
+        saindo.extend(removidos)
+        resumo['removidos'] = len(removidos)
+
+    return gravar, saindo, removidos, resumo
+
+def _jogos_processados(conexao, ids, tamanho_lote=500):
+    """
+    Jogos já somados de cada id pedido, consultados em lotes (limite de parâmetros do SQLite).
+    """
+    jogos = []
+    for inicio in range(0, len(ids), tamanho_lote):
+        lote = ids[inicio:inicio + tamanho_lote]
+        marcadores = ', '.join('?' * len(lote))
+        consulta = f'SELECT jogos FROM usuarios_processados WHERE id IN ({marcadores})'
+        jogos.extend(json.loads(linha[0]) for linha in conexao.execute(consulta, lote))
+    return jogos
+
+def atualizar_contagens(dataframe, nome_banco=BANCO_JOGOS, remover_ausentes=True):
+    """
+    Aplica ao banco só a diferença entre os usuários atuais e os já processados.
+
+    Usuários novos somam 1 a cada jogo, usuários alterados trocam os jogos antigos pelos novos
+    e usuários removidos subtraem os seus; só os jogos desses usuários são lidos e somados.
+    Tudo numa só transação; as views jogos_totais, jogos_um_usuario e jogos_max_aparicoes já
+    refletem as novas contagens. Se nenhum usuário foi processado ainda (banco novo ou gravado
+    pelo modo completo), as contagens recomeçam do zero.
+
+    Args:
+    - dataframe (pandas DataFrame): Usuários com 'id' e 'jogos_preferidos'.
+    - nome_banco (str): Caminho do banco SQLite.
+    - remover_ausentes (bool): Veja comparar_usuarios.
+
+    Returns:
+    - dict: Resumo com o número de usuários novos, alterados e removidos e de jogos alterados.
+    """
+    conexao = conectar(nome_banco)
+    try:
+        processados = dict(conexao.execute('SELECT id, hash FROM usuarios_processados'))
+        gravar, saindo, removidos, resumo = comparar_usuarios(processados, dataframe, remover_ausentes)
+
+        #variação de cada jogo: jogos novos dos usuários menos os jogos que eles tinham antes
+        entrando = contar_jogos(pd.Series([jogos for _, _, jogos in gravar], dtype=object))
+        antigos = contar_jogos(pd.Series(_jogos_processados(conexao, saindo), dtype=object))
+        deltas = entrando.sub(antigos, fill_value=0).astype('int64')
+        deltas = deltas[deltas != 0]
+        resumo['jogos'] = len(deltas)
+
+        with conexao:
+            if not processados:
+                conexao.execute('DELETE FROM game_counts')
+            ids = ids_jogos(conexao, list(deltas.index))
+            conexao.executemany(
+                'INSERT INTO game_counts (game_id, users) VALUES (?, ?) '
+                'ON CONFLICT(game_id) DO UPDATE SET users = users + excluded.users',
+                ((ids[jogo], int(delta)) for jogo, delta in deltas.items())
+            )
+            conexao.execute('DELETE FROM game_counts WHERE users <= 0')
+            conexao.executemany(
+                'INSERT OR REPLACE INTO usuarios_processados (id, hash, jogos) VALUES (?, ?, ?)',
+                ((id_usuario, codigo, json.dumps(jogos, ensure_ascii=False)) for id_usuario, codigo, jogos in gravar)
+            )
+            conexao.executemany('DELETE FROM usuarios_processados WHERE id = ?', ((id_usuario,) for id_usuario in removidos))
+            conexao.execute('DELETE FROM contagens_aproximadas')
+        return resumo
+    finally:
+        conexao.close()
@@ -0,0 +1,179 @@
+"""
+Teste de carga do serviço de consultas (servico_consultas): vários clientes simultâneos fazendo
+requisições misturadas (páginas, filtros, preços) e, opcionalmente, um escritor gravando em jogos.db
+ao mesmo tempo, como o pipeline faria. Mostra requisições/s, acertos do cache e latência p50/p90/p99.
+
+Sem --url, o serviço é iniciado neste processo sobre cópias dos bancos numa pasta temporária
+(com --jogos, preenchidas com títulos e preços sintéticos), para não alterar os bancos do projeto.
+
+Uso:
+    python -m benchmarks.carga_servico --clientes 8 --segundos 10
+    python -m benchmarks.carga_servico --jogos 100000 --clientes 16 --escritas 0.5
+    python -m benchmarks.carga_servico --url http://127.0.0.1:8780 --clientes 4
+"""
+import argparse
+import http.client
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from urllib.parse import quote, urlsplit
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+import questao4
+from banco_jogos import BANCO_JOGOS, gravar_contagens
+from benchmarks import gerador
+from historico_precos import BANCO_PRECOS
+from servico_consultas import ServicoConsultas, servir
+
+def preparar_bancos(pasta, jogos=0, semente=42):
+    """
+    Copia os bancos do projeto para 'pasta' e, com jogos > 0, troca o conteúdo por 'jogos' títulos
+    sintéticos (contagens em jogos.db e um preço por título em mercado_livre.db).
+
+    Returns:
+    - tuple: (caminho de jogos.db, caminho de mercado_livre.db, títulos para as consultas).
+    """
+    banco_jogos, banco_precos = os.path.join(pasta, BANCO_JOGOS), os.path.join(pasta, BANCO_PRECOS)
+    for origem, destino in ((BANCO_JOGOS, banco_jogos), (BANCO_PRECOS, banco_precos)):
+        if os.path.exists(origem):
+            shutil.copyfile(origem, destino)
+
+    engine = create_engine(f'sqlite:///{banco_precos}')
+    questao4.migrar_tabela_jogos(engine)
+    questao4.Base.metadata.create_all(engine)
+    engine.dispose()
+
+    if jogos:
+        sorteio = np.random.default_rng(semente)
+        titulos = gerador.titulos_jogos(jogos)
+        gravar_contagens(pd.Series(sorteio.zipf(1.5, len(titulos)).clip(max=10_000), index=titulos), banco_jogos)
+        with sqlite3.connect(banco_precos) as conexao:
+            conexao.execute('DELETE FROM jogos')
+            conexao.executemany('INSERT INTO jogos (jogo, nome, preco, permalink) VALUES (?, ?, ?, ?)',
+                                [(titulo, f'{titulo} - Mídia Física', round(float(preco), 2), f'https://exemplo/{posicao}')
+                                 for posicao, (titulo, preco) in enumerate(zip(titulos, sorteio.uniform(20, 400, len(titulos))))])
+        conexao.close()
+
+    #leitura direta: conectar() migraria um jogos.db antigo (e apagaria os títulos da cópia)
+    conexao = sqlite3.connect(banco_jogos)
+    titulos = [linha[0] for linha in conexao.execute('SELECT jogo FROM jogos_totais')]
+    conexao.close()
+    return banco_jogos, banco_precos, titulos
+
+def urls_consulta(titulos, quantidade=200, semente=42):
+    """
+    Conjunto fixo de requisições (repetidas durante o teste, então o cache acerta parte delas).
+    """
+    sorteio = random.Random(semente)
+    palavras = sorted({palavra for titulo in titulos[:1000] for palavra in titulo.split() if len(palavra) > 3}) or ['a']
+    urls = []
+    for _ in range(quantidade):
+        tipo = sorteio.random()
+        if tipo < 0.3:
+            visao = sorteio.choice(['totais', 'totais', 'um_usuario', 'max_aparicoes'])
+            urls.append(f'/jogos/{visao}?limite=50&deslocamento={sorteio.randrange(0, max(len(titulos), 1), 50)}')
+        elif tipo < 0.5:
+            urls.append(f'/jogos/totais?contem={quote(sorteio.choice(palavras))}&limite=20')
+        elif tipo < 0.7 and titulos:
+            urls.append(f'/precos?jogo={quote(sorteio.choice(titulos))}')
+        elif tipo < 0.9:
+            minimo = sorteio.randrange(0, 300, 10)
+            urls.append(f'/precos?preco_min={minimo}&preco_max={minimo + 50}&limite=20&ordem={sorteio.choice(["preco", "-preco"])}')
+        else:
+            urls.append(f'/precos?contem={quote(sorteio.choice(palavras))}&limite=20')
+    return urls
+
+def cliente(endereco, urls, fim, resultados, semente):
+    """
+    Faz requisições (numa conexão keep-alive) até o instante 'fim', guardando (latência, status, cache).
+    """
+    sorteio = random.Random(semente)
+    conexao = http.client.HTTPConnection(endereco.hostname, endereco.port, timeout=30)
+    while time.perf_counter() < fim:
+        url = sorteio.choice(urls)
+        inicio = time.perf_counter()
+        try:
+            conexao.request('GET', url)
+            resposta = conexao.getresponse()
+            resposta.read()
+            resultados.append((time.perf_counter() - inicio, resposta.status, resposta.getheader('X-Cache') == 'acerto'))
+        except (OSError, http.client.HTTPException):
+            resultados.append((time.perf_counter() - inicio, 0, False))
+            conexao.close()
+            conexao = http.client.HTTPConnection(endereco.hostname, endereco.port, timeout=30)
+    conexao.close()
+
+def escritor(banco_jogos, intervalo, fim, contagem):
+    """
+    Simula o pipeline: a cada 'intervalo' segundos, uma transação em jogos.db (em WAL, como banco_jogos.conectar),
+    numa tabela só do teste: funciona com o banco em qualquer versão do esquema e invalida o cache igual.
+    """
+    conexao = sqlite3.connect(banco_jogos)
+    conexao.execute('PRAGMA journal_mode=WAL')
+    conexao.execute('CREATE TABLE IF NOT EXISTS carga_escritas (id INTEGER PRIMARY KEY, momento REAL)')
+    while time.perf_counter() < fim:
+        with conexao:
+            conexao.executemany('INSERT INTO carga_escritas (momento) VALUES (?)', [(time.time(),)] * 100)
+        contagem['escritas'] += 1
+        time.sleep(intervalo)
+    conexao.close()
+
+def resumir(resultados, segundos, escritas):
+    latencias = np.array([resultado[0] for resultado in resultados]) * 1000
+    status = {int(codigo): int(quantidade) for codigo, quantidade in
+              pd.Series([resultado[1] for resultado in resultados]).value_counts().sort_index().items()}
+    acertos = sum(resultado[2] for resultado in resultados)
+    print(f'>>CARGA<< : {len(resultados)} requisições em {segundos:.1f}s ({len(resultados) / segundos:.0f}/s), '
+          f'{escritas} escritas simultâneas, cache {acertos / max(len(resultados), 1):.0%}')
+    print(f'>>STATUS<< : {status}')
+    if len(latencias):
+        p50, p90, p99 = np.percentile(latencias, [50, 90, 99])
+        print(f'>>LATÊNCIA (ms)<< : p50 {p50:.2f}, p90 {p90:.2f}, p99 {p99:.2f}, máx {latencias.max():.2f}')
+
+def main(url=None, clientes=8, segundos=10.0, jogos=0, escritas=None, conexoes=4):
+    with tempfile.TemporaryDirectory() as pasta:
+        banco_jogos, banco_precos, titulos = preparar_bancos(pasta, jogos)
+        servidor = servico = None
+        if url is None:
+            servico = ServicoConsultas(banco_jogos, banco_precos, conexoes)
+            servidor = servir(servico, porta=0)
+            threading.Thread(target=servidor.serve_forever, daemon=True).start()
+            url = f'http://127.0.0.1:{servidor.server_address[1]}'
+        endereco = urlsplit(url)
+        urls = urls_consulta(titulos)
+
+        resultados, contagem = [], {'escritas': 0}
+        inicio = time.perf_counter()
+        fim = inicio + segundos
+        threads = [threading.Thread(target=cliente, args=(endereco, urls, fim, resultados, semente)) for semente in range(clientes)]
+        if escritas is not None and servico is not None:
+            threads.append(threading.Thread(target=escritor, args=(banco_jogos, escritas, fim, contagem)))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        resumir(resultados, time.perf_counter() - inicio, contagem['escritas'])
+
+        if servidor is not None:
+            servidor.shutdown()
+            servidor.server_close()
+            servico.fechar()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Teste de carga do serviço de consultas.')
+    parser.add_argument('--url', default=None, help='serviço já rodando (padrão: inicia um sobre cópias dos bancos)')
+    parser.add_argument('--clientes', type=int, default=8, help='clientes simultâneos')
+    parser.add_argument('--segundos', type=float, default=10.0)
+    parser.add_argument('--jogos', type=int, default=0, help='preenche as cópias dos bancos com N jogos sintéticos')
+    parser.add_argument('--escritas', type=float, default=None, metavar='INTERVALO',
+                        help='grava em jogos.db a cada INTERVALO segundos durante o teste')
+    parser.add_argument('--conexoes', type=int, default=4, help='conexões somente leitura por banco')
+    args = parser.parse_args()
+
+    main(url=args.url, clientes=args.clientes, segundos=args.segundos, jogos=args.jogos,
+         escritas=args.escritas, conexoes=args.conexoes)
@@ -0,0 +1,97 @@
+"""
+Benchmark da normalização de datas de nascimento do questao2.
+
+Compara o caminho antigo (apply de data_nova linha a linha + pd.to_datetime) com
+normalizar_datas (operações na coluna inteira) e confere que os resultados são iguais.
+
+A equivalência tem uma premissa: o pd.to_datetime do caminho antigo usa o formato da primeira
+data da coluna para todas, e ela é 'YYYY-MM-DD' nos arquivos de 'Usuarios/'. Nesse caso as datas
+'DD-MM-YYYY' viravam NaT, então a comparação usa normalizar_datas(aceitar_dia_mes_ano=False).
+
+Uso:
+    python -m benchmarks.datas --linhas 1000000
+"""
+import argparse
+import random
+import time
+import pandas as pd
+from questao2 import data_nova, normalizar_datas
+
+#primeira data da coluna no caminho antigo (premissa da comparação; ver o início do arquivo)
+PRIMEIRA_DATA = '2000-01-01'
+
+def gerar_datas(quantidade, semente=42):
+    """
+    Gera datas de nascimento nos formatos encontrados em 'Usuarios/'.
+
+    Args:
+    - quantidade (int): Número de datas.
+    - semente (int): Semente do gerador aleatório, para o resultado ser reproduzível.
+
+    Returns:
+    - pandas Series: Série de datas em texto.
+    """
+    aleatorio = random.Random(semente)
+    datas = []
+    for _ in range(quantidade):
+        ano, mes, dia = aleatorio.randint(1940, 2015), aleatorio.randint(1, 12), aleatorio.randint(1, 31)
+        sorteio = aleatorio.random()
+        if sorteio < 0.80:
+            datas.append(f'{ano:04d}-{mes:02d}-{dia:02d}')  #inclui datas inválidas como 2000-02-30
+        elif sorteio < 0.90:
+            datas.append(f'{ano % 100:02d}/{mes:02d}/{dia:02d}')
+        elif sorteio < 0.95:
+            datas.append(f'{dia:02d}-{mes:02d}-{ano:04d}')
+        else:
+            datas.append(f'{ano:04d}-{aleatorio.randint(13, 19)}-{dia:02d}')
+    return pd.Series(datas)
+
+def caminho_antigo(serie):
+    """
+    Normalização original do questao2.limpar_dados, com PRIMEIRA_DATA na frente da série:
+    o formato que o pd.to_datetime usa não depende da primeira data sorteada.
+    """
+    datas = pd.concat([pd.Series([PRIMEIRA_DATA]), serie.astype(str)], ignore_index=True).apply(data_nova)
+    datas = pd.to_datetime(datas, errors='coerce').iloc[1:].reset_index(drop=True)
+    return datas.dt.strftime('%Y/%m/%d')
+
+def caminho_vetorizado(serie):
+    """
+    Normalização atual do questao2.limpar_dados, sem 'DD-MM-YYYY' (descartadas no caminho antigo).
+    """
+    datas = normalizar_datas(serie.astype(str), aceitar_dia_mes_ano=False)
+    return datas.astype(str).str.replace('-', '/').where(datas.notna())
+
+def cronometrar(funcao, serie, repeticoes):
+    """
+    Retorna o resultado e o melhor tempo (em segundos) entre as repetições.
+    """
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(serie)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return resultado, melhor
+
+def main(linhas=1_000_000, repeticoes=3):
+    serie = gerar_datas(linhas)
+
+    antigo, tempo_antigo = cronometrar(caminho_antigo, serie, repeticoes)
+    novo, tempo_novo = cronometrar(caminho_vetorizado, serie, repeticoes)
+
+    iguais = antigo.fillna('NaT').equals(novo.fillna('NaT'))
+    print(f'>>LINHAS<< : {linhas}')
+    print(f'>>ANTIGO (apply data_nova)<< : {tempo_antigo:.3f}s ({linhas / tempo_antigo:,.0f} linhas/s)')
+    print(f'>>VETORIZADO (normalizar_datas)<< : {tempo_novo:.3f}s ({linhas / tempo_novo:,.0f} linhas/s)')
+    print(f'>>GANHO<< : {tempo_antigo / tempo_novo:.1f}x')
+    print(f'>>RESULTADOS IGUAIS<< : {iguais}')
+    if not iguais:
+        diferentes = antigo.fillna('NaT') != novo.fillna('NaT')
+        print(pd.DataFrame({'data': serie, 'antigo': antigo, 'novo': novo})[diferentes].head(10))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark da normalização de datas de nascimento.')
+    parser.add_argument('--linhas', type=int, default=1_000_000, help='número de datas geradas')
+    parser.add_argument('--repeticoes', type=int, default=3, help='repetições de cada caminho (vale o melhor tempo)')
+    args = parser.parse_args()
+    main(args.linhas, args.repeticoes)
@@ -0,0 +1,258 @@
+"""
+Gerador de dados sintéticos (e reproduzíveis, pela semente) para os benchmarks.
+
+Gera usuários no formato dos arquivos de 'Usuarios/' (com as mesmas datas e e-mails bagunçados)
+e páginas no formato das listas de jogos da Wikipédia lidas pela questão 1, de 10³ a 10⁷ linhas.
+Os arquivos são escritos em blocos, sem montar tudo na memória.
+
+Uso:
+    python -m benchmarks.gerador --usuarios 100000 --linhas-catalogo 100000 --pasta /tmp/sintetico
+    python -m benchmarks.gerador --usuarios 30000 --formatos csv json xlsx --pasta /tmp/sintetico
+"""
+import argparse
+import html
+import os
+import numpy as np
+import pandas as pd
+from benchmarks.datas import gerar_datas
+
+#linhas geradas por vez
+TAMANHO_BLOCO = 100_000
+
+#o Excel não aceita mais linhas que isso numa planilha (uma fica para o cabeçalho)
+LIMITE_EXCEL = 1_048_575
+
+NOMES = ['João', 'Maria', 'Pedro', 'Ana', 'Carlos', 'Fernanda', 'Lucas', 'Juliana', 'Rafael', 'Beatriz',
+         'Gabriel', 'Larissa', 'Mateus', 'Camila', 'Thiago', 'Patrícia', 'Bruno', 'Letícia', 'André', 'Sofia']
+SOBRENOMES = ['Silva', 'Oliveira', 'Souza', 'Costa', 'Lima', 'Pereira', 'Almeida', 'Ferreira', 'Rodrigues',
+              'Gomes', 'Martins', 'Araújo', 'Ribeiro', 'Carvalho', 'Barbosa', 'Rocha', 'Dias', 'Mendes']
+CIDADES = [('São Paulo', 'SP'), ('Rio de Janeiro', 'RJ'), ('Curitiba', 'PR'), ('Salvador', 'BA'),
+           ('Fortaleza', 'CE'), ('Belo Horizonte', 'MG'), ('Porto Alegre', 'RS'), ('Recife', 'PE'),
+           ('Manaus', 'AM'), ('Brasília', 'DF'), ('Goiânia', 'GO'), ('Belém', 'PA')]
+CONSOLES = ['PS5', 'PS4', 'Xbox Series X', 'Xbox One', 'Xbox 360', 'Switch']
+
+#peças dos títulos sintéticos ('Shadow Legends 3', 'Crimson Odyssey: Remastered')
+PREFIXOS = ['Shadow', 'Crimson', 'Eternal', 'Lost', 'Iron', 'Neon', 'Silent', 'Wild', 'Dark', 'Final',
+            'Super', 'Mega', 'Hyper', 'Ancient', 'Frozen', 'Golden', 'Hidden', 'Broken', 'Cosmic', 'Savage']
+NUCLEOS = ['Legends', 'Odyssey', 'Kingdom', 'Racer', 'Tactics', 'Quest', 'Arena', 'Frontier', 'Chronicles',
+           'Hunter', 'Warriors', 'Empire', 'Drift', 'Souls', 'Storm', 'Knights', 'Islands', 'Protocol']
+SUFIXOS = ['', ' 2', ' 3', ' 4', ' II', ' III', ': Remastered', ' Deluxe', ': Origins', ' HD']
+
+GENEROS = ['Ação', 'Aventura', 'Plataforma', 'Corrida', 'Desporto', 'RPG', 'Estratégia', 'Tiro', 'Horror', 'Luta']
+ESTUDIOS = ['Blue Box Studios', 'Joindots', 'Ustwo', 'Lince Works', 'Giant Squid', 'Acquire', 'Housemarque',
+            'Creative Assembly', 'Current Circus', 'Krillbite Studio', 'Sega', 'Nicalis', 'Annapurna']
+MESES = ['janeiro', 'fevereiro', 'março', 'abril', 'maio', 'junho', 'julho', 'agosto', 'setembro',
+         'outubro', 'novembro', 'dezembro']
+
+#consoles das páginas (as chaves de questao1.urls)
+PAGINAS = ['ps5', 'ps4', 'xbox_x_s', 'xbox360', 'nin_switch']
+
+def titulos_jogos(quantidade):
+    """
+    Lista determinística de títulos distintos ('Shadow Legends', 'Shadow Legends 2', ...).
+
+    Acima das combinações de PREFIXOS, NUCLEOS e SUFIXOS, os títulos ganham um número de edição.
+    """
+    titulos = []
+    rodada = 0
+    while len(titulos) < quantidade:
+        edicao = f' {rodada + 1990}' if rodada else ''
+        for prefixo in PREFIXOS:
+            for nucleo in NUCLEOS:
+                for sufixo in SUFIXOS:
+                    titulos.append(f'{prefixo} {nucleo}{sufixo}{edicao}')
+        rodada += 1
+    return titulos[:quantidade]
+
+def bloco_usuarios(quantidade, inicio, titulos, semente):
+    """
+    Gera um bloco de usuários como nos arquivos de 'Usuarios/'.
+
+    Os jogos preferidos seguem uma distribuição de Zipf sobre 'titulos' (poucos jogos muito citados
+    e uma cauda longa de jogos citados por um só usuário).
+
+    Args:
+    - quantidade (int): Usuários do bloco.
+    - inicio (int): Id do primeiro usuário do bloco.
+    - titulos (list): Títulos possíveis dos jogos preferidos.
+    - semente (int): Semente do bloco.
+
+    Returns:
+    - pandas DataFrame: Colunas de 'Usuarios/usuarios.csv'.
+    """
+    gerador = np.random.default_rng(semente)
+    nomes = gerador.integers(len(NOMES), size=quantidade)
+    sobrenomes = gerador.integers(len(SOBRENOMES), size=quantidade)
+    cidades = gerador.integers(len(CIDADES), size=quantidade)
+    tipos_email = gerador.random(quantidade)
+
+    #1 a 3 consoles e 1 a 6 jogos por usuário
+    quantos_consoles = gerador.integers(1, 4, size=quantidade)
+    consoles = gerador.integers(len(CONSOLES), size=(quantidade, 3))
+    quantos_jogos = gerador.integers(1, 7, size=quantidade)
+    jogos = (gerador.zipf(1.3, size=(quantidade, 6)) - 1) % len(titulos)
+
+    emails = []
+    for i in range(quantidade):
+        usuario = f'{NOMES[nomes[i]]}.{SOBRENOMES[sobrenomes[i]]}{inicio + i}'.lower()
+        #e-mails bagunçados como nos arquivos reais: sem domínio de topo, maiúsculas e espaços
+        if tipos_email[i] < 0.80:
+            emails.append(f'{usuario}@example.com')
+        elif tipos_email[i] < 0.90:
+            emails.append(f'{usuario}@example')
+        elif tipos_email[i] < 0.95:
+            emails.append(f'{usuario.upper()}@EXAMPLE.COM')
+        else:
+            emails.append(f' {usuario}@example.com ')
+
+    return pd.DataFrame({
+        'id': np.arange(inicio, inicio + quantidade),
+        'nome_completo': [f'{NOMES[n]} {SOBRENOMES[s]}' for n, s in zip(nomes, sobrenomes)],
+        'data_nascimento': gerar_datas(quantidade, semente).values,
+        'email': emails,
+        'cidade': [CIDADES[c][0] for c in cidades],
+        'estado': [CIDADES[c][1] for c in cidades],
+        'consoles': ['|'.join(dict.fromkeys(CONSOLES[c] for c in linha[:k])) for linha, k in zip(consoles, quantos_consoles)],
+        'jogos_preferidos': ['|'.join(dict.fromkeys(titulos[j] for j in linha[:k])) for linha, k in zip(jogos, quantos_jogos)]
+    })
+
+def escrever_usuarios(pasta, quantidade, semente=42, formatos=('csv',), tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Escreve 'quantidade' usuários em 'pasta', divididos entre os formatos pedidos
+    (usuarios.csv, usuarios.json, usuarios.xlsx), como a questão 2 espera encontrar.
+
+    O Excel recebe no máximo LIMITE_EXCEL linhas; o que passar disso vai para o primeiro dos outros formatos.
+
+    Returns:
+    - dict: Formato -> caminho do arquivo escrito.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    titulos = titulos_jogos(max(1_000, quantidade // 10))
+    partes = {formato: quantidade // len(formatos) for formato in formatos}
+    partes[formatos[0]] += quantidade - sum(partes.values())
+    if 'xlsx' in partes and partes['xlsx'] > LIMITE_EXCEL and len(formatos) > 1:
+        sobra = partes['xlsx'] - LIMITE_EXCEL
+        partes['xlsx'] = LIMITE_EXCEL
+        partes[next(formato for formato in formatos if formato != 'xlsx')] += sobra
+
+    caminhos = {}
+    inicio = 1
+    for formato, linhas in partes.items():
+        caminho = os.path.join(pasta, f'usuarios.{formato}')
+        blocos = (bloco_usuarios(min(tamanho_bloco, inicio + linhas - id_bloco), id_bloco, titulos, semente + id_bloco)
+                  for id_bloco in range(inicio, inicio + linhas, tamanho_bloco))
+        if formato == 'csv':
+            for numero, bloco in enumerate(blocos):
+                bloco.to_csv(caminho, mode='w' if numero == 0 else 'a', header=numero == 0, index=False)
+        elif formato == 'json':
+            #lista de registros, como 'Usuarios/usuarios.json', escrita bloco a bloco
+            with open(caminho, 'w', encoding='utf-8') as arquivo:
+                arquivo.write('[')
+                for numero, bloco in enumerate(blocos):
+                    registros = bloco.to_json(orient='records', force_ascii=False)[1:-1]
+                    arquivo.write((',' if numero and registros else '') + registros)
+                arquivo.write(']')
+        elif formato == 'xlsx':
+            pd.concat(blocos, ignore_index=True).to_excel(caminho, index=False, engine='openpyxl')
+        caminhos[formato] = caminho
+        inicio += linhas
+    return caminhos
+
+def _data_lancamento(sorteio, ano, mes, dia):
+    """
+    Data de lançamento num dos formatos das tabelas da Wikipédia.
+    """
+    if sorteio < 0.45:
+        return f'{dia} de {MESES[mes]} de {ano}'
+    if sorteio < 0.60:
+        return f'{MESES[mes]} de {ano}'
+    if sorteio < 0.75:
+        return str(ano)
+    if sorteio < 0.82:
+        return f'{ano} Q{mes // 3 + 1}'
+    if sorteio < 0.90:
+        return f'{dia:02d}/{MESES[mes][:3].capitalize()}/{ano}'
+    return 'Não lançado' if sorteio < 0.95 else 'TBA'
+
+def _cabecalho(console):
+    if console == 'ps4':
+        #ps4: uma linha de cabeçalho, datas por região e tabela achada pela classe
+        return ('<table class="wikitable sortable">\n<tr><th>Título</th><th>Desenvolvedor</th><th>Publicador</th>'
+                '<th>Exclusivo</th><th>Europa</th><th>Japão</th><th>América Do Norte</th><th>Brasil</th>'
+                '<th>Referências</th></tr>\n')
+    return ('<table id="softwarelist" class="wikitable sortable">\n<tr><th rowspan="2">Título</th>'
+            '<th rowspan="2">Género(s)</th><th rowspan="2">Desenvolvedor(es)</th><th rowspan="2">Publicadora(s)</th>'
+            '<th colspan="3">Data de Lançamento[a]</th><th rowspan="2">Ref.</th></tr>\n'
+            '<tr><th>JP</th><th>AN</th><th>PAL</th></tr>\n')
+
+def linhas_pagina(console, quantidade, inicio, titulos, semente):
+    """
+    Linhas <tr> da tabela de jogos de um console, no formato da página da Wikipédia.
+    """
+    gerador = np.random.default_rng(semente)
+    generos = gerador.integers(len(GENEROS), size=quantidade)
+    estudios = gerador.integers(len(ESTUDIOS), size=(quantidade, 2))
+    anos = gerador.integers(2005, 2025, size=(quantidade, 4))
+    meses = gerador.integers(12, size=(quantidade, 4))
+    dias = gerador.integers(1, 29, size=(quantidade, 4))
+    sorteios = gerador.random((quantidade, 4))
+
+    linhas = []
+    for i in range(quantidade):
+        titulo = html.escape(titulos[(inicio + i) % len(titulos)])
+        datas = [_data_lancamento(sorteios[i, j], anos[i, j], meses[i, j], dias[i, j]) for j in range(4)]
+        #chave de ordenação escondida, como nas tabelas reais
+        chave = f'<span style="display:none">{inicio + i:08d}</span>'
+        desenvolvedor, publicadora = ESTUDIOS[estudios[i, 0]], ESTUDIOS[estudios[i, 1]]
+        if console == 'ps4':
+            celulas = [titulo, desenvolvedor, publicadora, 'Não', *datas, f'[{i}]']
+        else:
+            celulas = [titulo, GENEROS[generos[i]], desenvolvedor, publicadora, *datas[:3], f'[{i}]']
+        linhas.append(f'<tr><td>{chave}{celulas[0]}</td>' + ''.join(f'<td>{celula}</td>' for celula in celulas[1:]) + '</tr>\n')
+    return ''.join(linhas)
+
+def escrever_paginas(pasta, quantidade, semente=42, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Escreve uma página '<console>.html' por console de PAGINAS, com 'quantidade' linhas no total.
+
+    Returns:
+    - dict: Console -> caminho da página.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    titulos = titulos_jogos(max(1_000, quantidade))
+    caminhos = {}
+    inicio = 0
+    for numero, console in enumerate(PAGINAS):
+        linhas = quantidade // len(PAGINAS) + (1 if numero < quantidade % len(PAGINAS) else 0)
+        caminho = os.path.join(pasta, f'{console}.html')
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            #uma tabela antes da lista de jogos, que o extrator tem de pular
+            arquivo.write(f'<html><head><title>Lista de jogos para {console}</title></head><body>\n'
+                          '<table class="wikitable"><tr><td>Legenda</td></tr></table>\n')
+            arquivo.write(_cabecalho(console))
+            for bloco in range(inicio, inicio + linhas, tamanho_bloco):
+                tamanho = min(tamanho_bloco, inicio + linhas - bloco)
+                arquivo.write(linhas_pagina(console, tamanho, bloco, titulos, semente + bloco))
+            arquivo.write('</table>\n<p>Ver também</p></body></html>\n')
+        caminhos[console] = caminho
+        inicio += linhas
+    return caminhos
+
+def main(pasta, usuarios=0, linhas_catalogo=0, semente=42, formatos=('csv',)):
+    if usuarios:
+        for formato, caminho in escrever_usuarios(os.path.join(pasta, 'Usuarios'), usuarios, semente, formatos).items():
+            print(f'>>USUÁRIOS ({formato})<< : {caminho}')
+    if linhas_catalogo:
+        for console, caminho in escrever_paginas(os.path.join(pasta, 'paginas'), linhas_catalogo, semente).items():
+            print(f'>>PÁGINA {console}<< : {caminho}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gera usuários e páginas de catálogo sintéticos.')
+    parser.add_argument('--pasta', default='Sintetico', help='pasta de saída')
+    parser.add_argument('--usuarios', type=int, default=0, help='número de usuários')
+    parser.add_argument('--linhas-catalogo', type=int, default=0, help='linhas de jogos, somando todas as páginas')
+    parser.add_argument('--formatos', nargs='+', choices=['csv', 'json', 'xlsx'], default=['csv'],
+                        help='formatos dos arquivos de usuários (as linhas são divididas entre eles)')
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+    main(args.pasta, args.usuarios, args.linhas_catalogo, args.semente, tuple(args.formatos))
@@ -0,0 +1,132 @@
+"""
+Servidor local que imita a busca da API do Mercado Livre (/sites/MLB/search), para testar
+e medir a questão 4 sem acessar a internet.
+
+Uso:
+    python -m benchmarks.stub_mercado_livre --porta 8766 --latencia 0.2 --erros 0.1 --limite 0.05
+    python questao4.py --url http://127.0.0.1:8766/sites/MLB/search
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+class ManipuladorBusca(BaseHTTPRequestHandler):
+    """
+    Responde às buscas com um resultado determinístico por título (o mesmo título sempre
+    devolve o mesmo preço), depois de uma latência aleatória e com erros sorteados.
+    """
+
+    #configuração, definida em servir()
+    latencia = 0.0
+    erros = 0.0
+    limite = 0.0
+    retry_after = 1
+    sorteio = random.Random(0)
+    trava = threading.Lock()
+    contagem = {'total': 0, '200': 0, '429': 0, '500': 0}
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _responder(self, status, corpo, cabecalhos=None):
+        dados = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(dados)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        endereco = urlparse(self.path)
+        if endereco.path != '/sites/MLB/search':
+            self._responder(404, {'message': 'not found'})
+            return
+
+        with self.trava:
+            espera = self.sorteio.expovariate(1 / self.latencia) if self.latencia > 0 else 0
+            sorteado = self.sorteio.random()
+            self.contagem['total'] += 1
+        time.sleep(espera)
+
+        if sorteado < self.limite:
+            self._contar('429')
+            self._responder(429, {'message': 'too many requests'}, {'Retry-After': str(self.retry_after)})
+            return
+        if sorteado < self.limite + self.erros:
+            self._contar('500')
+            self._responder(500, {'message': 'internal error'})
+            return
+
+        consulta = parse_qs(endereco.query).get('q', [''])[0]
+        self._contar('200')
+        self._responder(200, {'query': consulta, 'results': resultados(consulta)})
+
+    def _contar(self, status):
+        with self.trava:
+            self.contagem[status] += 1
+
+def resultados(consulta, quantidade=3):
+    """
+    Resultados falsos e determinísticos para a consulta.
+    """
+    if not consulta:
+        return []
+    semente = int(hashlib.sha1(consulta.encode('utf-8')).hexdigest()[:8], 16)
+    return [{
+        'id': f'MLB{semente + i}',
+        'title': f'{consulta} - Mídia Física' if i == 0 else f'{consulta} Edição {i + 1}',
+        'price': round(50 + (semente % 30000) / 100 + 10 * i, 2),
+        'permalink': f'https://produto.mercadolivre.com.br/MLB-{semente + i}'
+    } for i in range(quantidade)]
+
+def servir(porta=8766, latencia=0.0, erros=0.0, limite=0.0, retry_after=1, semente=0):
+    """
+    Cria o servidor (sem iniciar): chame serve_forever(), ou rode numa thread nos testes.
+
+    Args:
+    - porta (int): Porta local (0 = qualquer porta livre).
+    - latencia (float): Latência média de cada resposta, em segundos (distribuição exponencial).
+    - erros (float): Fração das respostas com HTTP 500.
+    - limite (float): Fração das respostas com HTTP 429 e Retry-After.
+    - retry_after (int): Segundos informados no Retry-After.
+    - semente (int): Semente do sorteio de latência e erros.
+
+    Returns:
+    - ThreadingHTTPServer: Servidor pronto.
+    """
+    atributos = dict(latencia=latencia, erros=erros, limite=limite, retry_after=retry_after,
+                     sorteio=random.Random(semente), trava=threading.Lock(),
+                     contagem={'total': 0, '200': 0, '429': 0, '500': 0})
+    manipulador = type('ManipuladorConfigurado', (ManipuladorBusca,), atributos)
+    servidor = ThreadingHTTPServer(('127.0.0.1', porta), manipulador)
+    servidor.daemon_threads = True
+    return servidor
+
+def main():
+    parser = argparse.ArgumentParser(description='Imita a busca da API do Mercado Livre.')
+    parser.add_argument('--porta', type=int, default=8766)
+    parser.add_argument('--latencia', type=float, default=0.0, help='latência média em segundos')
+    parser.add_argument('--erros', type=float, default=0.0, help='fração de respostas 500')
+    parser.add_argument('--limite', type=float, default=0.0, help='fração de respostas 429')
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    servidor = servir(args.porta, args.latencia, args.erros, args.limite, args.retry_after, args.semente)
+    print(f'>>STUB DO MERCADO LIVRE EM http://127.0.0.1:{servidor.server_address[1]}/sites/MLB/search<<')
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f'>>REQUISIÇÕES<< : {servidor.RequestHandlerClass.contagem}')
+
+if __name__ == '__main__':
+    main()
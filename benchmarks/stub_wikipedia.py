@@ -0,0 +1,77 @@
+"""
+Servidor local que entrega as páginas de lista de jogos (as geradas por benchmarks.gerador), para testar
+e medir a questão 1 sem acessar a Wikipédia.
+
+As páginas saem de '<pasta>/<console>.html', com Last-Modified (a questão 1 revalida com If-Modified-Since
+e recebe 304 se a página não mudou).
+
+Uso:
+    python -m benchmarks.gerador --linhas-catalogo 100000 --pasta Sintetico
+    python -m benchmarks.stub_wikipedia --pasta Sintetico/paginas --porta 8765 --latencia 0.1
+"""
+import argparse
+import functools
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+class ManipuladorPaginas(SimpleHTTPRequestHandler):
+    """
+    Serve os arquivos da pasta configurada, depois de uma latência fixa.
+    """
+
+    #configuração, definida em servir()
+    latencia = 0.0
+    trava = threading.Lock()
+    contagem = {'total': 0}
+    extensions_map = {'.html': 'text/html; charset=utf-8', '': 'application/octet-stream'}
+
+    def log_message(self, formato, *args):
+        pass
+
+    def do_GET(self):
+        with self.trava:
+            self.contagem['total'] += 1
+        time.sleep(self.latencia)
+        super().do_GET()
+
+def urls_paginas(porta, consoles):
+    """
+    Endereço de cada console no servidor local, para substituir questao1.urls.
+    """
+    return {console: f'http://127.0.0.1:{porta}/{console}.html' for console in consoles}
+
+def servir(pasta, porta=8765, latencia=0.0):
+    """
+    Cria o servidor (sem iniciar): chame serve_forever(), ou rode numa thread nos testes.
+
+    Args:
+    - pasta (str): Pasta com as páginas '<console>.html'.
+    - porta (int): Porta local (0 = qualquer porta livre).
+    - latencia (float): Espera antes de cada resposta, em segundos.
+
+    Returns:
+    - ThreadingHTTPServer: Servidor pronto.
+    """
+    atributos = dict(latencia=latencia, trava=threading.Lock(), contagem={'total': 0})
+    manipulador = type('ManipuladorConfigurado', (ManipuladorPaginas,), atributos)
+    servidor = ThreadingHTTPServer(('127.0.0.1', porta), functools.partial(manipulador, directory=pasta))
+    servidor.daemon_threads = True
+    return servidor
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve as páginas de lista de jogos geradas.')
+    parser.add_argument('--pasta', default='Sintetico/paginas')
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--latencia', type=float, default=0.0, help='espera antes de cada resposta, em segundos')
+    args = parser.parse_args()
+
+    servidor = servir(args.pasta, args.porta, args.latencia)
+    print(f'>>STUB DA WIKIPÉDIA EM http://127.0.0.1:{servidor.server_address[1]}/<console>.html<<')
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
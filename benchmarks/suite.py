@@ -0,0 +1,273 @@
+"""
+Benchmark de todas as etapas do pipeline com dados sintéticos (benchmarks.gerador), de 10³ a 10⁷ linhas.
+
+Cada etapa roda num processo novo, contra os servidores locais da Wikipédia e do Mercado Livre,
+e registra tempo, pico de memória (RSS) e linhas/s. Os resultados vão para um JSON indexado pelo commit,
+para comparar versões do código na mesma máquina.
+
+Etapas:
+- questao1_paginas: questao1.main (download, extração e limpeza das páginas, exportação dos CSVs).
+- questao2_limpeza: questao2.limpar_dados (datas e listas) sobre o CSV de usuários.
+- questao3_contagem: FrequenciaJogos.de_listas sobre os usuários já limpos (a contagem que questao3.main faz).
+- questao3_sqlite: questao3.exportar_para_sqlite das contagens.
+- questao4_api: questao4.consumir_api para até --max-consultas jogos (sem cache).
+
+Uso:
+    python -m benchmarks.suite --escalas 3 4 5
+    python -m benchmarks.suite --escalas 6 7 --etapas questao2_limpeza questao3_contagem
+    python -m benchmarks.suite --comparar 5f32232 ef25b76
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from sqlalchemy import create_engine
+import questao1
+import questao2
+import questao3
+import questao4
+from benchmarks import gerador, stub_mercado_livre, stub_wikipedia
+from frequencia_jogos import FrequenciaJogos
+
+try:
+    import resource
+except ImportError:  #Windows: o pico de memória não é medido
+    resource = None
+
+#resultados de todas as execuções, por commit
+ARQUIVO_RESULTADOS = 'benchmarks/resultados.json'
+
+#consultas da etapa questao4_api, no máximo (a API é o gargalo, não o volume de usuários)
+MAX_CONSULTAS = 1_000
+
+#latência média do stub do Mercado Livre, em segundos
+LATENCIA_API = 0.01
+
+def pico_memoria_mb():
+    """
+    Maior RSS do processo até agora, em MB (None se o sistema não informa).
+    """
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    #Linux informa em KB e macOS em bytes
+    return round(pico / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def _ler_usuarios_limpos(pasta):
+    return questao2.limpar_dados(pd.read_csv(os.path.join(pasta, 'Usuarios', 'usuarios.csv')))
+
+#cada etapa prepara os dados (fora da medição) e devolve (linhas, função medida)
+def _questao1_paginas(pasta, opcoes):
+    questao1.urls = stub_wikipedia.urls_paginas(opcoes['porta_wikipedia'], gerador.PAGINAS)
+    os.makedirs('Dados_Jogos', exist_ok=True)
+    return opcoes['linhas'], lambda: questao1.main(usar_cache=False, recomecar=True)
+
+def _questao2_limpeza(pasta, opcoes):
+    dataframe = pd.read_csv(os.path.join(pasta, 'Usuarios', 'usuarios.csv'))
+    return len(dataframe), lambda: questao2.limpar_dados(dataframe)
+
+def _questao3_contagem(pasta, opcoes):
+    dataframe = _ler_usuarios_limpos(pasta)
+    return len(dataframe), lambda: FrequenciaJogos.de_listas(dataframe['jogos_preferidos'])
+
+def _questao3_sqlite(pasta, opcoes):
+    contagens = FrequenciaJogos.de_listas(_ler_usuarios_limpos(pasta)['jogos_preferidos']).contagens
+    if os.path.exists('jogos.db'):
+        os.remove('jogos.db')
+    return len(contagens), lambda: questao3.exportar_para_sqlite(contagens, 'jogos.db')
+
+def _questao4_api(pasta, opcoes):
+    if os.path.exists('mercado_livre.db'):
+        os.remove('mercado_livre.db')
+    engine = create_engine('sqlite:///mercado_livre.db')
+    questao4.Base.metadata.create_all(engine)
+    sessao = questao4.criar_sessao(engine)
+    jogos = pd.DataFrame({'jogo': gerador.titulos_jogos(min(opcoes['linhas'], opcoes['max_consultas']))})
+    url = f"http://127.0.0.1:{opcoes['porta_mercado_livre']}/sites/MLB/search"
+    return len(jogos), lambda: questao4.consumir_api(jogos, sessao, url=url, taxa=1_000)
+
+ETAPAS = {
+    'questao1_paginas': _questao1_paginas,
+    'questao2_limpeza': _questao2_limpeza,
+    'questao3_contagem': _questao3_contagem,
+    'questao3_sqlite': _questao3_sqlite,
+    'questao4_api': _questao4_api
+}
+
+def _medir_etapa(nome, pasta, opcoes):
+    """
+    Roda uma etapa (no processo filho, com a saída das questões descartada) e mede a parte principal.
+    """
+    os.chdir(pasta)
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        linhas, funcao = ETAPAS[nome](pasta, opcoes)
+        memoria_preparo = pico_memoria_mb()
+        inicio = time.perf_counter()
+        funcao()
+        segundos = time.perf_counter() - inicio
+    return {
+        'linhas': linhas,
+        'segundos': round(segundos, 4),
+        'linhas_por_segundo': round(linhas / segundos, 1) if segundos else None,
+        'pico_rss_mb': pico_memoria_mb(),
+        'rss_preparo_mb': memoria_preparo
+    }
+
+def medir_etapa(nome, pasta, opcoes):
+    """
+    Mede uma etapa num processo novo, para que o pico de memória seja só dela.
+
+    Returns:
+    - dict: {'linhas', 'segundos', 'linhas_por_segundo', 'pico_rss_mb', 'rss_preparo_mb'} ou {'erro'}.
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        try:
+            return executor.submit(_medir_etapa, nome, pasta, opcoes).result()
+        except Exception as e:
+            return {'erro': str(e)}
+
+def commit_atual():
+    """
+    Hash curto do commit (com '+sujo' se houver mudanças não commitadas), ou 'desconhecido'.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        mudancas = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        return f'{commit}+sujo' if mudancas else commit
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconhecido'
+
+def ler_resultados(arquivo=ARQUIVO_RESULTADOS):
+    try:
+        with open(arquivo, encoding='utf-8') as entrada:
+            return json.load(entrada)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def salvar_resultados(resultados, arquivo=ARQUIVO_RESULTADOS):
+    """
+    Grava os resultados (gravação atômica, como os caches).
+    """
+    temporario = f'{arquivo}.tmp'
+    with open(temporario, 'w', encoding='utf-8') as saida:
+        json.dump(resultados, saida, indent=2, ensure_ascii=False)
+    os.replace(temporario, arquivo)
+
+def _iniciar(servidor):
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+def rodar(escalas, etapas=None, semente=42, max_consultas=MAX_CONSULTAS, latencia_api=LATENCIA_API,
+          arquivo=ARQUIVO_RESULTADOS, pasta=None):
+    """
+    Gera os dados de cada escala, mede as etapas e acrescenta os resultados ao arquivo, no commit atual.
+
+    Args:
+    - escalas (list): Expoentes das escalas (3 = 1.000 usuários e 1.000 linhas de catálogo).
+    - etapas (list): Etapas medidas (None = todas de ETAPAS).
+    - semente (int): Semente do gerador.
+    - max_consultas (int): Consultas da etapa questao4_api, no máximo.
+    - latencia_api (float): Latência média do stub do Mercado Livre.
+    - arquivo (str): Arquivo JSON dos resultados.
+    - pasta (str): Pasta de trabalho (None = temporária, apagada no fim).
+
+    Returns:
+    - dict: Escala -> etapa -> medidas.
+    """
+    etapas = etapas or list(ETAPAS)
+    temporaria = pasta is None
+    pasta = os.path.abspath(pasta or tempfile.mkdtemp(prefix='benchmark_'))
+    commit = commit_atual()
+    medidas = {}
+    servidor_api = _iniciar(stub_mercado_livre.servir(0, latencia=latencia_api))
+    try:
+        for expoente in escalas:
+            linhas = 10 ** expoente
+            pasta_escala = os.path.join(pasta, f'escala_{linhas}')
+            inicio = time.perf_counter()
+            gerador.escrever_usuarios(os.path.join(pasta_escala, 'Usuarios'), linhas, semente)
+            if 'questao1_paginas' in etapas:
+                gerador.escrever_paginas(os.path.join(pasta_escala, 'paginas'), linhas, semente)
+            print(f'>>ESCALA {linhas:,}<< : dados gerados em {time.perf_counter() - inicio:.1f}s')
+
+            servidor_wikipedia = _iniciar(stub_wikipedia.servir(os.path.join(pasta_escala, 'paginas'), 0))
+            opcoes = {'linhas': linhas, 'max_consultas': max_consultas,
+                      'porta_wikipedia': servidor_wikipedia.server_address[1],
+                      'porta_mercado_livre': servidor_api.server_address[1]}
+            medidas[str(linhas)] = {}
+            for nome in etapas:
+                medida = medir_etapa(nome, pasta_escala, opcoes)
+                medidas[str(linhas)][nome] = medida
+                if 'erro' in medida:
+                    print(f'>>ERRO NA ETAPA {nome}<<: {medida["erro"]}')
+                else:
+                    print(f"  {nome:<18} {medida['segundos']:>9.3f}s {medida['linhas_por_segundo'] or 0:>14,.0f} linhas/s "
+                          f"pico {medida['pico_rss_mb']} MB")
+            servidor_wikipedia.shutdown()
+    finally:
+        servidor_api.shutdown()
+        if temporaria:
+            shutil.rmtree(pasta, ignore_errors=True)
+
+    resultados = ler_resultados(arquivo)
+    registro = resultados.setdefault(commit, {'escalas': {}})
+    registro.update({'data': datetime.datetime.now().isoformat(timespec='seconds'), 'python': platform.python_version(),
+                     'maquina': platform.platform(), 'semente': semente})
+    for escala, por_etapa in medidas.items():
+        registro['escalas'].setdefault(escala, {}).update(por_etapa)
+    salvar_resultados(resultados, arquivo)
+    print(f'>>RESULTADOS<< : {arquivo} (commit {commit})')
+    return medidas
+
+def comparar(antes, depois, arquivo=ARQUIVO_RESULTADOS):
+    """
+    Mostra lado a lado as medidas de dois commits (razão > 1 = 'depois' mais rápido).
+    """
+    resultados = ler_resultados(arquivo)
+    for commit in (antes, depois):
+        if commit not in resultados:
+            print(f'>>COMMIT SEM RESULTADOS<< : {commit}')
+            return
+    linhas = []
+    escalas_antes = resultados[antes]['escalas']
+    escalas_depois = resultados[depois]['escalas']
+    for escala in sorted(set(escalas_antes) & set(escalas_depois), key=int):
+        for etapa in escalas_antes[escala]:
+            medida_antes = escalas_antes[escala][etapa]
+            medida_depois = escalas_depois[escala].get(etapa)
+            if not medida_depois or 'erro' in medida_antes or 'erro' in medida_depois:
+                continue
+            linhas.append({'escala': int(escala), 'etapa': etapa,
+                           f'segundos {antes}': medida_antes['segundos'], f'segundos {depois}': medida_depois['segundos'],
+                           'razão': round(medida_antes['segundos'] / medida_depois['segundos'], 2) if medida_depois['segundos'] else None,
+                           f'pico MB {antes}': medida_antes['pico_rss_mb'], f'pico MB {depois}': medida_depois['pico_rss_mb']})
+    print(pd.DataFrame(linhas).to_string(index=False) if linhas else '>>NENHUMA MEDIDA EM COMUM<<')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark das etapas do pipeline com dados sintéticos.')
+    parser.add_argument('--escalas', type=int, nargs='+', default=[3, 4, 5], help='expoentes das escalas (3 a 7)')
+    parser.add_argument('--etapas', nargs='+', choices=list(ETAPAS), help='etapas medidas (padrão: todas)')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--max-consultas', type=int, default=MAX_CONSULTAS, help='consultas da etapa questao4_api, no máximo')
+    parser.add_argument('--latencia-api', type=float, default=LATENCIA_API, help='latência média do stub do Mercado Livre')
+    parser.add_argument('--resultados', default=ARQUIVO_RESULTADOS, help='arquivo JSON dos resultados')
+    parser.add_argument('--pasta', help='pasta de trabalho (padrão: temporária)')
+    parser.add_argument('--comparar', nargs=2, metavar=('ANTES', 'DEPOIS'), help='compara dois commits já medidos')
+    args = parser.parse_args()
+
+    if args.comparar:
+        comparar(*args.comparar, arquivo=args.resultados)
+    else:
+        rodar(args.escalas, args.etapas, args.semente, args.max_consultas, args.latencia_api, args.resultados, args.pasta)
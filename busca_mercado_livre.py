@@ -0,0 +1,217 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+import instrumentacao
+from instrumentacao import medir
+
+#url base da API do Mercado Livre
+URL_BUSCA = 'https://api.mercadolibre.com/sites/MLB/search'
+
+#categoria de jogos de videogame
+CATEGORIA = 'MLB186456'
+
+#buscas simultâneas no máximo
+MAX_CONCORRENCIA = 8
+
+#requisições por segundo permitidas (média) e rajada máxima do token bucket
+REQUISICOES_POR_SEGUNDO = 10
+RAJADA = 10
+
+#(conexão, leitura) em segundos, por requisição
+TIMEOUT = (5, 15)
+
+#tentativas por jogo e espera base/máxima (segundos) do backoff exponencial
+TENTATIVAS = 4
+ESPERA_BASE = 0.5
+ESPERA_MAXIMA = 30
+
+#respostas que valem uma nova tentativa
+STATUS_REPETIR = {429, 500, 502, 503, 504}
+
+class LimitadorTaxa:
+    """
+    Token bucket: cada requisição gasta um token; os tokens voltam a 'taxa' por segundo,
+    até o limite de 'rajada'. Compartilhado por todas as buscas de uma execução.
+    """
+
+    def __init__(self, taxa=REQUISICOES_POR_SEGUNDO, rajada=RAJADA):
+        self.taxa = taxa
+        self.rajada = rajada
+        self.tokens = rajada
+        self.atualizado = time.monotonic()
+        self._trava = asyncio.Lock()
+
+    async def aguardar(self):
+        async with self._trava:
+            while True:
+                agora = time.monotonic()
+                self.tokens = min(self.rajada, self.tokens + (agora - self.atualizado) * self.taxa)
+                self.atualizado = agora
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.taxa)
+
+def criar_cliente(max_conexoes=MAX_CONCORRENCIA):
+    """
+    Cria uma sessão HTTP com pool de conexões reaproveitadas entre as buscas.
+
+    Args:
+    - max_conexoes (int): Tamanho do pool (uma conexão por busca simultânea).
+
+    Returns:
+    - requests.Session: Sessão configurada.
+    """
+    sessao = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=max_conexoes, pool_maxsize=max_conexoes)
+    sessao.mount('https://', adaptador)
+    sessao.mount('http://', adaptador)
+    return sessao
+
+def tempo_retry_after(valor):
+    """
+    Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos de espera (None se ausente ou inválido).
+    """
+    if not valor:
+        return None
+    try:
+        return max(float(valor), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(valor).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def tempo_espera(tentativa, retry_after=None, base=ESPERA_BASE, maximo=ESPERA_MAXIMA):
+    """
+    Espera antes da próxima tentativa: backoff exponencial com jitter completo
+    (aleatório entre 0 e base * 2^tentativa), ou o Retry-After do servidor, se for maior.
+    """
+    espera = random.uniform(0, min(maximo, base * 2 ** tentativa))
+    if retry_after is not None:
+        espera = max(espera, min(retry_after, maximo))
+    return espera
+
+@medir('busca_mercado_livre.requisicao')
+def requisitar(cliente, url, parametros, timeout):
+    """
+    Uma requisição de busca (bloqueante; roda numa thread separada).
+    """
+    return cliente.get(url, params=parametros, timeout=timeout)
+
+async def buscar_jogo(cliente, jogo, semaforo, limitador, url=URL_BUSCA, timeout=TIMEOUT, tentativas=TENTATIVAS):
+    """
+    Busca um jogo na API, repetindo em caso de 429/5xx ou falha de rede.
+
+    Args:
+    - cliente (requests.Session): Sessão compartilhada.
+    - jogo (str): Título procurado.
+    - semaforo (asyncio.Semaphore): Limita as buscas simultâneas.
+    - limitador (LimitadorTaxa): Limita as requisições por segundo.
+    - url (str): Endereço da busca.
+    - timeout (tuple): Timeout de cada requisição.
+    - tentativas (int): Número máximo de tentativas.
+
+    Returns:
+    - dict: {'jogo', 'dados' (JSON da resposta ou None), 'erro' (mensagem ou None), 'tentativas',
+      'origem' ('api')}.
+    """
+    parametros = {'category': CATEGORIA, 'q': jogo}
+    erro = None
+    for tentativa in range(tentativas):
+        retry_after = None
+        async with semaforo:
+            await limitador.aguardar()
+            try:
+                #requests é bloqueante: roda numa thread para não parar o laço de eventos
+                resposta = await asyncio.to_thread(requisitar, cliente, url, parametros, timeout)
+                if resposta.status_code not in STATUS_REPETIR:
+                    resposta.raise_for_status()
+                    return {'jogo': jogo, 'dados': resposta.json(), 'erro': None, 'tentativas': tentativa + 1, 'origem': 'api'}
+                erro = f'HTTP {resposta.status_code}'
+                retry_after = tempo_retry_after(resposta.headers.get('Retry-After'))
+            except requests.exceptions.HTTPError as e:
+                #4xx que não adianta repetir
+                return {'jogo': jogo, 'dados': None, 'erro': str(e), 'tentativas': tentativa + 1, 'origem': 'api'}
+            except (requests.exceptions.RequestException, ValueError) as e:
+                erro = str(e)
+
+        #espera fora do semáforo, para não segurar a vaga de outra busca
+        if tentativa < tentativas - 1:
+            instrumentacao.contar('busca_mercado_livre.novas_tentativas')
+            await asyncio.sleep(tempo_espera(tentativa, retry_after))
+
+    return {'jogo': jogo, 'dados': None, 'erro': erro, 'tentativas': tentativas, 'origem': 'api'}
+
+async def buscar_jogos(jogos, url=URL_BUSCA, max_concorrencia=MAX_CONCORRENCIA, taxa=REQUISICOES_POR_SEGUNDO,
+                       timeout=TIMEOUT, tentativas=TENTATIVAS, cache=None, servir_vencidos=False, ao_receber=None):
+    """
+    Busca vários jogos ao mesmo tempo, com no máximo max_concorrencia buscas simultâneas e
+    'taxa' requisições por segundo.
+
+    Com cache, respostas ainda válidas não vão à API. Respostas vencidas são buscadas de novo; com
+    servir_vencidos=True, a resposta vencida é entregue na hora e a nova é buscada em segundo plano
+    (stale-while-revalidate) e entregue de novo quando chegar. Se a API falhar, a resposta vencida é usada.
+
+    Args:
+    - jogos (list): Títulos procurados.
+    - url, max_concorrencia, taxa, timeout, tentativas: Veja buscar_jogo e LimitadorTaxa.
+    - cache (cache_consultas.CacheConsultas): Cache das respostas (None = sem cache).
+    - servir_vencidos (bool): Entrega respostas vencidas na hora e revalida em segundo plano.
+    - ao_receber (callable): Chamada com cada resultado assim que ele fica pronto (inclusive as revalidações).
+
+    Returns:
+    - list: Um resultado por jogo, na ordem recebida ('origem' = 'api', 'cache' ou 'vencido').
+    """
+    semaforo = asyncio.Semaphore(max_concorrencia)
+    limitador = LimitadorTaxa(taxa, rajada=max(1, min(RAJADA, max_concorrencia)))
+    revalidacoes = []
+
+    def entregar(resultado):
+        if ao_receber is not None:
+            ao_receber(resultado)
+        return resultado
+
+    async def consultar_api(cliente, jogo):
+        resultado = await buscar_jogo(cliente, jogo, semaforo, limitador, url, timeout, tentativas)
+        if cache is not None and resultado['erro'] is None:
+            cache.gravar(CATEGORIA, jogo, resultado['dados'])
+        return resultado
+
+    async def revalidar(cliente, jogo):
+        resultado = await consultar_api(cliente, jogo)
+        if resultado['erro'] is None:
+            entregar(resultado)
+
+    async def obter(cliente, jogo):
+        anterior, vencida = cache.obter(CATEGORIA, jogo) if cache is not None else (None, False)
+        if anterior is not None:
+            guardado = {'jogo': jogo, 'dados': anterior, 'erro': None, 'tentativas': 0,
+                        'origem': 'vencido' if vencida else 'cache'}
+            if not vencida:
+                return entregar(guardado)
+            if servir_vencidos:
+                revalidacoes.append(asyncio.create_task(revalidar(cliente, jogo)))
+                return entregar(guardado)
+
+        resultado = await consultar_api(cliente, jogo)
+        if resultado['erro'] is not None and anterior is not None:
+            #a API falhou: melhor a resposta vencida do que nenhuma
+            resultado = guardado
+        return entregar(resultado)
+
+    with criar_cliente(max_concorrencia) as cliente:
+        resultados = await asyncio.gather(*[obter(cliente, jogo) for jogo in jogos])
+        #as revalidações terminam antes de fechar o cliente (e de o programa sair)
+        await asyncio.gather(*revalidacoes)
+        return resultados
+
+def buscar_todos(jogos, **opcoes):
+    """
+    Versão síncrona de buscar_jogos (para ser chamada fora de um laço de eventos).
+    """
+    return asyncio.run(buscar_jogos(list(jogos), **opcoes))
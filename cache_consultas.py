@@ -0,0 +1,98 @@
+import json
+import sqlite3
+import time
+from deduplicacao import normalizar_texto
+
+#cache das buscas do Mercado Livre, ao lado de mercado_livre.db
+ARQUIVO_CACHE = 'mercado_livre_cache.db'
+
+#validade padrão de uma resposta (segundos)
+TTL_PADRAO = 6 * 60 * 60
+
+#número máximo de respostas guardadas; acima disso saem as menos usadas recentemente (LRU)
+MAX_ENTRADAS = 10_000
+
+ESQUEMA = '''
+CREATE TABLE IF NOT EXISTS consultas (
+    categoria TEXT NOT NULL,
+    consulta TEXT NOT NULL,
+    resposta TEXT NOT NULL,
+    gravado_em REAL NOT NULL,
+    expira_em REAL NOT NULL,
+    acessado_em REAL NOT NULL,
+    PRIMARY KEY (categoria, consulta)
+);
+CREATE INDEX IF NOT EXISTS idx_consultas_acessado_em ON consultas(acessado_em);
+'''
+
+class CacheConsultas:
+    """
+    Cache persistente das respostas de busca, com validade (TTL) por entrada e limite de tamanho (LRU).
+
+    A chave é (categoria, consulta normalizada), então 'Spider-Man' e 'spider man' usam a mesma resposta.
+    Deve ser usado sempre da mesma thread (na questão 4, a do laço de eventos).
+    """
+
+    def __init__(self, arquivo=ARQUIVO_CACHE, ttl=TTL_PADRAO, max_entradas=MAX_ENTRADAS):
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.conexao = sqlite3.connect(arquivo)
+        self.conexao.execute('PRAGMA journal_mode=WAL')
+        self.conexao.executescript(ESQUEMA)
+        self.contagem = {'acertos': 0, 'vencidos': 0, 'faltas': 0}
+
+    @staticmethod
+    def chave(categoria, consulta):
+        return categoria, normalizar_texto(consulta)
+
+    def obter(self, categoria, consulta):
+        """
+        Procura a resposta guardada.
+
+        Returns:
+        - tuple: (resposta, vencida) se houver entrada; (None, False) se não houver.
+        """
+        linha = self.conexao.execute(
+            'SELECT resposta, expira_em, gravado_em FROM consultas WHERE categoria = ? AND consulta = ?',
+            self.chave(categoria, consulta)
+        ).fetchone()
+        if linha is None:
+            self.contagem['faltas'] += 1
+            return None, False
+
+        with self.conexao:
+            self.conexao.execute('UPDATE consultas SET acessado_em = ? WHERE categoria = ? AND consulta = ?',
+                                 (time.time(), *self.chave(categoria, consulta)))
+        #vale a validade da entrada, limitada pelo ttl atual (um ttl menor torna o cache mais rigoroso)
+        vencida = min(linha[1], linha[2] + self.ttl) <= time.time()
+        self.contagem['vencidos' if vencida else 'acertos'] += 1
+        return json.loads(linha[0]), vencida
+
+    def gravar(self, categoria, consulta, resposta, ttl=None):
+        """
+        Guarda (ou substitui) uma resposta, que vale por 'ttl' segundos (None = ttl do cache).
+        """
+        agora = time.time()
+        with self.conexao:
+            self.conexao.execute(
+                'INSERT OR REPLACE INTO consultas (categoria, consulta, resposta, gravado_em, expira_em, acessado_em) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (*self.chave(categoria, consulta), json.dumps(resposta, ensure_ascii=False),
+                 agora, agora + (self.ttl if ttl is None else ttl), agora)
+            )
+            self._despejar()
+
+    def _despejar(self):
+        excesso = self.conexao.execute('SELECT COUNT(*) FROM consultas').fetchone()[0] - self.max_entradas
+        if excesso > 0:
+            self.conexao.execute(
+                'DELETE FROM consultas WHERE rowid IN (SELECT rowid FROM consultas ORDER BY acessado_em LIMIT ?)',
+                (excesso,)
+            )
+
+    def resumo(self):
+        return (f"{self.contagem['acertos']} acertos, {self.contagem['vencidos']} vencidos, "
+                f"{self.contagem['faltas']} faltas")
+
+    def fechar(self):
+        self.conexao.close()
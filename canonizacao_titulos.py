@@ -0,0 +1,274 @@
+import glob
+import hashlib
+import json
+import os
+from difflib import SequenceMatcher
+import numpy as np
+import pandas as pd
+from deduplicacao import normalizar_texto
+
+#catálogos gerados pela questão 1 (um CSV por console, com a coluna 'Título')
+PADRAO_CATALOGOS = 'Dados_Jogos/*.csv'
+
+#mapeamentos já resolvidos, reaproveitados entre execuções enquanto os catálogos não mudarem
+ARQUIVO_CACHE = 'Cache_Titulos/titulos.json'
+
+#nota mínima para aceitar um título do catálogo como o título informado pelo usuário
+LIMIAR_TITULO = 0.6
+
+#quantos candidatos (os com mais trigramas em comum) recebem a nota exata
+MAXIMO_CANDIDATOS = 50
+
+#trigramas presentes em mais que essa fração dos títulos ('the', ' de') não ajudam a escolher candidatos
+FRACAO_TRIGRAMA_COMUM = 0.05
+
+def trigramas(texto):
+    """
+    Conjunto de trigramas do texto normalizado, com espaço nas pontas ('gta' -> {' gt', 'gta', 'ta '}).
+    """
+    texto = f' {texto} '
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+#números romanos de sequência ('GTA V' e 'GTA 5' são o mesmo jogo)
+ROMANOS = {'ii': '2', 'iii': '3', 'iv': '4', 'v': '5', 'vi': '6', 'vii': '7', 'viii': '8', 'ix': '9', 'x': '10'}
+
+def normalizar_titulo(titulo):
+    """
+    Chave de comparação do título: normalizar_texto com os números romanos trocados por arábicos.
+
+    'Final Fantasy VII: Remake' -> 'final fantasy 7 remake'.
+    """
+    return ' '.join(ROMANOS.get(palavra, palavra) for palavra in normalizar_texto(titulo).split())
+
+def numeros(palavras):
+    """
+    Números de sequência entre as palavras do título; títulos com números diferentes são jogos diferentes.
+    """
+    return {palavra.lstrip('0') or '0' for palavra in palavras if palavra.isdigit()}
+
+def palavra_presente(palavra, palavras):
+    """
+    Se a palavra está entre as palavras do título, aceitando pequenos erros de digitação
+    em palavras de 4 letras ou mais.
+    """
+    if palavra in palavras:
+        return True
+    return len(palavra) >= 4 and any(SequenceMatcher(None, palavra, outra).ratio() >= 0.8 for outra in palavras)
+
+def chaves_sigla(palavras):
+    """
+    Formas abreviadas de um título: as primeiras palavras viram sigla e o resto fica igual.
+
+    'grand theft auto 5' -> ['gt auto 5', 'gta 5', 'gta5'].
+    """
+    return [''.join(palavra[0] for palavra in palavras[:k]) + (' ' + ' '.join(palavras[k:]) if k < len(palavras) else '')
+            for k in range(2, len(palavras) + 1)]
+
+class IndiceTitulos:
+    """
+    Índice invertido de trigramas sobre os títulos dos catálogos de console.
+
+    Uma consulta só olha os títulos que compartilham trigramas pouco comuns com o texto procurado
+    (listas de postagem em arrays numpy) e calcula a nota exata só dos MAXIMO_CANDIDATOS melhores,
+    sem percorrer o catálogo inteiro. Candidatos com outro número de sequência ou sem alguma palavra
+    da consulta são descartados. Siglas ('GTA V') são resolvidas por um índice à parte.
+    """
+
+    def __init__(self, titulos):
+        """
+        Args:
+        - titulos (pandas DataFrame): Colunas 'titulo' e 'console', uma linha por título de cada console.
+        """
+        self.titulos = []  #título como aparece no catálogo (a primeira grafia encontrada)
+        self.consoles = []  #consoles de cada título
+        self.gramas = []  #trigramas de cada título
+        self.palavras = []  #palavras de cada título
+        posicoes = {}
+
+        for titulo, console in zip(titulos['titulo'], titulos['console']):
+            chave = normalizar_titulo(titulo)
+            if not chave:
+                continue
+            if chave in posicoes:
+                if console not in self.consoles[posicoes[chave]]:
+                    self.consoles[posicoes[chave]].append(console)
+                continue
+            posicoes[chave] = len(self.titulos)
+            self.titulos.append(titulo)
+            self.consoles.append([console])
+            self.gramas.append(trigramas(chave))
+            self.palavras.append(set(chave.split()))
+
+        self.exatos = posicoes
+
+        listas = {}
+        for posicao, gramas in enumerate(self.gramas):
+            for grama in gramas:
+                listas.setdefault(grama, []).append(posicao)
+        self.postagens = {grama: np.array(lista, dtype=np.int32) for grama, lista in listas.items()}
+
+        #sigla -> posições; a mesma sigla pode servir para mais de um título
+        self.siglas = {}
+        for chave, posicao in posicoes.items():
+            for sigla in chaves_sigla(chave.split()):
+                self.siglas.setdefault(sigla, []).append(posicao)
+
+    @classmethod
+    def dos_catalogos(cls, padrao=PADRAO_CATALOGOS):
+        """
+        Monta o índice a partir dos CSVs de console (o nome do arquivo é o console).
+        """
+        partes = []
+        for caminho in sorted(glob.glob(padrao)):
+            dataframe = pd.read_csv(caminho, usecols=['Título'])
+            console = os.path.splitext(os.path.basename(caminho))[0]
+            partes.append(pd.DataFrame({'titulo': dataframe['Título'].dropna().astype(str), 'console': console}))
+        if not partes:
+            return cls(pd.DataFrame({'titulo': [], 'console': []}))
+        return cls(pd.concat(partes, ignore_index=True))
+
+    def _resultado(self, posicao, nota):
+        return {'titulo': self.titulos[posicao], 'consoles': list(self.consoles[posicao]), 'nota': round(float(nota), 4)}
+
+    def _nota(self, gramas, posicao):
+        """
+        Média entre o coeficiente de Dice e a fração dos trigramas da consulta que aparecem no título
+        (assim 'Sekiro' ainda chega perto de 'Sekiro: Shadows Die Twice').
+        """
+        comuns = len(gramas & self.gramas[posicao])
+        dice = 2 * comuns / (len(gramas) + len(self.gramas[posicao]))
+        return (dice + comuns / len(gramas)) / 2
+
+    def _compativel(self, palavras, posicao):
+        """
+        Um candidato só vale se tiver os mesmos números de sequência e todas as palavras da consulta
+        ('Resident Evil 3' não é 'Resident Evil'; 'Hades' não é 'Hardwood Spades').
+        """
+        palavras_titulo = self.palavras[posicao]
+        return (numeros(palavras) == numeros(palavras_titulo)
+                and all(palavra_presente(palavra, palavras_titulo) for palavra in palavras))
+
+    def resolver(self, titulo, limiar=LIMIAR_TITULO):
+        """
+        Encontra o título do catálogo que corresponde ao título informado.
+
+        Args:
+        - titulo (str): Título como o usuário escreveu.
+        - limiar (float): Nota mínima para aceitar a correspondência.
+
+        Returns:
+        - dict: {'titulo', 'consoles', 'nota'} do melhor título do catálogo.
+        - None: Se nenhum título chegar ao limiar.
+        """
+        chave = normalizar_titulo(titulo)
+        if not chave:
+            return None
+        if chave in self.exatos:
+            return self._resultado(self.exatos[chave], 1.0)
+
+        gramas = trigramas(chave)
+        palavras = chave.split()
+        melhor, melhor_nota = None, 0.0
+
+        #sigla: entre os títulos com a mesma sigla, o de maior nota (empate = o primeiro)
+        for posicao in self.siglas.get(chave, []):
+            nota = max(self._nota(gramas, posicao), limiar)
+            if nota > melhor_nota:
+                melhor, melhor_nota = posicao, nota
+
+        #candidatos: títulos que compartilham trigramas pouco comuns com a consulta
+        listas = [self.postagens[grama] for grama in gramas if grama in self.postagens]
+        limite = max(1, int(len(self.titulos) * FRACAO_TRIGRAMA_COMUM))
+        raras = [lista for lista in listas if len(lista) <= limite] or listas
+        if raras:
+            posicoes, contagens = np.unique(np.concatenate(raras), return_counts=True)
+            if len(posicoes) > MAXIMO_CANDIDATOS:
+                posicoes = posicoes[np.argpartition(-contagens, MAXIMO_CANDIDATOS - 1)[:MAXIMO_CANDIDATOS]]
+            for posicao in sorted(posicoes.tolist()):
+                nota = self._nota(gramas, posicao)
+                if nota > melhor_nota and self._compativel(palavras, posicao):
+                    melhor, melhor_nota = posicao, nota
+
+        if melhor is None or melhor_nota < limiar:
+            return None
+        return self._resultado(melhor, melhor_nota)
+
+def assinatura_catalogos(padrao=PADRAO_CATALOGOS):
+    """
+    Hash do conteúdo dos catálogos: se algum CSV mudar, o cache de títulos é descartado.
+    """
+    resumo = hashlib.sha256()
+    for caminho in sorted(glob.glob(padrao)):
+        resumo.update(os.path.basename(caminho).encode('utf-8'))
+        with open(caminho, 'rb') as arquivo:
+            resumo.update(hashlib.sha256(arquivo.read()).digest())
+    return resumo.hexdigest()
+
+class CanonizadorTitulos:
+    """
+    Resolve títulos informados pelos usuários para os títulos do catálogo, com cache em disco.
+
+    O índice só é montado se aparecer algum título fora do cache.
+    """
+
+    def __init__(self, padrao=PADRAO_CATALOGOS, arquivo_cache=ARQUIVO_CACHE, limiar=LIMIAR_TITULO):
+        self.padrao = padrao
+        self.arquivo_cache = arquivo_cache
+        self.limiar = limiar
+        self.assinatura = f'{assinatura_catalogos(padrao)}:{limiar}'
+        self.mapa = self._ler_cache()
+        self.indice = None
+        self.resolvidos_cache = 0
+        self.resolvidos_indice = 0
+
+    def _ler_cache(self):
+        try:
+            with open(self.arquivo_cache, encoding='utf-8') as arquivo:
+                cache = json.load(arquivo)
+            return cache['titulos'] if cache.get('assinatura') == self.assinatura else {}
+        except (FileNotFoundError, ValueError, KeyError):
+            return {}
+
+    def salvar_cache(self):
+        """
+        Grava os mapeamentos resolvidos (gravação atômica, como o cache HTTP da questão 1).
+        """
+        pasta = os.path.dirname(self.arquivo_cache)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        temporario = f'{self.arquivo_cache}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump({'assinatura': self.assinatura, 'titulos': self.mapa}, arquivo, ensure_ascii=False)
+        os.replace(temporario, self.arquivo_cache)
+
+    def resolver(self, titulo):
+        """
+        Correspondência de um título ({'titulo', 'consoles', 'nota'}) ou None.
+        """
+        if titulo in self.mapa:
+            self.resolvidos_cache += 1
+            return self.mapa[titulo]
+        if self.indice is None:
+            self.indice = IndiceTitulos.dos_catalogos(self.padrao)
+        self.resolvidos_indice += 1
+        self.mapa[titulo] = self.indice.resolver(titulo, self.limiar)
+        return self.mapa[titulo]
+
+    def canonizar_listas(self, listas):
+        """
+        Troca cada título das listas pelo título do catálogo (títulos sem correspondência ficam
+        como estão) e remove repetições que surgirem na troca.
+
+        Args:
+        - listas (pandas Series): Uma lista de títulos por usuário.
+
+        Returns:
+        - pandas Series: Listas com os títulos canônicos, com o mesmo índice.
+        """
+        titulos = {titulo for lista in listas if isinstance(lista, list) for titulo in lista}
+        troca = {}
+        for titulo in titulos:
+            correspondencia = self.resolver(titulo)
+            troca[titulo] = correspondencia['titulo'] if correspondencia else titulo
+        return listas.map(lambda lista: list(dict.fromkeys(troca[titulo] for titulo in lista))
+                          if isinstance(lista, list) else lista)
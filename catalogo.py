@@ -0,0 +1,170 @@
+import os
+import pandas as pd
+
+#pyarrow é opcional: só é necessário para gravar e ler o catálogo colunar
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+#pasta do catálogo unificado, com uma subpasta 'console=<nome>' por console
+PASTA_CATALOGO = 'Dados_Jogos/catalogo'
+
+#colunas de texto com muitos valores repetidos, gravadas com dictionary encoding
+COLUNAS_DICIONARIO = ['Gênero', 'Desenvolvedor', 'Publicadora', 'Exclusivo']
+
+#extensão dos arquivos de cada formato; 'arrow' (IPC) pode ser lido via memory map sem cópia
+EXTENSOES = {'arrow': 'arrow', 'parquet': 'parquet'}
+
+def _verificar_pyarrow():
+    if pa is None:
+        print('>>ERRO: pyarrow NÃO INSTALADO, CATÁLOGO INDISPONÍVEL<<')
+        return False
+    return True
+
+def montar_tabela(dataframe):
+    """
+    Converte o DataFrame limpo de um console para uma tabela Arrow tipada.
+
+    Os campos 'Nao Encontrado' viram nulos, as colunas de COLUNAS_DICIONARIO são
+    dictionary-encoded e as colunas de lançamento ficam como timestamp.
+
+    Args:
+    - dataframe (pandas DataFrame): DataFrame limpo de um console (saída de questao1.limpar_dados).
+
+    Returns:
+    - pyarrow.Table: Tabela pronta para ser gravada no catálogo.
+    """
+    dataframe = dataframe.replace('Nao Encontrado', None)
+    colunas = []
+    campos = []
+    for nome in dataframe.columns:
+        serie = dataframe[nome]
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            coluna = pa.array(serie, type=pa.timestamp('ms'), from_pandas=True)
+        else:
+            coluna = pa.array(serie.astype('string'), type=pa.string(), from_pandas=True)
+            if nome in COLUNAS_DICIONARIO:
+                coluna = coluna.dictionary_encode()
+        colunas.append(coluna)
+        campos.append(pa.field(nome, coluna.type))
+    return pa.Table.from_arrays(colunas, schema=pa.schema(campos))
+
+def exportar_catalogo(dataframe, console, pasta=PASTA_CATALOGO, formato='arrow'):
+    """
+    Grava (ou substitui) a partição de um console no catálogo colunar.
+
+    Cada console fica num arquivo próprio em '<pasta>/console=<nome>/', então um console pode
+    ser atualizado sem reescrever os outros.
+
+    Args:
+    - dataframe (pandas DataFrame): DataFrame limpo do console.
+    - console (str): Nome do console, usado como partição.
+    - pasta (str): Pasta raiz do catálogo.
+    - formato (str): 'arrow' (IPC, pode ser aberto com memory map) ou 'parquet' (mais compacto).
+
+    Returns:
+    - bool: True se a partição foi gravada; False sem dados, sem pyarrow ou em caso de erro.
+    """
+    if dataframe is None or not _verificar_pyarrow():
+        return False
+
+    try:
+        tabela = montar_tabela(dataframe)
+        pasta_console = os.path.join(pasta, f'console={console}')
+        os.makedirs(pasta_console, exist_ok=True)
+        destino = os.path.join(pasta_console, f'parte-0.{EXTENSOES[formato]}')
+
+        #grava num temporário e renomeia, para um leitor nunca ver o arquivo pela metade
+        temporario = f'{destino}.tmp'
+        if formato == 'parquet':
+            pq.write_table(tabela, temporario)
+        else:
+            with pa.OSFile(temporario, 'wb') as arquivo:
+                with pa.ipc.new_file(arquivo, tabela.schema) as escritor:
+                    escritor.write_table(tabela)
+        os.replace(temporario, destino)
+
+        #remove a partição no outro formato, se existir, para não ler o console duas vezes
+        for outro in EXTENSOES.values():
+            antigo = os.path.join(pasta_console, f'parte-0.{outro}')
+            if outro != EXTENSOES[formato] and os.path.exists(antigo):
+                os.remove(antigo)
+
+        print(f">>CATÁLOGO ATUALIZADO<< : {console} ({tabela.num_rows} jogos)")
+        return True
+    except Exception as e:
+        print(f">>ERRO AO EXPORTAR CATÁLOGO<< : {console}: {e}")
+        return False
+
+def abrir_catalogo(pasta=PASTA_CATALOGO, formato='arrow'):
+    """
+    Abre o catálogo como um dataset Arrow, sem ler os dados.
+
+    Os arquivos 'arrow' são abertos com memory map, então as colunas lidas apontam direto
+    para o arquivo em disco (zero cópia).
+
+    Args:
+    - pasta (str): Pasta raiz do catálogo.
+    - formato (str): Formato dos arquivos ('arrow' ou 'parquet').
+
+    Returns:
+    - pyarrow.dataset.Dataset: Dataset com a coluna de partição 'console'.
+    - None: Se o pyarrow não estiver instalado ou o catálogo não existir.
+    """
+    if not _verificar_pyarrow():
+        return None
+    if not os.path.isdir(pasta):
+        print(f">>ERRO: CATÁLOGO NÃO ENCONTRADO<< : {pasta}")
+        return None
+
+    sistema = pafs.LocalFileSystem(use_mmap=(formato == 'arrow'))
+    formato_ds = 'ipc' if formato == 'arrow' else 'parquet'
+    particoes = ds.partitioning(pa.schema([('console', pa.string())]), flavor='hive')
+    opcoes = dict(format=formato_ds, partitioning=particoes, filesystem=sistema,
+                  exclude_invalid_files=True)
+
+    dataset = ds.dataset(os.path.abspath(pasta), **opcoes)
+
+    #cada console tem colunas de lançamento diferentes: une os esquemas (só lê os metadados)
+    esquemas = [fragmento.physical_schema for fragmento in dataset.get_fragments()]
+    if not esquemas:
+        return dataset
+    esquema = pa.unify_schemas(esquemas + [particoes.schema])
+    return ds.dataset(os.path.abspath(pasta), schema=esquema, **opcoes)
+
+def carregar_catalogo(colunas=None, consoles=None, filtro=None, pasta=PASTA_CATALOGO, formato='arrow', como_pandas=False):
+    """
+    Lê do catálogo só as colunas e partições necessárias.
+
+    Args:
+    - colunas (list): Colunas a serem lidas (None = todas), por exemplo ['Título', 'Lançamento NA'].
+    - consoles (list): Consoles a serem lidos (None = todos); as outras partições nem são abertas.
+    - filtro (pyarrow.dataset.Expression): Filtro aplicado durante a leitura,
+      por exemplo ds.field('Lançamento NA') >= pa.scalar(datetime(2020, 1, 1)).
+    - pasta (str): Pasta raiz do catálogo.
+    - formato (str): Formato dos arquivos ('arrow' ou 'parquet').
+    - como_pandas (bool): Se True, devolve um DataFrame em vez de uma tabela Arrow.
+
+    Returns:
+    - pyarrow.Table ou pandas DataFrame: Dados selecionados do catálogo.
+    - None: Em caso de erro.
+    """
+    dataset = abrir_catalogo(pasta, formato)
+    if dataset is None:
+        return None
+
+    try:
+        expressao = filtro
+        if consoles is not None:
+            filtro_console = ds.field('console').isin(list(consoles))
+            expressao = filtro_console if expressao is None else expressao & filtro_console
+
+        tabela = dataset.to_table(columns=colunas, filter=expressao)
+        return tabela.to_pandas() if como_pandas else tabela
+    except Exception as e:
+        print(f">>ERRO AO LER CATÁLOGO<< : {e}")
+        return None
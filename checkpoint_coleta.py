@@ -0,0 +1,102 @@
+import os
+import sqlite3
+import time
+
+#estado de cada página da coleta da questão 1 (fica junto do cache das páginas)
+ARQUIVO_CHECKPOINT = 'Cache_Http/coleta.db'
+
+#etapas de uma página, em ordem: só avançam, e a coleta retomada recomeça cada página de onde ela parou
+ESTADOS = ['pendente', 'baixada', 'extraida', 'exportada']
+
+ESQUEMA = '''
+CREATE TABLE IF NOT EXISTS paginas (
+    console TEXT PRIMARY KEY,
+    rodada INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    assinatura TEXT NOT NULL,
+    estado TEXT NOT NULL,
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    erro TEXT,
+    atualizado_em REAL NOT NULL
+);
+'''
+
+class CheckpointColeta:
+    """
+    Checkpoint da coleta das páginas de console: o estado de cada página (pendente, baixada,
+    extraida, exportada) na rodada atual.
+
+    Uma rodada termina quando todas as páginas do registro foram exportadas; a execução seguinte
+    começa outra (revalidando todas as páginas). Se a rodada ficou incompleta (erro ou interrupção),
+    a execução seguinte a retoma e só processa as páginas que faltam. Uma página cujo registro
+    mudou (url, seletor, limpeza ou formato de saída) volta para 'pendente'.
+    """
+
+    def __init__(self, arquivo=ARQUIVO_CHECKPOINT):
+        pasta = os.path.dirname(arquivo)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        self.conexao = sqlite3.connect(arquivo)
+        self.conexao.executescript(ESQUEMA)
+        self.rodada = None
+
+    def iniciar(self, paginas, recomecar=False):
+        """
+        Abre a rodada da coleta: retoma a anterior se ela ficou incompleta, ou começa outra.
+
+        Args:
+        - paginas (dict): Console -> (url, assinatura do registro do console).
+        - recomecar (bool): Se True, começa outra rodada mesmo com a anterior incompleta.
+
+        Returns:
+        - dict: Console -> estado em que a página está ('pendente' numa rodada nova).
+        """
+        anteriores = {console: (rodada, url, assinatura, estado) for console, rodada, url, assinatura, estado
+                      in self.conexao.execute('SELECT console, rodada, url, assinatura, estado FROM paginas')}
+        ultima = max((linha[0] for linha in anteriores.values()), default=0)
+        incompleta = any(anteriores.get(console, (None, None, None, 'pendente'))[3] != 'exportada' for console in paginas)
+        retomar = bool(anteriores) and incompleta and not recomecar
+        self.rodada = ultima if retomar else ultima + 1
+
+        estados = {}
+        agora = time.time()
+        with self.conexao:
+            self.conexao.executemany('DELETE FROM paginas WHERE console = ?',
+                                     [(console,) for console in anteriores if console not in paginas])
+            for console, (url, assinatura) in paginas.items():
+                anterior = anteriores.get(console)
+                if retomar and anterior is not None and anterior[1:3] == (url, assinatura):
+                    estados[console] = anterior[3]
+                    continue
+                estados[console] = 'pendente'
+                self.conexao.execute(
+                    'INSERT OR REPLACE INTO paginas (console, rodada, url, assinatura, estado, tentativas, erro, atualizado_em) '
+                    "VALUES (?, ?, ?, ?, 'pendente', 0, NULL, ?)", (console, self.rodada, url, assinatura, agora))
+            self.conexao.execute('UPDATE paginas SET rodada = ?', (self.rodada,))
+        return estados
+
+    def marcar(self, console, estado, erro=None):
+        """
+        Grava o estado alcançado pela página; com erro, soma uma tentativa e guarda a mensagem.
+        """
+        with self.conexao:
+            self.conexao.execute('UPDATE paginas SET estado = ?, erro = ?, tentativas = tentativas + ?, atualizado_em = ? '
+                                 'WHERE console = ?', (estado, erro, int(erro is not None), time.time(), console))
+
+    def resumo(self):
+        """
+        Páginas em cada estado e as que terminaram com erro.
+
+        Returns:
+        - dict: {'estados': {estado: quantidade}, 'erros': {console: mensagem}}.
+        """
+        estados = dict.fromkeys(ESTADOS, 0)
+        erros = {}
+        for console, estado, erro in self.conexao.execute('SELECT console, estado, erro FROM paginas ORDER BY console'):
+            estados[estado] = estados.get(estado, 0) + 1
+            if erro and estado != 'exportada':
+                erros[console] = erro
+        return {'estados': estados, 'erros': erros}
+
+    def fechar(self):
+        self.conexao.close()
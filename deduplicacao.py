@@ -0,0 +1,280 @@
+import re
+import unicodedata
+from collections import Counter
+from difflib import SequenceMatcher
+from itertools import combinations
+import pandas as pd
+
+#peso de cada campo na nota de semelhança entre dois usuários (a soma é 1)
+PESOS = {'email': 0.4, 'nome_completo': 0.4, 'data_nascimento': 0.2}
+
+#nota mínima para dois registros serem considerados o mesmo usuário
+LIMIAR = 0.8
+
+#blocos maiores que isso (chaves muito comuns) são ignorados, para não voltar ao O(n²)
+TAMANHO_MAXIMO_BLOCO = 200
+
+#como escolher o valor de cada coluna no usuário unificado
+SOBREVIVENCIA = {
+    'nome_completo': 'mais_frequente',
+    'data_nascimento': 'mais_frequente',
+    'email': 'email_valido',
+    'cidade': 'ultimo',
+    'estado': 'ultimo',
+    'consoles': 'uniao',
+    'jogos_preferidos': 'uniao'
+}
+
+def normalizar_texto(texto):
+    """
+    Deixa o texto em minúsculas, sem acentos, sem pontuação e com espaços simples.
+
+    Args:
+    - texto (str): Texto original.
+
+    Returns:
+    - str: Texto normalizado ('' se o valor for nulo).
+    """
+    if not isinstance(texto, str):
+        return ''
+    texto = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii').lower()
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', texto).split())
+
+def chave_email(email):
+    """
+    Parte local do e-mail normalizada: sem domínio, sem '+tag' e sem pontuação.
+
+    'Joao.Silva+promo@example.com' e 'joao.silva@example' viram 'joaosilva'.
+    """
+    if not isinstance(email, str) or not email.strip():
+        return ''
+    local = email.strip().lower().split('@')[0].split('+')[0]
+    return re.sub(r'[^a-z0-9]', '', normalizar_texto(local))
+
+#substituições fonéticas do português, aplicadas em ordem
+_FONETICA = [
+    (r'ph', 'f'), (r'ch|sh', 'x'), (r'lh', 'l'), (r'nh', 'n'),
+    (r'c(?=[ei])', 's'), (r'g(?=[ei])', 'j'), (r'q|c', 'k'), (r'ku(?=[ei])', 'k'),
+    (r'ss|sc(?=[ei])|z|ç', 's'), (r'y', 'i'), (r'w', 'v'), (r'h', ''),
+    (r'(.)\1+', r'\1')
+]
+
+def chave_fonetica(nome):
+    """
+    Chave fonética do nome: grafias parecidas ('Luis Souza' e 'Luiz Sousa') dão a mesma chave.
+
+    Cada palavra passa pelas substituições de _FONETICA e perde as vogais depois da primeira letra.
+
+    Args:
+    - nome (str): Nome completo.
+
+    Returns:
+    - str: Chave fonética ('' se o nome for nulo).
+    """
+    palavras = []
+    for palavra in normalizar_texto(nome).split():
+        for padrao, troca in _FONETICA:
+            palavra = re.sub(padrao, troca, palavra)
+        palavras.append(palavra[:1] + re.sub(r'[aeiou]', '', palavra[1:]))
+    return ' '.join(palavras)
+
+def _semelhanca(a, b, rapida=False):
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    comparador = SequenceMatcher(None, a, b)
+    #quick_ratio é um limite superior barato de ratio
+    return comparador.quick_ratio() if rapida else comparador.ratio()
+
+def pontuar_par(a, b, pesos=PESOS, limiar=None):
+    """
+    Nota de 0 a 1 de quanto dois registros parecem ser o mesmo usuário.
+
+    Se os primeiros nomes não tiverem a mesma chave fonética (Lucas x Luiz), o nome vale 0.
+
+    Args:
+    - a, b (dict): Registros com as chaves '_email', '_nome', '_fonetica' e 'data_nascimento'.
+    - pesos (dict): Peso de cada campo.
+    - limiar (float): Se informado, devolve 0 assim que fica claro que a nota não chega ao limiar,
+      sem calcular as semelhanças exatas.
+
+    Returns:
+    - float: Nota de semelhança.
+    """
+    mesmo_primeiro_nome = a['_fonetica'].split(' ')[0] == b['_fonetica'].split(' ')[0]
+    nota_data = 1.0 if a['data_nascimento'] == b['data_nascimento'] and pd.notna(a['data_nascimento']) else 0.0
+
+    if limiar is not None:
+        maximo = (pesos['email'] * _semelhanca(a['_email'], b['_email'], rapida=True)
+                  + pesos['nome_completo'] * (_semelhanca(a['_nome'], b['_nome'], rapida=True) if mesmo_primeiro_nome else 0.0)
+                  + pesos['data_nascimento'] * nota_data)
+        if maximo < limiar:
+            return 0.0
+
+    nota_email = _semelhanca(a['_email'], b['_email'])
+    nota_nome = _semelhanca(a['_nome'], b['_nome']) if mesmo_primeiro_nome else 0.0
+
+    return (pesos['email'] * nota_email
+            + pesos['nome_completo'] * nota_nome
+            + pesos['data_nascimento'] * nota_data)
+
+def chaves_bloqueio(dataframe):
+    """
+    Calcula as chaves de bloqueio de cada registro: só registros com alguma chave igual são comparados.
+
+    Args:
+    - dataframe (pandas DataFrame): Usuários com 'email', 'nome_completo' e 'data_nascimento'.
+
+    Returns:
+    - dict: Nome da chave -> pandas Series com a chave de cada registro.
+    """
+    nome = dataframe['_nome']
+    data = dataframe['data_nascimento'].astype('string').fillna('')
+    return {
+        'email': dataframe['_email'],
+        'nome_data': (nome + '|' + data).where((nome != '') & (data != ''), ''),
+        'fonetica': dataframe['_fonetica']
+    }
+
+def pares_candidatos(dataframe, tamanho_maximo_bloco=TAMANHO_MAXIMO_BLOCO):
+    """
+    Gera os pares de registros que caem em algum bloco em comum, sem repetir pares.
+
+    Args:
+    - dataframe (pandas DataFrame): Usuários já com as colunas auxiliares de deduplicar.
+    - tamanho_maximo_bloco (int): Blocos maiores que isso são ignorados.
+
+    Returns:
+    - set: Pares (i, j) de posições, com i < j.
+    """
+    pares = set()
+    for chave in chaves_bloqueio(dataframe).values():
+        chave = chave.reset_index(drop=True)
+        for valor, posicoes in chave.groupby(chave).indices.items():
+            if not valor or len(posicoes) < 2 or len(posicoes) > tamanho_maximo_bloco:
+                continue
+            pares.update(combinations(sorted(posicoes), 2))
+    return pares
+
+def chaves_usuario(dataframe):
+    """
+    Chaves naturais de cada registro, que identificam o usuário entre execuções (ids_usuarios):
+    o e-mail normalizado e, se houver os dois, o nome normalizado com a data de nascimento.
+
+    Args:
+    - dataframe (pandas DataFrame): Usuários com 'email', 'nome_completo' e 'data_nascimento'.
+
+    Returns:
+    - list: Uma lista de chaves por registro (vazia se o registro não tiver nenhuma).
+    """
+    emails = dataframe['email'].map(chave_email)
+    nomes = dataframe['nome_completo'].map(normalizar_texto)
+    datas = dataframe['data_nascimento'].astype('string').fillna('')
+    chaves = []
+    for email, nome, data in zip(emails, nomes, datas):
+        registro = [f'email:{email}'] if email else []
+        if nome and data:
+            registro.append(f'nome_data:{nome}|{data}')
+        chaves.append(registro)
+    return chaves
+
+def _escolher(valores, regra):
+    """
+    Escolhe o valor de uma coluna entre os registros de um mesmo usuário, conforme a regra.
+    """
+    if regra == 'uniao':
+        #junta as listas sem repetir, mantendo a ordem em que os itens apareceram
+        uniao = []
+        for valor in valores:
+            if isinstance(valor, list):
+                uniao.extend(item for item in valor if item not in uniao)
+        return uniao if uniao else next((valor for valor in valores if not isinstance(valor, list)), None)
+
+    validos = [valor for valor in valores if isinstance(valor, list) or pd.notna(valor)]
+    if not validos:
+        return valores[0]
+    if regra == 'ultimo':
+        return validos[-1]
+    if regra == 'mais_frequente':
+        return Counter(validos).most_common(1)[0][0]
+    if regra == 'mais_completo':
+        return max(validos, key=lambda valor: len(str(valor)))
+    if regra == 'email_valido':
+        return next((valor for valor in validos if re.fullmatch(r'[^@\s]+@[^@\s]+\.[^@\s]+', str(valor))), validos[0])
+    return validos[0]
+
+def deduplicar(dataframe, limiar=LIMIAR, pesos=PESOS, sobrevivencia=SOBREVIVENCIA, tamanho_maximo_bloco=TAMANHO_MAXIMO_BLOCO,
+               manter_chaves=False):
+    """
+    Junta os registros que representam o mesmo usuário.
+
+    Os registros são agrupados por chaves de bloqueio (e-mail, nome + data de nascimento e chave
+    fonética do nome) e só os pares dentro de um mesmo bloco são comparados. Pares com nota
+    >= limiar são unidos (de forma transitiva) e cada grupo vira um único registro, montado com
+    as regras de sobrevivência.
+
+    Cada usuário unificado fica na posição do seu primeiro registro. Os ids vêm das chaves naturais
+    de todos os registros do grupo (manter_chaves e ids_usuarios), não da posição.
+
+    Args:
+    - dataframe (pandas DataFrame): Usuários já limpos (saída de limpar_dados).
+    - limiar (float): Nota mínima para unir dois registros.
+    - pesos (dict): Peso de cada campo na nota.
+    - sobrevivencia (dict): Regra de cada coluna ('primeiro', 'ultimo', 'mais_frequente',
+      'mais_completo', 'email_valido' ou 'uniao'); colunas fora do dicionário usam 'primeiro'.
+    - tamanho_maximo_bloco (int): Blocos maiores que isso são ignorados.
+    - manter_chaves (bool): Se True, acrescenta a coluna '_chaves' com as chaves naturais
+      (chaves_usuario) de todos os registros de cada usuário unificado.
+
+    Returns:
+    - tuple: (DataFrame sem duplicatas, número de pares candidatos avaliados).
+    """
+    if dataframe.empty:
+        return (dataframe.assign(_chaves=[]) if manter_chaves else dataframe), 0
+
+    colunas = list(dataframe.columns)
+    registros = dataframe.reset_index(drop=True)
+    registros['_email'] = registros['email'].map(chave_email)
+    registros['_nome'] = registros['nome_completo'].map(normalizar_texto)
+    registros['_fonetica'] = registros['nome_completo'].map(chave_fonetica)
+
+    pares = pares_candidatos(registros, tamanho_maximo_bloco)
+
+    #union-find: cada registro aponta para o primeiro registro do seu grupo
+    pai = list(range(len(registros)))
+    def raiz(i):
+        while pai[i] != i:
+            pai[i] = pai[pai[i]]
+            i = pai[i]
+        return i
+
+    linhas = registros.to_dict('records')
+    for i, j in pares:
+        if pontuar_par(linhas[i], linhas[j], pesos, limiar) >= limiar:
+            a, b = raiz(i), raiz(j)
+            if a != b:
+                pai[max(a, b)] = min(a, b)
+
+    grupos = {}
+    for i in range(len(linhas)):
+        grupos.setdefault(raiz(i), []).append(i)
+
+    #grupos na ordem do primeiro registro de cada um
+    unificados = []
+    for primeiro in sorted(grupos):
+        membros = grupos[primeiro]
+        if len(membros) == 1:
+            unificados.append({coluna: linhas[primeiro][coluna] for coluna in colunas})
+            continue
+        unificados.append({
+            coluna: _escolher([linhas[i][coluna] for i in membros], sobrevivencia.get(coluna, 'primeiro'))
+            for coluna in colunas
+        })
+    resultado = pd.DataFrame(unificados, columns=colunas)
+
+    if manter_chaves:
+        chaves = chaves_usuario(registros)
+        resultado['_chaves'] = [list(dict.fromkeys(chave for i in grupos[primeiro] for chave in chaves[i]))
+                                for primeiro in sorted(grupos)]
+    return resultado, len(pares)
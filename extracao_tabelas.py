@@ -0,0 +1,265 @@
+import re
+import time
+import tracemalloc
+from html.parser import HTMLParser
+import pandas as pd
+
+#mesmo tratamento de espaços que o pd.read_html aplica no texto de cada célula
+_RE_ESPACOS = re.compile(r"[\r\n]+|\s{2,}")
+
+#tamanho (em caracteres) de cada pedaço do HTML entregue ao parser
+TAMANHO_BLOCO = 64 * 1024
+
+#tags que não têm fechamento e por isso nunca entram na pilha de elementos ocultos
+_TAGS_VAZIAS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+
+class ExtratorTabela(HTMLParser):
+    """
+    Parser incremental que localiza uma única tabela no HTML e monta suas linhas numa só passada.
+
+    A tabela é encontrada pelo atributo id ou pelo atributo class (mesmas classes, em qualquer ordem).
+    Tudo o que vem antes da tabela é ignorado e, depois que ela fecha, o resto do documento não é mais lido.
+    Células com rowspan/colspan são repetidas como no pd.read_html e o conteúdo de elementos com
+    'display:none' (chaves de ordenação da Wikipédia) é descartado.
+    """
+
+    def __init__(self, id_tabela=None, classe=None):
+        super().__init__(convert_charrefs=True)
+        self.id_tabela = id_tabela
+        self.classes = set(classe.split()) if classe else None
+        self.concluido = False
+        self.linhas = []  #lista de (celulas, so_cabecalho); cada célula é (texto, rowspan, colspan)
+        self._profundidade = 0  #0 = fora da tabela alvo; >1 = dentro de tabelas aninhadas
+        self._linha = None
+        self._celula = None
+        self._ocultos = []  #pilha de tags abertas com display:none
+
+    def _e_alvo(self, atributos):
+        if self.id_tabela is not None:
+            return atributos.get('id') == self.id_tabela
+        if self.classes is not None:
+            return set((atributos.get('class') or '').split()) == self.classes
+        return False
+
+    def handle_starttag(self, tag, attrs):
+        if self.concluido:
+            return
+        atributos = dict(attrs)
+
+        if self._profundidade == 0:
+            if tag == 'table' and self._e_alvo(atributos):
+                self._profundidade = 1
+            return
+
+        if tag == 'table':
+            self._profundidade += 1
+
+        if self._ocultos or 'display:none' in (atributos.get('style') or '').replace(' ', ''):
+            if tag not in _TAGS_VAZIAS:
+                self._ocultos.append(tag)
+            return
+
+        #só as linhas e células da tabela alvo, não das tabelas aninhadas
+        if self._profundidade != 1:
+            return
+        if tag == 'tr':
+            self._fechar_linha()
+            self._linha = []
+        elif tag in ('td', 'th'):
+            if self._linha is None:
+                self._linha = []
+            self._fechar_celula()
+            self._celula = {
+                'tag': tag,
+                'texto': [],
+                'rowspan': _inteiro(atributos.get('rowspan')),
+                'colspan': _inteiro(atributos.get('colspan'))
+            }
+
+    def handle_endtag(self, tag):
+        if self.concluido or self._profundidade == 0:
+            return
+
+        if self._ocultos:
+            if self._ocultos[-1] == tag:
+                self._ocultos.pop()
+            if tag != 'table':
+                return
+
+        if tag == 'table':
+            self._profundidade -= 1
+            if self._profundidade == 0:
+                self._fechar_linha()
+                self.concluido = True
+        elif self._profundidade == 1:
+            if tag in ('td', 'th'):
+                self._fechar_celula()
+            elif tag == 'tr':
+                self._fechar_linha()
+
+    def handle_data(self, data):
+        if self._celula is not None and not self._ocultos:
+            self._celula['texto'].append(data)
+
+    def _fechar_celula(self):
+        if self._celula is None:
+            return
+        texto = _RE_ESPACOS.sub(' ', ''.join(self._celula['texto']).strip())
+        self._linha.append((texto, self._celula['rowspan'], self._celula['colspan'], self._celula['tag'] == 'th'))
+        self._celula = None
+
+    def _fechar_linha(self):
+        if self._linha is None:
+            return
+        self._fechar_celula()
+        self.linhas.append(self._linha)
+        self._linha = None
+
+def _inteiro(valor):
+    """
+    Converte um atributo rowspan/colspan para int (1 se ausente ou inválido).
+    """
+    try:
+        return max(int(valor), 1)
+    except (TypeError, ValueError):
+        return 1
+
+def _expandir_spans(linhas):
+    """
+    Repete as células com rowspan/colspan nas posições que elas ocupam, como o pd.read_html.
+
+    Args:
+    - linhas (list): Linhas do ExtratorTabela, cada uma uma lista de (texto, rowspan, colspan, e_th).
+
+    Returns:
+    - list: Lista de (valores, so_cabecalho) com as linhas já expandidas.
+    """
+    expandidas = []
+    pendentes = {}  #coluna -> [texto, linhas restantes, e_th]
+
+    for linha in linhas:
+        valores = []
+        cabecalhos = []
+        coluna = 0
+        celulas = iter(linha)
+
+        while True:
+            #células de linhas anteriores que ainda ocupam esta coluna (rowspan)
+            while coluna in pendentes:
+                texto, restantes, e_th = pendentes[coluna]
+                valores.append(texto)
+                cabecalhos.append(e_th)
+                if restantes <= 1:
+                    del pendentes[coluna]
+                else:
+                    pendentes[coluna] = [texto, restantes - 1, e_th]
+                coluna += 1
+
+            celula = next(celulas, None)
+            if celula is None:
+                break
+            texto, rowspan, colspan, e_th = celula
+            for _ in range(colspan):
+                valores.append(texto)
+                cabecalhos.append(e_th)
+                if rowspan > 1:
+                    pendentes[coluna] = [texto, rowspan - 1, e_th]
+                coluna += 1
+
+        expandidas.append((valores, bool(valores) and all(cabecalhos)))
+
+    return expandidas
+
+def montar_dataframe(linhas):
+    """
+    Monta o DataFrame a partir das linhas extraídas.
+
+    As primeiras linhas formadas só por <th> viram o cabeçalho (MultiIndex se forem mais de uma),
+    como no pd.read_html. Células vazias viram NaN e os valores ficam como texto.
+
+    Args:
+    - linhas (list): Linhas do ExtratorTabela.
+
+    Returns:
+    - pandas DataFrame: DataFrame da tabela, ou None se a tabela não tiver linhas.
+    """
+    expandidas = _expandir_spans(linhas)
+    if not expandidas:
+        return None
+
+    cabecalho = []
+    while expandidas and expandidas[0][1]:
+        cabecalho.append(expandidas.pop(0)[0])
+
+    corpo = [valores for valores, _ in expandidas if valores]
+    largura = max([len(valores) for valores in cabecalho + corpo] or [0])
+
+    #completa linhas mais curtas e troca células vazias por NaN, como o read_html
+    corpo = [[valor or float('nan') for valor in valores] + [float('nan')] * (largura - len(valores)) for valores in corpo]
+    cabecalho = [valores + [''] * (largura - len(valores)) for valores in cabecalho]
+
+    if len(cabecalho) > 1:
+        colunas = pd.MultiIndex.from_arrays(cabecalho)
+    elif cabecalho:
+        colunas = cabecalho[0]
+    else:
+        colunas = list(range(largura))
+
+    return pd.DataFrame(corpo, columns=colunas, dtype=object)
+
+def extrair_dataframe(fonte, id_tabela=None, classe=None, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Lê o HTML em pedaços, localiza a tabela alvo e monta o DataFrame numa única passada.
+
+    Args:
+    - fonte (str ou iterável de str): HTML completo ou pedaços do HTML (por exemplo, vindos da rede).
+    - id_tabela (str): Atributo id da tabela procurada.
+    - classe (str): Atributo class da tabela procurada, usado se id_tabela for None.
+    - tamanho_bloco (int): Tamanho dos pedaços quando a fonte é uma string.
+
+    Returns:
+    - pandas DataFrame: DataFrame da tabela.
+    - None: Se a tabela não for encontrada.
+    """
+    if isinstance(fonte, str):
+        html = fonte
+        fonte = (html[i:i + tamanho_bloco] for i in range(0, len(html), tamanho_bloco))
+
+    extrator = ExtratorTabela(id_tabela=id_tabela, classe=classe)
+    for pedaco in fonte:
+        extrator.feed(pedaco)
+        #a tabela já fechou, não precisa ler o resto da página
+        if extrator.concluido:
+            break
+
+    if not extrator.concluido and extrator._profundidade == 0:
+        print(f">>ERRO: TABELA NÃO ENCONTRADA<< id={id_tabela} class={classe}")
+        return None
+
+    extrator._fechar_linha()
+    return montar_dataframe(extrator.linhas)
+
+def medir(funcao, *args, **kwargs):
+    """
+    Executa a função medindo o tempo e o pico de memória alocada pelo Python durante a execução.
+
+    Args:
+    - funcao (callable): Função a ser executada.
+    - *args, **kwargs: Argumentos repassados para a função.
+
+    Returns:
+    - tuple: (resultado da função, tempo em segundos, pico de memória em bytes).
+    """
+    ja_rastreando = tracemalloc.is_tracing()
+    if not ja_rastreando:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    inicio = time.perf_counter()
+    try:
+        resultado = funcao(*args, **kwargs)
+    finally:
+        tempo = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        if not ja_rastreando:
+            tracemalloc.stop()
+    return resultado, tempo, pico
@@ -0,0 +1,176 @@
+import hashlib
+from itertools import chain
+import numpy as np
+import pandas as pd
+
+#dimensões padrão do count-min sketch: erro <= total / LARGURA com probabilidade 1 - 2^-PROFUNDIDADE
+LARGURA_SKETCH = 2 ** 16
+PROFUNDIDADE_SKETCH = 5
+
+#quantos candidatos a jogo mais frequente o modo aproximado acompanha
+CAPACIDADE_CANDIDATOS = 1000
+
+def contar_jogos(listas):
+    """
+    Conta, numa passada vetorizada, quantos usuários citaram cada jogo.
+
+    Os títulos são codificados como inteiros (pd.factorize), os pares (usuário, jogo) repetidos
+    são descartados com pd.unique e a contagem sai de um np.bincount, sem laço em Python.
+
+    Args:
+    - listas (pandas Series): Uma lista de títulos por usuário (valores que não são lista são ignorados).
+
+    Returns:
+    - pandas Series: Número de usuários por título, da maior contagem para a menor.
+    """
+    listas = [valor for valor in listas if isinstance(valor, list)]
+    titulos = np.array(list(chain.from_iterable(listas)), dtype=object)
+    if len(titulos) == 0:
+        return pd.Series(dtype='int64', name='usuarios', index=pd.Index([], name='jogo'))
+
+    #posição do usuário de cada título, sem o explode (que é lento por inferir o tipo do texto)
+    tamanhos = np.fromiter(map(len, listas), dtype=np.int64, count=len(listas))
+    usuarios = np.repeat(np.arange(len(listas), dtype=np.int64), tamanhos)
+    codigos, unicos = pd.factorize(titulos)
+
+    #cada usuário conta uma vez por jogo, mesmo que tenha repetido o título
+    pares = pd.unique(usuarios * len(unicos) + codigos)
+    contagens = np.bincount(pares % len(unicos), minlength=len(unicos))
+
+    #empates ficam em ordem alfabética
+    serie = pd.Series(contagens, index=pd.Index(unicos, name='jogo', dtype=object), name='usuarios').sort_index()
+    return serie.sort_values(ascending=False, kind='stable')
+
+class FrequenciaJogos:
+    """
+    Consultas exatas sobre a contagem de usuários por jogo (saída de contar_jogos).
+    """
+
+    def __init__(self, contagens):
+        self.contagens = contagens
+
+    @classmethod
+    def de_listas(cls, listas):
+        return cls(contar_jogos(listas))
+
+    def todos(self):
+        return set(self.contagens.index)
+
+    def top_k(self, k):
+        """
+        Os k jogos mais citados; empates na k-ésima posição ficam de fora, na ordem alfabética.
+        """
+        return self.contagens.head(k)
+
+    def com_frequencia(self, minimo=None, maximo=None):
+        """
+        Jogos citados por pelo menos 'minimo' e no máximo 'maximo' usuários (None = sem limite).
+        """
+        filtro = pd.Series(True, index=self.contagens.index)
+        if minimo is not None:
+            filtro &= self.contagens >= minimo
+        if maximo is not None:
+            filtro &= self.contagens <= maximo
+        return self.contagens[filtro]
+
+    def unicos(self):
+        """
+        Jogos citados por apenas um usuário.
+        """
+        return set(self.com_frequencia(maximo=1).index)
+
+    def mais_frequentes(self):
+        """
+        Todos os jogos empatados com a maior contagem.
+        """
+        if self.contagens.empty:
+            return set()
+        return set(self.com_frequencia(minimo=self.contagens.iloc[0]).index)
+
+class ContagemAproximada:
+    """
+    Contagem aproximada de usuários por jogo com memória limitada, para entradas grandes demais
+    para um contador completo.
+
+    Um count-min sketch estima a contagem de qualquer título (nunca para menos; para mais em no
+    máximo total / largura, com alta probabilidade) e um conjunto limitado de candidatos guarda
+    os títulos com as maiores estimativas (heavy hitters). Os dados entram em blocos com adicionar.
+    """
+
+    def __init__(self, largura=LARGURA_SKETCH, profundidade=PROFUNDIDADE_SKETCH, capacidade=CAPACIDADE_CANDIDATOS):
+        self.largura = largura
+        self.profundidade = profundidade
+        self.capacidade = capacidade
+        self.tabela = np.zeros((profundidade, largura), dtype=np.int64)
+        self.candidatos = {}  #título -> contagem estimada
+        self.total = 0
+
+    def _posicoes(self, titulos):
+        """
+        Colunas do sketch de cada título em cada linha (hash duplo: h1 + i * h2).
+        """
+        digestos = np.array([
+            np.frombuffer(hashlib.blake2b(titulo.encode('utf-8'), digest_size=16).digest(), dtype=np.uint64)
+            for titulo in titulos
+        ]).reshape(-1, 2)
+        linhas = np.arange(self.profundidade, dtype=np.uint64)[:, None]
+        return ((digestos[:, 0] + linhas * (digestos[:, 1] | np.uint64(1))) % np.uint64(self.largura)).astype(np.int64)
+
+    def adicionar(self, listas):
+        """
+        Soma ao sketch um bloco de usuários.
+
+        Args:
+        - listas (pandas Series): Uma lista de títulos por usuário.
+        """
+        contagens = contar_jogos(listas)
+        if contagens.empty:
+            return
+        titulos = list(contagens.index)
+        posicoes = self._posicoes(titulos)
+        for linha in range(self.profundidade):
+            np.add.at(self.tabela[linha], posicoes[linha], contagens.to_numpy())
+        self.total += int(contagens.sum())
+
+        #reestima os candidatos antigos e os títulos do bloco e fica só com os maiores
+        nomes = list(dict.fromkeys(list(self.candidatos) + titulos))
+        estimativas = self._estimar_posicoes(self._posicoes(nomes))
+        if len(nomes) > self.capacidade:
+            manter = np.argpartition(-estimativas, self.capacidade - 1)[:self.capacidade]
+        else:
+            manter = np.arange(len(nomes))
+        self.candidatos = {nomes[i]: int(estimativas[i]) for i in manter}
+
+    def _estimar_posicoes(self, posicoes):
+        return self.tabela[np.arange(self.profundidade)[:, None], posicoes].min(axis=0)
+
+    def estimar(self, titulo):
+        """
+        Estimativa (limite superior) do número de usuários que citaram o título.
+        """
+        return int(self._estimar_posicoes(self._posicoes([titulo]))[0])
+
+    def top_k(self, k):
+        """
+        Os k candidatos com maior contagem estimada.
+        """
+        serie = pd.Series(self.candidatos, dtype='int64', name='usuarios')
+        serie.index.name = 'jogo'
+        return serie.sort_index().sort_values(ascending=False, kind='stable').head(k)
+
+    def com_frequencia(self, minimo):
+        """
+        Candidatos com contagem estimada >= minimo (só é confiável para limiares altos,
+        já que títulos raros não ficam entre os candidatos).
+        """
+        serie = self.top_k(len(self.candidatos))
+        return serie[serie >= minimo]
+
+    def mais_frequentes(self):
+        """
+        Candidatos empatados com a maior contagem estimada.
+        """
+        if not self.candidatos:
+            return set()
+        maximo = max(self.candidatos.values())
+        return {titulo for titulo, contagem in self.candidatos.items() if contagem == maximo}
@@ -0,0 +1,311 @@
+import sqlite3
+import time
+
+#o histórico fica no mesmo banco da questão 4
+BANCO_PRECOS = 'mercado_livre.db'
+
+#observações gravadas por transação
+TAMANHO_LOTE = 500
+
+#série temporal compacta: só inteiros (id do anúncio, segundos desde 1970, centavos) e uma linha
+#por mudança de preço; a chave (anuncio_id, observado_em) já é o índice das consultas por período.
+#um anúncio pode aparecer na busca de mais de um jogo: jogos_anuncios guarda o estado de cada par
+#(jogo, anúncio) e presencas as entradas (presente = 1) e saídas (presente = 0) do anúncio na busca do jogo
+ESQUEMA = '''
+CREATE TABLE IF NOT EXISTS jogos_monitorados (
+    id INTEGER PRIMARY KEY,
+    titulo TEXT NOT NULL UNIQUE,
+    consultado_em INTEGER
+);
+CREATE TABLE IF NOT EXISTS anuncios (
+    id INTEGER PRIMARY KEY,
+    item TEXT NOT NULL UNIQUE,
+    titulo TEXT,
+    permalink TEXT,
+    preco_centavos INTEGER,
+    visto_em INTEGER
+);
+CREATE TABLE IF NOT EXISTS jogos_anuncios (
+    jogo_id INTEGER NOT NULL REFERENCES jogos_monitorados(id),
+    anuncio_id INTEGER NOT NULL REFERENCES anuncios(id),
+    visto_em INTEGER NOT NULL,
+    fora_em INTEGER,
+    PRIMARY KEY (jogo_id, anuncio_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS presencas (
+    jogo_id INTEGER NOT NULL,
+    anuncio_id INTEGER NOT NULL,
+    observado_em INTEGER NOT NULL,
+    presente INTEGER NOT NULL,
+    PRIMARY KEY (jogo_id, anuncio_id, observado_em)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS historico_precos (
+    anuncio_id INTEGER NOT NULL REFERENCES anuncios(id),
+    observado_em INTEGER NOT NULL,
+    preco_centavos INTEGER NOT NULL,
+    PRIMARY KEY (anuncio_id, observado_em)
+) WITHOUT ROWID;
+'''
+
+#preço de cada anúncio do jogo em cada trecho [de, ate) entre duas mudanças, recortado a [inicio, fim],
+#contando só os trechos em que o anúncio estava (em algum momento) na busca do jogo
+_CONSULTA_FAIXA = '''
+WITH trechos AS (
+    SELECT ja.jogo_id, ja.anuncio_id, h.preco_centavos,
+           MAX(h.observado_em, :inicio) AS de,
+           MIN(COALESCE(LEAD(h.observado_em) OVER (PARTITION BY h.anuncio_id ORDER BY h.observado_em), :fim + 1), :fim + 1) AS ate
+    FROM jogos_anuncios ja
+    JOIN jogos_monitorados j ON j.id = ja.jogo_id
+    JOIN historico_precos h ON h.anuncio_id = ja.anuncio_id
+    WHERE j.titulo = :jogo AND h.observado_em <= :fim
+)
+SELECT MIN(t.preco_centavos), MAX(t.preco_centavos) FROM trechos t
+WHERE t.de < t.ate AND (
+    (SELECT p.presente FROM presencas p WHERE p.jogo_id = t.jogo_id AND p.anuncio_id = t.anuncio_id AND p.observado_em <= t.de
+     ORDER BY p.observado_em DESC LIMIT 1) = 1
+    OR EXISTS (SELECT 1 FROM presencas p WHERE p.jogo_id = t.jogo_id AND p.anuncio_id = t.anuncio_id AND p.presente = 1
+               AND p.observado_em > t.de AND p.observado_em < t.ate)
+)
+'''
+
+def centavos(preco):
+    """
+    Preço em reais (float ou texto) como inteiro de centavos (None se não houver preço).
+    """
+    if preco is None:
+        return None
+    return int(round(float(preco) * 100))
+
+class HistoricoPrecos:
+    """
+    Histórico de preços de todos os anúncios encontrados para cada jogo monitorado.
+
+    Cada busca atualiza o preço atual dos anúncios (anuncios.preco_centavos), mas só grava uma linha
+    em historico_precos quando o preço de um anúncio muda (ou quando o anúncio aparece pela primeira vez):
+    o histórico cresce com o número de mudanças, não com o número de execuções.
+
+    O mesmo anúncio pode vir na busca de mais de um jogo ('Dark Souls' e 'Dark Souls: Remastered'):
+    a presença é registrada por par (jogo, anúncio). Um anúncio que deixa de aparecer na busca de um jogo
+    é marcado como fora dela só para esse jogo (jogos_anuncios.fora_em e uma saída em presencas): a partir
+    dali o preço dele não conta mais nas consultas desse jogo, até ele voltar a aparecer. Um resultado
+    sem preço mantém o preço anterior do anúncio.
+
+    As observações são acumuladas e gravadas em lotes, como em questao4.GravadorResultados.
+    """
+
+    def __init__(self, nome_banco=BANCO_PRECOS, tamanho_lote=TAMANHO_LOTE):
+        self.conexao = sqlite3.connect(nome_banco)
+        #WAL (fica gravado no arquivo) => o serviço de consultas lê os preços enquanto a questão 4 grava
+        self.conexao.execute('PRAGMA journal_mode=WAL')
+        self.conexao.execute('PRAGMA synchronous=NORMAL')
+        self.conexao.executescript(ESQUEMA)
+        self._migrar()
+        self.tamanho_lote = tamanho_lote
+        self.pendentes = []
+        self.observados = 0
+        self.mudancas = 0
+
+    def _migrar(self):
+        """
+        Atualiza as tabelas das versões anteriores, em que cada anúncio pertencia a um só jogo
+        (anuncios.jogo_id) e as saídas da busca eram linhas de preço nulo no histórico.
+
+        Os vínculos viram linhas de jogos_anuncios, com a entrada na busca no primeiro preço gravado
+        (ou na última vez em que o anúncio foi visto) e a saída em anuncios.fora_em.
+        """
+        colunas = {linha[1] for linha in self.conexao.execute('PRAGMA table_info(anuncios)')}
+        if 'jogo_id' not in colunas:
+            return
+        fora_em = 'fora_em' if 'fora_em' in colunas else 'NULL'
+        #tabelas novas criadas ao lado e renomeadas no fim: renomear a antiga mudaria as referências das outras
+        self.conexao.executescript(f'''
+            BEGIN;
+            INSERT OR IGNORE INTO jogos_anuncios (jogo_id, anuncio_id, visto_em, fora_em)
+                SELECT jogo_id, id, COALESCE(visto_em, 0), {fora_em} FROM anuncios;
+            INSERT OR IGNORE INTO presencas (jogo_id, anuncio_id, observado_em, presente)
+                SELECT a.jogo_id, a.id, COALESCE((SELECT MIN(observado_em) FROM historico_precos WHERE anuncio_id = a.id), a.visto_em, 0), 1
+                FROM anuncios a;
+            INSERT OR REPLACE INTO presencas (jogo_id, anuncio_id, observado_em, presente)
+                SELECT jogo_id, id, {fora_em}, 0 FROM anuncios WHERE {fora_em} IS NOT NULL;
+            CREATE TABLE anuncios_novo (
+                id INTEGER PRIMARY KEY,
+                item TEXT NOT NULL UNIQUE,
+                titulo TEXT,
+                permalink TEXT,
+                preco_centavos INTEGER,
+                visto_em INTEGER
+            );
+            INSERT INTO anuncios_novo SELECT id, item, titulo, permalink, preco_centavos, visto_em FROM anuncios;
+            DROP TABLE anuncios;
+            ALTER TABLE anuncios_novo RENAME TO anuncios;
+            CREATE TABLE historico_precos_novo (
+                anuncio_id INTEGER NOT NULL REFERENCES anuncios(id),
+                observado_em INTEGER NOT NULL,
+                preco_centavos INTEGER NOT NULL,
+                PRIMARY KEY (anuncio_id, observado_em)
+            ) WITHOUT ROWID;
+            INSERT INTO historico_precos_novo
+                SELECT anuncio_id, observado_em, preco_centavos FROM historico_precos WHERE preco_centavos IS NOT NULL;
+            DROP TABLE historico_precos;
+            ALTER TABLE historico_precos_novo RENAME TO historico_precos;
+            COMMIT;
+        ''')
+
+    def registrar(self, jogo, resultados, momento=None):
+        """
+        Guarda os anúncios devolvidos por uma busca.
+
+        Args:
+        - jogo (str): Título buscado.
+        - resultados (list): 'results' da resposta da API (dicts com 'id', 'title', 'price', 'permalink').
+        - momento (int): Instante da observação em segundos desde 1970 (None = agora).
+        """
+        momento = int(time.time() if momento is None else momento)
+        anuncios = [(str(resultado['id']), resultado.get('title'), resultado.get('permalink'), centavos(resultado.get('price')))
+                    for resultado in resultados if resultado.get('id') is not None]
+        self.pendentes.append((jogo, momento, anuncios))
+        if len(self.pendentes) >= self.tamanho_lote:
+            self.descarregar()
+
+    def descarregar(self):
+        """
+        Grava as observações pendentes numa só transação.
+
+        Os anúncios que estavam na busca anterior do jogo e não vieram nesta são marcados como fora dela
+        (só para esse jogo).
+
+        Returns:
+        - int: Mudanças de preço gravadas no histórico.
+        """
+        if not self.pendentes:
+            return 0
+        mudancas = 0
+        with self.conexao:
+            for jogo, momento, anuncios in self.pendentes:
+                self.conexao.execute(
+                    'INSERT INTO jogos_monitorados (titulo, consultado_em) VALUES (?, ?) '
+                    'ON CONFLICT(titulo) DO UPDATE SET consultado_em = excluded.consultado_em',
+                    (jogo, momento)
+                )
+                jogo_id = self.conexao.execute('SELECT id FROM jogos_monitorados WHERE titulo = ?', (jogo,)).fetchone()[0]
+                ausentes = {anuncio_id for (anuncio_id,) in self.conexao.execute(
+                    'SELECT anuncio_id FROM jogos_anuncios WHERE jogo_id = ? AND fora_em IS NULL', (jogo_id,))}
+
+                for item, titulo, permalink, preco in anuncios:
+                    linha = self.conexao.execute('SELECT id, preco_centavos FROM anuncios WHERE item = ?', (item,)).fetchone()
+                    if linha is None:
+                        anuncio_id = self.conexao.execute(
+                            'INSERT INTO anuncios (item, titulo, permalink, preco_centavos, visto_em) VALUES (?, ?, ?, ?, ?)',
+                            (item, titulo, permalink, preco, momento)
+                        ).lastrowid
+                        anterior = None
+                    else:
+                        anuncio_id, anterior = linha
+                        #resultado sem preço: mantém o anterior
+                        self.conexao.execute(
+                            'UPDATE anuncios SET titulo = ?, permalink = ?, preco_centavos = COALESCE(?, preco_centavos), '
+                            'visto_em = ? WHERE id = ?',
+                            (titulo, permalink, preco, momento, anuncio_id)
+                        )
+                    atual = anterior if preco is None else preco
+
+                    #só muda o histórico se o preço mudou
+                    if atual is not None and (linha is None or atual != anterior):
+                        self.conexao.execute(
+                            'INSERT OR REPLACE INTO historico_precos (anuncio_id, observado_em, preco_centavos) VALUES (?, ?, ?)',
+                            (anuncio_id, momento, atual)
+                        )
+                        mudancas += 1
+
+                    #presença do anúncio na busca deste jogo: entrada só se ele não estava nela
+                    if anuncio_id in ausentes:
+                        ausentes.discard(anuncio_id)
+                    else:
+                        self.conexao.execute(
+                            'INSERT OR REPLACE INTO presencas (jogo_id, anuncio_id, observado_em, presente) VALUES (?, ?, ?, 1)',
+                            (jogo_id, anuncio_id, momento)
+                        )
+                    self.conexao.execute(
+                        'INSERT INTO jogos_anuncios (jogo_id, anuncio_id, visto_em, fora_em) VALUES (?, ?, ?, NULL) '
+                        'ON CONFLICT(jogo_id, anuncio_id) DO UPDATE SET visto_em = excluded.visto_em, fora_em = NULL',
+                        (jogo_id, anuncio_id, momento)
+                    )
+
+                #anúncios que saíram da busca do jogo: o preço deles deixa de valer para ele a partir de agora
+                self.conexao.executemany('UPDATE jogos_anuncios SET fora_em = ? WHERE jogo_id = ? AND anuncio_id = ?',
+                                         [(momento, jogo_id, anuncio_id) for anuncio_id in ausentes])
+                self.conexao.executemany(
+                    'INSERT OR REPLACE INTO presencas (jogo_id, anuncio_id, observado_em, presente) VALUES (?, ?, ?, 0)',
+                    [(jogo_id, anuncio_id, momento) for anuncio_id in ausentes]
+                )
+                self.observados += len(anuncios)
+        self.mudancas += mudancas
+        self.pendentes = []
+        return mudancas
+
+    def ultimo_preco(self, jogo):
+        """
+        Menor preço entre os anúncios encontrados na última busca do jogo.
+
+        Returns:
+        - dict: {'preco' (reais), 'item', 'titulo', 'permalink', 'visto_em'}.
+        - None: Se o jogo nunca foi buscado ou não teve anúncios com preço.
+        """
+        linha = self.conexao.execute(
+            'SELECT a.preco_centavos, a.item, a.titulo, a.permalink, ja.visto_em '
+            'FROM jogos_monitorados j JOIN jogos_anuncios ja ON ja.jogo_id = j.id JOIN anuncios a ON a.id = ja.anuncio_id '
+            'WHERE j.titulo = ? AND ja.visto_em = j.consultado_em AND a.preco_centavos IS NOT NULL '
+            'ORDER BY a.preco_centavos, a.id LIMIT 1',
+            (jogo,)
+        ).fetchone()
+        if linha is None:
+            return None
+        return {'preco': linha[0] / 100, 'item': linha[1], 'titulo': linha[2], 'permalink': linha[3], 'visto_em': linha[4]}
+
+    def _faixa(self, jogo, inicio, fim):
+        minimo, maximo = self.conexao.execute(_CONSULTA_FAIXA, {'jogo': jogo, 'inicio': int(inicio), 'fim': int(fim)}).fetchone()
+        if minimo is None:
+            return None, None
+        return minimo / 100, maximo / 100
+
+    def preco_em(self, jogo, momento):
+        """
+        Menor preço do jogo num instante: o último preço gravado de cada anúncio até 'momento'
+        (como o histórico só guarda mudanças, esse era o preço vigente). Só contam os anúncios que
+        estavam na busca do jogo naquele instante.
+
+        Uma só consulta para todos os anúncios do jogo.
+
+        Returns:
+        - float: Preço em reais, ou None se não havia anúncio com preço até 'momento'.
+        """
+        return self._faixa(jogo, momento, momento)[0]
+
+    def extremos(self, jogo, inicio, fim=None):
+        """
+        Menor e maior preço dos anúncios do jogo entre 'inicio' e 'fim' (segundos desde 1970).
+
+        Inclui o preço vigente no início do período, gravado antes dele, e só os preços do tempo em que
+        o anúncio estava na busca do jogo.
+
+        Returns:
+        - tuple: (mínimo, máximo) em reais, ou (None, None) se não houver preço no período.
+        """
+        return self._faixa(jogo, inicio, time.time() if fim is None else fim)
+
+    def variacao(self, jogo, inicio, fim=None):
+        """
+        Variação percentual do menor preço do jogo entre 'inicio' e 'fim' (None = agora).
+
+        Returns:
+        - float: Variação em % (negativa = ficou mais barato), ou None se faltar preço em uma das pontas.
+        """
+        antes = self.preco_em(jogo, inicio)
+        depois = self.preco_em(jogo, time.time() if fim is None else fim)
+        if not antes or depois is None:
+            return None
+        return round((depois - antes) / antes * 100, 2)
+
+    def fechar(self):
+        self.descarregar()
+        self.conexao.close()
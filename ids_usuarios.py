@@ -0,0 +1,96 @@
+import os
+import sqlite3
+from collections import Counter
+
+#ids dos usuários por chave natural, ao lado dos arquivos de usuários
+ARQUIVO_IDS = 'Usuarios/usuarios_ids.db'
+
+#consultas com até tantas chaves por vez (limite de parâmetros do SQLite)
+TAMANHO_CONSULTA = 500
+
+ESQUEMA = '''
+CREATE TABLE IF NOT EXISTS ids (
+    chave TEXT PRIMARY KEY,
+    id INTEGER NOT NULL
+);
+'''
+
+class IdsUsuarios:
+    """
+    Ids estáveis dos usuários da questão 2: cada chave natural (e-mail normalizado, nome + data de
+    nascimento; ver deduplicacao.chaves_usuario) fica ligada ao id que recebeu na primeira vez.
+
+    Um usuário recebe o id mais antigo entre os das suas chaves que ainda não foi usado nesta execução;
+    sem nenhum, recebe um id novo (maior que todos os já dados, então ids de usuários removidos não voltam).
+    Assim inserir, remover ou reordenar registros não muda o id dos outros usuários, e dois usuários
+    unidos pela deduplicação ficam com o id do mais antigo.
+
+    Uma instância vale por uma execução (as chaves repetidas são contadas entre as chamadas de atribuir).
+    """
+
+    def __init__(self, arquivo=ARQUIVO_IDS):
+        pasta = os.path.dirname(arquivo)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        self.conexao = sqlite3.connect(arquivo)
+        self.conexao.executescript(ESQUEMA)
+        self.proximo = (self.conexao.execute('SELECT MAX(id) FROM ids').fetchone()[0] or 0) + 1
+        self.ocorrencias = Counter()
+        self.usados = set()
+        self.novos = 0
+
+    def _numerar(self, chaves):
+        """
+        Chaves do usuário, com '#n' na n-ésima vez que a mesma chave aparece nesta execução
+        (registros iguais não deduplicados, ou sem chave nenhuma, mantêm o id pela ordem).
+        """
+        numeradas = []
+        for chave in dict.fromkeys(chaves or ['sem_chave']):
+            self.ocorrencias[chave] += 1
+            vez = self.ocorrencias[chave]
+            numeradas.append(chave if vez == 1 else f'{chave}#{vez}')
+        return numeradas
+
+    def _consultar(self, chaves):
+        conhecidos = {}
+        chaves = list(chaves)
+        for inicio in range(0, len(chaves), TAMANHO_CONSULTA):
+            parte = chaves[inicio:inicio + TAMANHO_CONSULTA]
+            conhecidos.update(self.conexao.execute(
+                f"SELECT chave, id FROM ids WHERE chave IN ({', '.join('?' * len(parte))})", parte))
+        return conhecidos
+
+    def atribuir(self, chaves):
+        """
+        Dá um id a cada usuário, na ordem recebida, e grava as chaves novas (ou que mudaram de id).
+
+        Args:
+        - chaves (list): Uma lista de chaves naturais por usuário.
+
+        Returns:
+        - list: Id de cada usuário.
+        """
+        numeradas = [self._numerar(chaves_usuario) for chaves_usuario in chaves]
+        conhecidos = self._consultar({chave for usuario in numeradas for chave in usuario})
+
+        ids, gravar = [], []
+        for usuario in numeradas:
+            candidatos = [conhecidos[chave] for chave in usuario if chave in conhecidos and conhecidos[chave] not in self.usados]
+            if candidatos:
+                id_usuario = min(candidatos)
+            else:
+                id_usuario = self.proximo
+                self.proximo += 1
+                self.novos += 1
+            self.usados.add(id_usuario)
+            ids.append(id_usuario)
+            gravar.extend((chave, id_usuario) for chave in usuario if conhecidos.get(chave) != id_usuario)
+
+        #só grava o que mudou: sem usuários novos, o arquivo não é alterado
+        if gravar:
+            with self.conexao:
+                self.conexao.executemany('INSERT OR REPLACE INTO ids (chave, id) VALUES (?, ?)', gravar)
+        return ids
+
+    def fechar(self):
+        self.conexao.close()
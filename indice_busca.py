@@ -0,0 +1,304 @@
+import bisect
+import glob
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from canonizacao_titulos import PADRAO_CATALOGOS, normalizar_titulo
+
+#um segmento por console (arrays .npy abertos com mmap) e o manifesto com o hash de cada CSV
+PASTA_INDICE = 'Indice_Busca'
+ARQUIVO_MANIFESTO = 'indice.json'
+
+#muda quando o formato dos segmentos mudar: todos são refeitos
+VERSAO_INDICE = 1
+
+#colunas de cada registro, como posições na tabela de textos do segmento
+CAMPOS = ['titulo', 'chave', 'desenvolvedor', 'publicadora', 'lancamento']
+
+def hash_arquivo(caminho):
+    """
+    Hash do conteúdo de um CSV: o segmento do console só é refeito se ele mudar.
+    """
+    resumo = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(1 << 20), b''):
+            resumo.update(bloco)
+    return resumo.hexdigest()
+
+def _valor(linha, coluna):
+    valor = linha.get(coluna, '')
+    return '' if pd.isna(valor) else str(valor)
+
+def montar_segmento(caminho_csv, pasta_segmento):
+    """
+    Monta o segmento de um console: tabela de textos, registros, ordem por chave (com as chaves
+    nessa ordem, para o bisect das buscas exata e por prefixo) e índice invertido de palavras.
+
+    Todos os textos ficam num único bloco UTF-8 ('textos.npy') com as posições de início em 'inicios.npy';
+    os demais arrays guardam números de texto, então tudo pode ser aberto com mmap sem desserializar nada.
+
+    Args:
+    - caminho_csv (str): CSV da questão 1 (colunas 'Título', 'Desenvolvedor', 'Publicadora', 'Lançamento...').
+    - pasta_segmento (str): Pasta onde os arrays são gravados (é criada).
+
+    Returns:
+    - int: Número de registros do segmento.
+    """
+    dataframe = pd.read_csv(caminho_csv, dtype=str, keep_default_na=False)
+    colunas_lancamento = [coluna for coluna in dataframe.columns if coluna.startswith('Lançamento')]
+
+    textos, numeros_texto = [], {}
+    def numero(texto):
+        if texto not in numeros_texto:
+            numeros_texto[texto] = len(textos)
+            textos.append(texto)
+        return numeros_texto[texto]
+
+    registros, chaves = [], []
+    for linha in dataframe.to_dict('records'):
+        titulo = _valor(linha, 'Título').strip()
+        chave = normalizar_titulo(titulo)
+        if not chave:
+            continue
+        #lançamento por região ('Lançamento NA' -> 'NA'; a Switch só tem 'Lançamento')
+        lancamento = {(coluna[len('Lançamento'):].strip() or 'Geral'): _valor(linha, coluna)
+                      for coluna in colunas_lancamento if _valor(linha, coluna)}
+        registros.append([numero(titulo), numero(chave), numero(_valor(linha, 'Desenvolvedor')),
+                          numero(_valor(linha, 'Publicadora')), numero(json.dumps(lancamento, ensure_ascii=False))])
+        chaves.append(chave)
+
+    #ordem dos registros pela chave normalizada: busca exata e por prefixo com bisect
+    ordem = sorted(range(len(chaves)), key=chaves.__getitem__)
+
+    #palavra -> registros (ordenados), palavras em ordem alfabética
+    postagens = {}
+    for posicao, chave in enumerate(chaves):
+        for palavra in dict.fromkeys(chave.split()):
+            postagens.setdefault(palavra, []).append(posicao)
+    palavras = sorted(postagens)
+    tamanhos = [len(postagens[palavra]) for palavra in palavras]
+
+    arrays = {
+        'registros': np.array(registros, dtype=np.int32).reshape(len(registros), len(CAMPOS)),
+        'ordem': np.array(ordem, dtype=np.int32),
+        'chaves': np.array([registros[posicao][1] for posicao in ordem], dtype=np.int32),
+        'palavras': np.array([numero(palavra) for palavra in palavras], dtype=np.int32),
+        'palavras_inicios': np.concatenate(([0], np.cumsum(tamanhos, dtype=np.int64))).astype(np.int64),
+        'palavras_registros': np.array([p for palavra in palavras for p in postagens[palavra]], dtype=np.int32)
+    }
+    codificados = [texto.encode('utf-8') for texto in textos]
+    arrays['inicios'] = np.concatenate(([0], np.cumsum([len(texto) for texto in codificados], dtype=np.int64))).astype(np.int64)
+    arrays['textos'] = np.frombuffer(b''.join(codificados), dtype=np.uint8)
+
+    os.makedirs(pasta_segmento, exist_ok=True)
+    for nome, array in arrays.items():
+        np.save(os.path.join(pasta_segmento, f'{nome}.npy'), array)
+    return len(registros)
+
+def _ler_manifesto(pasta):
+    try:
+        with open(os.path.join(pasta, ARQUIVO_MANIFESTO), encoding='utf-8') as arquivo:
+            manifesto = json.load(arquivo)
+        return manifesto if manifesto.get('versao') == VERSAO_INDICE else {'segmentos': {}}
+    except (FileNotFoundError, ValueError):
+        return {'segmentos': {}}
+
+def _gravar_manifesto(pasta, manifesto):
+    caminho = os.path.join(pasta, ARQUIVO_MANIFESTO)
+    temporario = f'{caminho}.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+
+def atualizar_indice(padrao=PADRAO_CATALOGOS, pasta=PASTA_INDICE):
+    """
+    Atualiza o índice a partir dos CSVs da questão 1, refazendo só os consoles cujo CSV mudou
+    (e apagando os de CSVs que sumiram).
+
+    Cada segmento é montado numa pasta temporária e trocado pelo antigo no fim; o manifesto
+    só é gravado depois, então um índice interrompido no meio continua consistente.
+
+    Args:
+    - padrao (str): Padrão dos CSVs (o nome do arquivo é o console).
+    - pasta (str): Pasta do índice.
+
+    Returns:
+    - dict: {'refeitos': [consoles], 'mantidos': [consoles], 'removidos': [consoles]}.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    antigo = _ler_manifesto(pasta)['segmentos']
+    segmentos = {}
+    resumo = {'refeitos': [], 'mantidos': [], 'removidos': []}
+
+    for caminho in sorted(glob.glob(padrao)):
+        console = os.path.splitext(os.path.basename(caminho))[0]
+        assinatura = hash_arquivo(caminho)
+        destino = os.path.join(pasta, console)
+        if antigo.get(console, {}).get('hash') == assinatura and os.path.isdir(destino):
+            segmentos[console] = antigo[console]
+            resumo['mantidos'].append(console)
+            continue
+
+        temporario = f'{destino}.tmp'
+        shutil.rmtree(temporario, ignore_errors=True)
+        try:
+            quantidade = montar_segmento(caminho, temporario)
+        except Exception as e:
+            print(f">>ERRO AO INDEXAR '{caminho}'<<: {e}")
+            shutil.rmtree(temporario, ignore_errors=True)
+            if console in antigo and os.path.isdir(destino):
+                segmentos[console] = antigo[console]
+            continue
+        shutil.rmtree(destino, ignore_errors=True)
+        os.replace(temporario, destino)
+        segmentos[console] = {'hash': assinatura, 'registros': quantidade, 'arquivo': caminho}
+        resumo['refeitos'].append(console)
+
+    for console in antigo:
+        if console not in segmentos:
+            shutil.rmtree(os.path.join(pasta, console), ignore_errors=True)
+            resumo['removidos'].append(console)
+
+    _gravar_manifesto(pasta, {'versao': VERSAO_INDICE, 'segmentos': segmentos})
+    print(f">>ÍNDICE DE BUSCA<< : {len(resumo['refeitos'])} consoles refeitos, {len(resumo['mantidos'])} mantidos, "
+          f"{len(resumo['removidos'])} removidos")
+    return resumo
+
+class _Textos:
+    """
+    Sequência de textos de um segmento, lida do bloco em mmap só quando acessada.
+
+    'numeros' escolhe quais textos (e em que ordem) a sequência expõe, para o bisect.
+    """
+
+    def __init__(self, segmento, numeros):
+        self.segmento = segmento
+        self.numeros = numeros
+
+    def __len__(self):
+        return len(self.numeros)
+
+    def __getitem__(self, posicao):
+        return self.segmento.texto(self.numeros[posicao])
+
+class Segmento:
+    """
+    Arrays de um console abertos com mmap: abrir não lê os dados, só as páginas usadas nas consultas.
+    """
+
+    def __init__(self, console, pasta):
+        self.console = console
+        carregar = lambda nome: np.load(os.path.join(pasta, f'{nome}.npy'), mmap_mode='r')
+        self.textos = carregar('textos')
+        self.inicios = carregar('inicios')
+        self.registros = carregar('registros')
+        self.ordem = carregar('ordem')
+        self.chaves = carregar('chaves')
+        self.palavras = carregar('palavras')
+        self.palavras_inicios = carregar('palavras_inicios')
+        self.palavras_registros = carregar('palavras_registros')
+        self.chaves_ordenadas = _Textos(self, self.chaves)
+        self.palavras_ordenadas = _Textos(self, self.palavras)
+
+    def texto(self, numero):
+        return bytes(self.textos[self.inicios[numero]:self.inicios[numero + 1]]).decode('utf-8')
+
+    def registro(self, posicao):
+        titulo, _, desenvolvedor, publicadora, lancamento = (self.texto(numero) for numero in self.registros[posicao])
+        return {'titulo': titulo, 'console': self.console, 'desenvolvedor': desenvolvedor,
+                'publicadora': publicadora, 'lancamento': json.loads(lancamento)}
+
+    def faixa_chaves(self, inicio, fim=None):
+        """
+        Posições (em 'ordem') das chaves entre inicio (inclusive) e fim (exclusive); sem fim, as iguais a inicio.
+        """
+        esquerda = bisect.bisect_left(self.chaves_ordenadas, inicio)
+        direita = bisect.bisect_right(self.chaves_ordenadas, inicio) if fim is None else bisect.bisect_left(self.chaves_ordenadas, fim)
+        return np.asarray(self.ordem[esquerda:direita])
+
+    def com_palavra(self, palavra, prefixo=False):
+        """
+        Registros (ordenados) que têm a palavra, ou alguma palavra que começa com ela.
+        """
+        esquerda = bisect.bisect_left(self.palavras_ordenadas, palavra)
+        direita = bisect.bisect_left(self.palavras_ordenadas, palavra + '\U0010ffff') if prefixo else bisect.bisect_right(self.palavras_ordenadas, palavra)
+        if direita - esquerda == 1:
+            return np.asarray(self.palavras_registros[self.palavras_inicios[esquerda]:self.palavras_inicios[esquerda + 1]])
+        return np.unique(self.palavras_registros[self.palavras_inicios[esquerda]:self.palavras_inicios[direita]])
+
+class IndiceBusca:
+    """
+    Busca de títulos nos catálogos de todos os consoles, pelo índice gravado por atualizar_indice.
+
+    As consultas são normalizadas como os títulos (sem acentos, pontuação e caixa; 'VII' = '7'),
+    então 'pokemon' encontra 'Pokémon' e 'final fantasy vii' encontra 'Final Fantasy VII'.
+    """
+
+    def __init__(self, pasta=PASTA_INDICE):
+        manifesto = _ler_manifesto(pasta)
+        self.segmentos = [Segmento(console, os.path.join(pasta, console)) for console in sorted(manifesto['segmentos'])]
+
+    def _resultados(self, posicoes_por_segmento, limite):
+        resultados = []
+        for segmento, posicoes in posicoes_por_segmento:
+            for posicao in posicoes:
+                if limite is not None and len(resultados) >= limite:
+                    return resultados
+                resultados.append(segmento.registro(int(posicao)))
+        return resultados
+
+    def exato(self, titulo):
+        """
+        O jogo em cada console em que ele aparece (mesmo título depois de normalizado).
+
+        Returns:
+        - list: Dicts {'titulo', 'console', 'desenvolvedor', 'publicadora', 'lancamento'}.
+        """
+        chave = normalizar_titulo(titulo)
+        if not chave:
+            return []
+        return self._resultados([(segmento, segmento.faixa_chaves(chave)) for segmento in self.segmentos], None)
+
+    def prefixo(self, texto, limite=20):
+        """
+        Títulos que começam com o texto, em ordem alfabética da chave dentro de cada console.
+        """
+        chave = normalizar_titulo(texto)
+        if not chave:
+            return []
+        return self._resultados([(segmento, segmento.faixa_chaves(chave, chave + '\U0010ffff')) for segmento in self.segmentos], limite)
+
+    def buscar(self, texto, limite=20, ultima_como_prefixo=True):
+        """
+        Títulos com todas as palavras do texto, em qualquer ordem ('souls dark' encontra 'Dark Souls').
+
+        Args:
+        - texto (str): Palavras procuradas.
+        - limite (int): Máximo de resultados (None = todos).
+        - ultima_como_prefixo (bool): A última palavra pode estar incompleta ('dark sou').
+
+        Returns:
+        - list: Dicts {'titulo', 'console', 'desenvolvedor', 'publicadora', 'lancamento'}.
+        """
+        palavras = normalizar_titulo(texto).split()
+        if not palavras:
+            return []
+        por_segmento = []
+        for segmento in self.segmentos:
+            #começa pela lista da última palavra e corta pelas outras
+            posicoes = segmento.com_palavra(palavras[-1], prefixo=ultima_como_prefixo)
+            for palavra in palavras[:-1]:
+                if not len(posicoes):
+                    break
+                posicoes = np.intersect1d(posicoes, segmento.com_palavra(palavra), assume_unique=True)
+            por_segmento.append((segmento, posicoes))
+        return self._resultados(por_segmento, limite)
+
+    def consoles(self, titulo):
+        """
+        Console -> publicadora do jogo, para responder "em que consoles está o jogo X e quem publica".
+        """
+        return {resultado['console']: resultado['publicadora'] for resultado in self.exato(titulo)}
@@ -0,0 +1,265 @@
+import atexit
+import functools
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+try:
+    import resource
+except ImportError:  #Windows: sem pico de RSS
+    resource = None
+
+#logs (JSON, uma linha por evento) e métricas (formato texto do Prometheus) de cada programa
+PASTA_METRICAS = 'Metricas'
+
+#prefixo dos nomes das métricas
+PREFIXO = 'jogos'
+
+#desligada por padrão: medir/span/contar/erro só testam esta variável e seguem em frente
+_ativo = False
+_estado = None
+_pilha = threading.local()
+
+class _Execucao:
+    """
+    Métricas acumuladas de uma execução (uma por programa), protegidas por trava: os spans
+    podem terminar em várias threads ao mesmo tempo (downloads da questão 1, buscas da questão 4).
+    """
+
+    def __init__(self, programa, pasta, memoria):
+        self.programa = programa
+        self.pasta = pasta
+        self.memoria = memoria
+        self.execucao = f'{programa}-{int(time.time())}-{os.getpid()}'
+        self.inicio = time.time()
+        self.trava = threading.Lock()
+        self.ids = itertools.count(1)
+        self.etapas = {}  #nome -> {'chamadas', 'erros', 'segundos', 'segundos_max', 'linhas'}
+        self.contadores = {}
+        os.makedirs(pasta, exist_ok=True)
+        self.log = open(os.path.join(pasta, f'{programa}.jsonl'), 'a', encoding='utf-8')
+
+    def escrever(self, evento):
+        evento = {'ts': round(time.time(), 6), 'execucao': self.execucao, **evento}
+        linha = json.dumps(evento, ensure_ascii=False, default=str)
+        with self.trava:
+            self.log.write(linha + '\n')
+
+    def somar(self, nome, segundos, linhas, falhou):
+        with self.trava:
+            etapa = self.etapas.setdefault(nome, {'chamadas': 0, 'erros': 0, 'segundos': 0.0, 'segundos_max': 0.0, 'linhas': 0})
+            etapa['chamadas'] += 1
+            etapa['erros'] += int(falhou)
+            etapa['segundos'] += segundos
+            etapa['segundos_max'] = max(etapa['segundos_max'], segundos)
+            etapa['linhas'] += linhas or 0
+
+def pico_rss():
+    """
+    Maior RSS do processo até agora, em bytes (None se o sistema não informa).
+    """
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    #Linux informa em KB e macOS em bytes
+    return pico if sys.platform == 'darwin' else pico * 1024
+
+def tamanho(valor):
+    """
+    Linhas de um resultado (len), 0 para None.
+    """
+    return 0 if valor is None else len(valor)
+
+def ativar(programa, pasta=PASTA_METRICAS, memoria='rss'):
+    """
+    Liga a instrumentação até o fim do programa, quando grava o arquivo de métricas.
+
+    Args:
+    - programa (str): Nome do programa (nome dos arquivos e rótulo das métricas).
+    - pasta (str): Pasta dos arquivos '<programa>.jsonl' (log) e '<programa>.prom' (métricas).
+    - memoria (str): 'rss' (pico de RSS do processo, quase sem custo), 'tracemalloc' (pico de memória
+      alocada por span; deixa o programa bem mais lento e é aproximado com threads) ou None.
+    """
+    global _ativo, _estado
+    if _ativo:
+        return
+    _estado = _Execucao(programa, pasta, memoria)
+    if memoria == 'tracemalloc':
+        tracemalloc.start()
+    _ativo = True
+    _estado.escrever({'evento': 'inicio', 'programa': programa, 'pid': os.getpid()})
+    atexit.register(finalizar)
+
+def finalizar():
+    """
+    Grava o fim da execução no log e o arquivo de métricas, e desliga a instrumentação.
+    """
+    global _ativo, _estado
+    if not _ativo:
+        return
+    _ativo = False
+    estado = _estado
+    estado.escrever({'evento': 'fim', 'duracao_s': round(time.time() - estado.inicio, 6), 'pico_rss_bytes': pico_rss(),
+                     'etapas': estado.etapas, 'contadores': estado.contadores})
+    estado.log.close()
+    if estado.memoria == 'tracemalloc':
+        tracemalloc.stop()
+    gravar_prometheus(estado)
+    _estado = None
+
+def _rotulo(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def gravar_prometheus(estado):
+    """
+    Escreve '<programa>.prom' no formato texto do Prometheus (para o textfile collector do node_exporter),
+    trocando o arquivo de uma vez para o coletor nunca ler um arquivo pela metade.
+    """
+    programa = _rotulo(estado.programa)
+    series = [
+        ('etapa_chamadas_total', 'counter', 'Chamadas de cada etapa.', 'chamadas'),
+        ('etapa_erros_total', 'counter', 'Chamadas de cada etapa que terminaram em erro.', 'erros'),
+        ('etapa_segundos_total', 'counter', 'Tempo total gasto em cada etapa.', 'segundos'),
+        ('etapa_segundos_max', 'gauge', 'Chamada mais demorada de cada etapa.', 'segundos_max'),
+        ('etapa_linhas_total', 'counter', 'Linhas processadas por cada etapa.', 'linhas')
+    ]
+    linhas = []
+    for metrica, tipo, ajuda, campo in series:
+        linhas += [f'# HELP {PREFIXO}_{metrica} {ajuda}', f'# TYPE {PREFIXO}_{metrica} {tipo}']
+        linhas += [f'{PREFIXO}_{metrica}{{programa="{programa}",etapa="{_rotulo(nome)}"}} {valores[campo]}'
+                   for nome, valores in sorted(estado.etapas.items())]
+    linhas += [f'# HELP {PREFIXO}_eventos_total Contadores registrados pelos programas.', f'# TYPE {PREFIXO}_eventos_total counter']
+    linhas += [f'{PREFIXO}_eventos_total{{programa="{programa}",nome="{_rotulo(nome)}"}} {valor}'
+               for nome, valor in sorted(estado.contadores.items())]
+    linhas += [f'# HELP {PREFIXO}_execucao_segundos Duração da última execução.', f'# TYPE {PREFIXO}_execucao_segundos gauge',
+               f'{PREFIXO}_execucao_segundos{{programa="{programa}"}} {time.time() - estado.inicio:.6f}',
+               f'# HELP {PREFIXO}_execucao_fim_timestamp_seconds Fim da última execução.',
+               f'# TYPE {PREFIXO}_execucao_fim_timestamp_seconds gauge',
+               f'{PREFIXO}_execucao_fim_timestamp_seconds{{programa="{programa}"}} {time.time():.3f}']
+    if pico_rss() is not None:
+        linhas += [f'# HELP {PREFIXO}_pico_rss_bytes Maior RSS do processo.', f'# TYPE {PREFIXO}_pico_rss_bytes gauge',
+                   f'{PREFIXO}_pico_rss_bytes{{programa="{programa}"}} {pico_rss()}']
+
+    caminho = os.path.join(estado.pasta, f'{estado.programa}.prom')
+    temporario = f'{caminho}.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        arquivo.write('\n'.join(linhas) + '\n')
+    os.replace(temporario, caminho)
+
+class _Span:
+    """
+    Trecho medido: tempo, linhas, erro e memória, gravado no log quando termina.
+    """
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.linhas = None
+        self.erro = None
+
+    def __enter__(self):
+        estado = _estado
+        pilha = _pilha.__dict__.setdefault('spans', [])
+        self.id = next(estado.ids)
+        self.pai = pilha[-1].id if pilha else None
+        self.pico_filhos = 0
+        if estado.memoria == 'tracemalloc':
+            #o pico acumulado até aqui pertence ao span pai
+            if pilha:
+                pilha[-1].pico_filhos = max(pilha[-1].pico_filhos, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        self.rss_antes = pico_rss() if estado.memoria else None
+        pilha.append(self)
+        self.inicio = time.time()
+        self.relogio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, excecao, rastro):
+        segundos = time.perf_counter() - self.relogio
+        _pilha.spans.pop()
+        estado = _estado
+        if estado is None:
+            return False
+        if excecao is not None:
+            self.erro = f'{tipo.__name__}: {excecao}'
+
+        evento = {'evento': 'span', 'nome': self.nome, 'id': self.id, 'pai': self.pai,
+                  'thread': threading.current_thread().name, 'inicio': round(self.inicio, 6),
+                  'duracao_s': round(segundos, 6), 'linhas': self.linhas, 'erro': self.erro}
+        if estado.memoria:
+            rss = pico_rss()
+            evento['pico_rss_bytes'] = rss
+            evento['rss_cresceu_bytes'] = rss - self.rss_antes if rss is not None else None
+        if estado.memoria == 'tracemalloc':
+            pico = max(tracemalloc.get_traced_memory()[1], self.pico_filhos)
+            evento['pico_alocado_bytes'] = pico
+            if _pilha.spans:
+                _pilha.spans[-1].pico_filhos = max(_pilha.spans[-1].pico_filhos, pico)
+
+        estado.somar(self.nome, segundos, self.linhas, self.erro is not None)
+        estado.escrever(evento)
+        return False
+
+def span(nome):
+    """
+    Context manager que mede um trecho ('with span(...) as s: ... s.linhas = n').
+
+    Desligada, devolve um nullcontext (o 's' é None).
+    """
+    if not _ativo:
+        return nullcontext()
+    return _Span(nome)
+
+def medir(nome, linhas=None, linhas_entrada=None):
+    """
+    Decorador que mede cada chamada da função como um span.
+
+    Args:
+    - nome (str): Nome da etapa ('questao1.baixar_pagina').
+    - linhas (callable): Linhas a partir do resultado (ex.: tamanho).
+    - linhas_entrada (callable): Linhas a partir do primeiro argumento (ex.: o DataFrame recebido).
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            if not _ativo:
+                return funcao(*args, **kwargs)
+            with _Span(nome) as atual:
+                if linhas_entrada is not None and args:
+                    atual.linhas = linhas_entrada(args[0])
+                resultado = funcao(*args, **kwargs)
+                if linhas is not None:
+                    atual.linhas = linhas(resultado)
+                return resultado
+        return medida
+    return decorador
+
+def contar(nome, quantidade=1):
+    """
+    Soma 'quantidade' ao contador 'nome'.
+    """
+    if not _ativo:
+        return
+    estado = _estado
+    with estado.trava:
+        estado.contadores[nome] = estado.contadores.get(nome, 0) + quantidade
+
+def erro(nome, excecao, falha_span=True):
+    """
+    Registra um erro tratado (capturado num 'except' e só mostrado na tela): soma no contador
+    '<nome>.erros', grava um evento no log e, com falha_span, marca o span atual como falho.
+
+    Use falha_span=False para erros de um item que não derrubam a etapa (uma busca entre muitas).
+    """
+    if not _ativo:
+        return
+    pilha = getattr(_pilha, 'spans', None)
+    if pilha and falha_span:
+        pilha[-1].erro = f'{type(excecao).__name__}: {excecao}'
+    contar(f'{nome}.erros')
+    _estado.escrever({'evento': 'erro', 'nome': nome, 'erro': f'{type(excecao).__name__}: {excecao}',
+                      'span': pilha[-1].id if pilha else None})
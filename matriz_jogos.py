@@ -0,0 +1,215 @@
+import os
+from itertools import chain
+import numpy as np
+import pandas as pd
+from banco_jogos import BANCO_JOGOS, conectar, ids_jogos
+
+#matriz usuário x jogo, ao lado de jogos.db (os títulos ficam na tabela games do banco)
+ARQUIVO_MATRIZ = 'jogos_matriz.npz'
+
+def _codificar(listas):
+    """
+    Codifica listas de valores como uma matriz esparsa CSR binária (linha = posição na série).
+
+    Valores repetidos na mesma lista contam uma vez; valores que não são lista viram linha vazia.
+
+    Returns:
+    - tuple: (indptr, indices, valores distintos na ordem das colunas).
+    """
+    listas = [lista if isinstance(lista, list) else [] for lista in listas]
+    tamanhos = np.fromiter(map(len, listas), dtype=np.int64, count=len(listas))
+    codigos, valores = pd.factorize(pd.Index(list(chain.from_iterable(listas)), dtype=object))
+    linhas = np.repeat(np.arange(len(listas), dtype=np.int64), tamanhos)
+
+    #linha * colunas + coluna: o unique ordena por linha e depois por coluna e remove as repetições
+    chaves = np.unique(linhas * max(len(valores), 1) + codigos)
+    linhas, colunas = np.divmod(chaves, max(len(valores), 1))
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(linhas, minlength=len(listas))))).astype(np.int64)
+    return indptr, colunas.astype(np.int32), list(valores)
+
+def _juntar_linhas(indptr, indices, linhas):
+    """
+    Índices de coluna de todas as linhas pedidas, concatenados, sem laço em Python.
+    """
+    inicios = indptr[linhas]
+    tamanhos = indptr[linhas + 1] - inicios
+    total = int(tamanhos.sum())
+    if total == 0:
+        return indices[:0]
+    #posição de cada elemento = início da sua linha + deslocamento dentro da linha
+    deslocamentos = np.arange(total) - np.repeat(np.cumsum(tamanhos) - tamanhos, tamanhos)
+    return indices[np.repeat(inicios, tamanhos) + deslocamentos]
+
+class MatrizJogos:
+    """
+    Jogos preferidos como matriz esparsa usuário x jogo (CSR em arrays numpy, 1 = o usuário citou o jogo),
+    com a transposta (CSC) para achar os usuários de um jogo e uma matriz usuário x console.
+
+    As colunas são os ids da tabela games de jogos.db, então o dicionário título <-> id é o do banco.
+    Co-ocorrências e jogos similares são calculados só sobre as linhas dos usuários do jogo consultado.
+    """
+
+    def __init__(self, indptr, indices, usuarios, ids_colunas, titulos, consoles_indptr, consoles_indices, consoles):
+        self.indptr = indptr
+        self.indices = indices
+        self.usuarios = usuarios  #id do usuário de cada linha
+        self.ids_colunas = ids_colunas  #games.id de cada coluna
+        self.titulos = titulos  #título de cada coluna
+        self.colunas = {titulo: coluna for coluna, titulo in enumerate(titulos)}
+        self.consoles_indptr = consoles_indptr
+        self.consoles_indices = consoles_indices
+        self.consoles = consoles
+
+        #transposta: usuários de cada jogo, em ordem de linha
+        ordem = np.argsort(indices, kind='stable')
+        self.linhas_por_jogo = np.repeat(np.arange(len(usuarios), dtype=np.int64), np.diff(indptr))[ordem]
+        self.indptr_jogos = np.concatenate(([0], np.cumsum(np.bincount(indices, minlength=len(titulos))))).astype(np.int64)
+        self.popularidade = np.diff(self.indptr_jogos)
+
+    @classmethod
+    def construir(cls, dataframe, nome_banco=BANCO_JOGOS):
+        """
+        Monta a matriz a partir dos usuários unificados, registrando em games os títulos novos.
+
+        Args:
+        - dataframe (pandas DataFrame): Usuários com 'id', 'jogos_preferidos' e 'consoles' (listas).
+        - nome_banco (str): Banco cuja tabela games dá os ids dos jogos.
+
+        Returns:
+        - MatrizJogos: Matriz pronta.
+        """
+        indptr, indices, titulos = _codificar(dataframe['jogos_preferidos'])
+        conexao = conectar(nome_banco)
+        try:
+            with conexao:
+                ids = ids_jogos(conexao, titulos)
+        finally:
+            conexao.close()
+        consoles_indptr, consoles_indices, consoles = _codificar(dataframe['consoles'])
+        return cls(indptr, indices, dataframe['id'].to_numpy(dtype=np.int64),
+                   np.array([ids[titulo] for titulo in titulos], dtype=np.int64), titulos,
+                   consoles_indptr, consoles_indices, consoles)
+
+    def salvar(self, nome_arquivo=ARQUIVO_MATRIZ):
+        """
+        Grava os arrays num .npz (os títulos não vão junto: ficam na tabela games).
+        """
+        temporario = f'{nome_arquivo}.tmp.npz'
+        np.savez(temporario, indptr=self.indptr, indices=self.indices, usuarios=self.usuarios,
+                 ids_colunas=self.ids_colunas, consoles_indptr=self.consoles_indptr,
+                 consoles_indices=self.consoles_indices, consoles=np.array(self.consoles, dtype=str))
+        os.replace(temporario, nome_arquivo)
+
+    @classmethod
+    def carregar(cls, nome_arquivo=ARQUIVO_MATRIZ, nome_banco=BANCO_JOGOS):
+        """
+        Lê a matriz gravada por salvar, com os títulos das colunas vindos de games.
+        """
+        with np.load(nome_arquivo) as arrays:
+            dados = {nome: arrays[nome] for nome in arrays.files}
+        conexao = conectar(nome_banco)
+        try:
+            titulo_por_id = dict(conexao.execute('SELECT id, title FROM games'))
+        finally:
+            conexao.close()
+        return cls(dados['indptr'], dados['indices'], dados['usuarios'], dados['ids_colunas'],
+                   [titulo_por_id[int(id_jogo)] for id_jogo in dados['ids_colunas']],
+                   dados['consoles_indptr'], dados['consoles_indices'], dados['consoles'].tolist())
+
+    def _coluna(self, jogo):
+        if jogo not in self.colunas:
+            raise KeyError(f'jogo não encontrado: {jogo}')
+        return self.colunas[jogo]
+
+    def _usuarios_do_jogo(self, coluna):
+        return self.linhas_por_jogo[self.indptr_jogos[coluna]:self.indptr_jogos[coluna + 1]]
+
+    def _coocorrencias(self, coluna):
+        """
+        Quantos usuários citaram o jogo da coluna junto com cada jogo (vetor com uma posição por coluna).
+        """
+        juntos = _juntar_linhas(self.indptr, self.indices, self._usuarios_do_jogo(coluna))
+        contagem = np.bincount(juntos, minlength=len(self.titulos))
+        contagem[coluna] = 0
+        return contagem
+
+    def coocorrencia(self, jogo):
+        """
+        Jogos citados pelos mesmos usuários de 'jogo', com o número de usuários em comum.
+
+        Returns:
+        - pandas Series: Título -> usuários em comum (só os maiores que zero), em ordem decrescente.
+        """
+        contagem = self._coocorrencias(self._coluna(jogo))
+        colunas = np.flatnonzero(contagem)
+        colunas = colunas[np.argsort(-contagem[colunas], kind='stable')]
+        return pd.Series(contagem[colunas], index=pd.Index([self.titulos[c] for c in colunas], name='jogo'), name='usuarios')
+
+    def matriz_coocorrencia(self, jogos=None, top=20):
+        """
+        Matriz jogo x jogo de usuários em comum (a diagonal é a popularidade de cada jogo).
+
+        Args:
+        - jogos (list): Títulos das linhas e colunas (None = os 'top' jogos mais citados).
+        - top (int): Quantos jogos, se 'jogos' não for informado.
+
+        Returns:
+        - pandas DataFrame: Matriz quadrada de contagens.
+        """
+        colunas = self._mais_citados(top) if jogos is None else np.array([self._coluna(jogo) for jogo in jogos])
+        matriz = np.array([self._coocorrencias(coluna)[colunas] for coluna in colunas], dtype=np.int64).reshape(len(colunas), len(colunas))
+        matriz[np.diag_indices(len(colunas))] = self.popularidade[colunas]
+        nomes = [self.titulos[coluna] for coluna in colunas]
+        return pd.DataFrame(matriz, index=pd.Index(nomes, name='jogo'), columns=nomes)
+
+    def _mais_citados(self, top):
+        return np.lexsort((np.arange(len(self.titulos)), -self.popularidade))[:top]
+
+    def consoles_por_jogo(self, jogos=None, top=20):
+        """
+        Tabela cruzada jogo x console: quantos usuários de cada console citaram cada jogo.
+
+        Args:
+        - jogos (list): Títulos das linhas (None = os 'top' jogos mais citados).
+        - top (int): Quantos jogos, se 'jogos' não for informado.
+
+        Returns:
+        - pandas DataFrame: Uma linha por jogo e uma coluna por console.
+        """
+        colunas = self._mais_citados(top) if jogos is None else np.array([self._coluna(jogo) for jogo in jogos])
+        #uma passada por console (são poucos): jogos citados pelos usuários que têm o console
+        tabela = np.zeros((len(colunas), len(self.consoles)), dtype=np.int64)
+        usuarios_por_console = np.repeat(np.arange(len(self.usuarios), dtype=np.int64), np.diff(self.consoles_indptr))
+        for console in range(len(self.consoles)):
+            linhas = usuarios_por_console[self.consoles_indices == console]
+            contagem = np.bincount(_juntar_linhas(self.indptr, self.indices, linhas), minlength=len(self.titulos))
+            tabela[:, console] = contagem[colunas]
+        return pd.DataFrame(tabela, index=pd.Index([self.titulos[coluna] for coluna in colunas], name='jogo'),
+                            columns=pd.Index(self.consoles, name='console'))
+
+    def similares(self, jogo, n=10, minimo_usuarios=1):
+        """
+        "Quem gosta deste jogo também gosta de": os jogos com maior similaridade de cosseno
+        (usuários em comum / raiz do produto das popularidades).
+
+        Args:
+        - jogo (str): Título consultado.
+        - n (int): Quantos jogos devolver.
+        - minimo_usuarios (int): Usuários em comum mínimos para um jogo entrar na lista.
+
+        Returns:
+        - pandas DataFrame: Colunas 'jogo', 'usuarios_em_comum' e 'similaridade', da mais similar para a menos.
+        """
+        coluna = self._coluna(jogo)
+        juntos = self._coocorrencias(coluna)
+        candidatos = np.flatnonzero(juntos >= max(minimo_usuarios, 1))
+        notas = juntos[candidatos] / np.sqrt(self.popularidade[coluna] * self.popularidade[candidatos])
+        if len(candidatos) > n:
+            melhores = np.argpartition(-notas, n - 1)[:n]
+            candidatos, notas = candidatos[melhores], notas[melhores]
+        ordem = np.lexsort((candidatos, -notas))
+        return pd.DataFrame({
+            'jogo': [self.titulos[c] for c in candidatos[ordem]],
+            'usuarios_em_comum': juntos[candidatos[ordem]],
+            'similaridade': np.round(notas[ordem], 4)
+        })
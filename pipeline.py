@@ -0,0 +1,313 @@
+import argparse
+import ast
+import glob
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import questao1
+import questao2
+import questao3
+import questao4
+import indice_busca
+import instrumentacao
+
+#hashes das entradas e saídas da última execução bem-sucedida de cada etapa
+ARQUIVO_ESTADO = 'Cache_Pipeline/estado.json'
+
+#etapas executadas ao mesmo tempo, no máximo
+MAX_PARALELAS = 2
+
+#pasta dos módulos do projeto (os que entram no hash do código de cada etapa)
+PASTA_PROJETO = os.path.dirname(os.path.abspath(__file__))
+
+class Etapa:
+    """
+    Uma etapa do pipeline: a função main de uma questão, com as entradas e saídas que ela lê e grava.
+
+    A função devolve False quando falha (as questões tratam as próprias exceções e só mostram o erro);
+    executar transforma isso numa exceção, para a etapa contar como falha e as dependentes não rodarem.
+
+    A etapa está em dia quando o hash das entradas (incluindo o código e as opções) e o das saídas
+    são os mesmos da última execução bem-sucedida. Etapas externas (que dependem da rede) sempre rodam:
+    as questões 1 e 4 já evitam trabalho repetido com os próprios caches, e as etapas seguintes
+    continuam sendo puladas se as saídas delas não mudarem.
+    """
+
+    def __init__(self, nome, funcao, entradas, saidas, depende=(), externa=False, opcoes=None):
+        self.nome = nome
+        self.funcao = funcao
+        self.entradas = list(entradas)  #padrões glob
+        self.saidas = list(saidas)  #padrões glob
+        self.depende = list(depende)
+        self.externa = externa
+        self.opcoes = opcoes or {}
+
+    def executar(self):
+        if self.funcao(**self.opcoes) is False:
+            raise RuntimeError(f'{self.nome} terminou com falha')
+
+def hash_arquivos(padroes):
+    """
+    Hash do nome e do conteúdo de todos os arquivos que casam com os padrões.
+
+    Returns:
+    - str: Hash hexadecimal, ou None se algum padrão não casar com nenhum arquivo.
+    """
+    resumo = hashlib.sha256()
+    for padrao in padroes:
+        caminhos = sorted(glob.glob(padrao))
+        if not caminhos:
+            return None
+        for caminho in caminhos:
+            resumo.update(caminho.encode('utf-8'))
+            with open(caminho, 'rb') as arquivo:
+                for bloco in iter(lambda: arquivo.read(1 << 20), b''):
+                    resumo.update(bloco)
+    return resumo.hexdigest()
+
+def assinatura_entradas(etapa):
+    """
+    Hash das entradas e das opções da etapa (None se faltar alguma entrada).
+    """
+    entradas = hash_arquivos(etapa.entradas)
+    if entradas is None:
+        return None
+    return hashlib.sha256(f'{entradas}:{json.dumps(etapa.opcoes, sort_keys=True, default=str)}'.encode('utf-8')).hexdigest()
+
+def codigo_etapa(funcao):
+    """
+    Arquivos .py do projeto de que a função depende: o módulo dela e, recursivamente, os módulos
+    do projeto que ele importa (qualquer import do arquivo, inclusive dentro de funções).
+    Bibliotecas instaladas ficam de fora.
+
+    Args:
+    - funcao (function): Função da etapa.
+
+    Returns:
+    - list: Nomes dos arquivos, relativos à pasta do projeto, em ordem alfabética.
+    """
+    #__module__ e não o arquivo da função: as mains são embrulhadas por instrumentacao.medir
+    pendentes = [funcao.__module__.split('.')[0]]
+    modulos = set()
+    while pendentes:
+        modulo = pendentes.pop()
+        caminho = os.path.join(PASTA_PROJETO, f'{modulo}.py')
+        if modulo in modulos or not os.path.isfile(caminho):
+            continue
+        modulos.add(modulo)
+        with open(caminho, encoding='utf-8') as arquivo:
+            arvore = ast.parse(arquivo.read(), caminho)
+        for no in ast.walk(arvore):
+            if isinstance(no, ast.Import):
+                pendentes.extend(nome.name.split('.')[0] for nome in no.names)
+            elif isinstance(no, ast.ImportFrom) and no.module and not no.level:
+                pendentes.append(no.module.split('.')[0])
+    return sorted(f'{modulo}.py' for modulo in modulos)
+
+def criar_etapas(offline=False, canonizar=False, url_mercado_livre=questao4.url):
+    """
+    Declara as quatro questões como etapas, mais o índice de busca sobre os catálogos da questão 1.
+
+    A questão 1 (catálogos da Wikipédia) e a questão 2 (usuários) não dependem uma da outra e rodam
+    ao mesmo tempo. A questão 3 só depende dos catálogos quando canoniza os títulos. O índice de busca
+    refaz só os consoles cujo CSV mudou (indice_busca.atualizar_indice).
+
+    O código de cada etapa (codigo_etapa) vem dos imports do módulo da função, então um módulo
+    novo usado por uma questão entra nas entradas dela sem precisar ser listado aqui.
+
+    Args:
+    - offline (bool): Questão 1 reprocessa as páginas do cache sem acessar a rede.
+    - canonizar (bool): Questão 3 junta as grafias dos jogos pelos catálogos (ver questao3.main).
+    - url_mercado_livre (str): Endereço da busca da questão 4 (pode ser o stub local).
+
+    Returns:
+    - dict: Nome -> Etapa, em ordem topológica.
+    """
+    etapas = [
+        Etapa('catalogos', questao1.main,
+              entradas=[*codigo_etapa(questao1.main), questao1.ARQUIVO_REGISTRO],
+              saidas=['Dados_Jogos/*.csv'],
+              externa=not offline, opcoes={'offline': offline}),
+        Etapa('indice_busca', indice_busca.atualizar_indice,
+              entradas=['Dados_Jogos/*.csv', *codigo_etapa(indice_busca.atualizar_indice)],
+              saidas=[f'{indice_busca.PASTA_INDICE}/{indice_busca.ARQUIVO_MANIFESTO}'],
+              depende=['catalogos']),
+        Etapa('usuarios', questao2.main,
+              entradas=['Usuarios/usuarios.csv', 'Usuarios/usuarios.json', 'Usuarios/usuarios.xlsx',
+                        *codigo_etapa(questao2.main)],
+              saidas=[questao2.ARQUIVO_USUARIOS]),
+        Etapa('contagens', questao3.main,
+              entradas=[questao2.ARQUIVO_USUARIOS, *codigo_etapa(questao3.main)]
+                       + (['Dados_Jogos/*.csv'] if canonizar else []),
+              saidas=[questao3.BANCO_JOGOS],
+              depende=['usuarios'] + (['catalogos'] if canonizar else []),
+              opcoes={'canonizar': canonizar}),
+        Etapa('mercado_livre', questao4.main,
+              entradas=[questao3.BANCO_JOGOS, *codigo_etapa(questao4.main)],
+              saidas=['mercado_livre.db'],
+              depende=['contagens'], externa=True, opcoes={'url': url_mercado_livre})
+    ]
+    return {etapa.nome: etapa for etapa in etapas}
+
+def dependentes(etapas, nome):
+    """
+    A etapa e todas as que dependem dela, direta ou indiretamente.
+    """
+    alcancadas = {nome}
+    for etapa in etapas.values():  #ordem topológica: as dependências aparecem antes
+        if alcancadas & set(etapa.depende):
+            alcancadas.add(etapa.nome)
+    return alcancadas
+
+def ler_estado(arquivo=ARQUIVO_ESTADO):
+    try:
+        with open(arquivo, encoding='utf-8') as entrada:
+            return json.load(entrada)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def salvar_estado(estado, arquivo=ARQUIVO_ESTADO):
+    """
+    Grava o estado (gravação atômica, como os outros caches).
+    """
+    pasta = os.path.dirname(arquivo)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    temporario = f'{arquivo}.tmp'
+    with open(temporario, 'w', encoding='utf-8') as saida:
+        json.dump(estado, saida, indent=2)
+    os.replace(temporario, arquivo)
+
+def em_dia(etapa, estado):
+    """
+    Se a etapa pode ser pulada: mesmas entradas e saídas intactas desde a última execução.
+    """
+    anterior = estado.get(etapa.nome)
+    if etapa.externa or anterior is None:
+        return False
+    return (anterior['entradas'] == assinatura_entradas(etapa)
+            and anterior['saidas'] == hash_arquivos(etapa.saidas))
+
+def executar_pipeline(etapas, selecionadas=None, forcadas=(), max_paralelas=MAX_PARALELAS,
+                      arquivo_estado=ARQUIVO_ESTADO, apenas_plano=False):
+    """
+    Executa as etapas respeitando as dependências; etapas independentes rodam ao mesmo tempo.
+
+    Uma etapa que não está em 'selecionadas' é tratada como pronta (ex.: --from). Se uma etapa falhar
+    (exceção, função que devolveu False ou saída ausente), as que dependem dela não rodam.
+
+    Args:
+    - etapas (dict): Nome -> Etapa, em ordem topológica (criar_etapas).
+    - selecionadas (set): Etapas a considerar (None = todas).
+    - forcadas (set): Etapas que rodam mesmo estando em dia.
+    - max_paralelas (int): Etapas simultâneas no máximo.
+    - arquivo_estado (str): Onde ficam os hashes da última execução.
+    - apenas_plano (bool): Só mostra o que seria feito.
+
+    Returns:
+    - dict: Nome -> situação ('executada', 'em dia', 'falhou', 'não executada', 'fora da seleção' ou,
+      com apenas_plano, 'planejada'), na ordem das etapas.
+    """
+    selecionadas = set(etapas) if selecionadas is None else set(selecionadas)
+    estado = ler_estado(arquivo_estado)
+    situacao = {nome: 'fora da seleção' for nome in etapas if nome not in selecionadas}
+    tempos = {}
+
+    def rodar(etapa):
+        inicio = time.perf_counter()
+        with instrumentacao.span(f'pipeline.{etapa.nome}'):
+            etapa.executar()
+        tempos[etapa.nome] = time.perf_counter() - inicio
+
+    with ThreadPoolExecutor(max_workers=max_paralelas) as executor:
+        rodando = {}
+        while len(situacao) < len(etapas):
+            for etapa in etapas.values():
+                if etapa.nome in situacao or etapa.nome in rodando.values():
+                    continue
+                dependencias = [situacao.get(nome) for nome in etapa.depende]
+                if any(valor in ('falhou', 'não executada') for valor in dependencias):
+                    situacao[etapa.nome] = 'não executada'
+                    print(f'>>PIPELINE<< : {etapa.nome} não executada (dependência falhou)')
+                    continue
+                if any(valor is None for valor in dependencias):
+                    continue
+
+                if etapa.nome not in forcadas and em_dia(etapa, estado):
+                    situacao[etapa.nome] = 'em dia'
+                    print(f'>>PIPELINE<< : {etapa.nome} em dia')
+                elif apenas_plano:
+                    situacao[etapa.nome] = 'planejada'
+                    print(f'>>PIPELINE<< : {etapa.nome} seria executada')
+                else:
+                    print(f'>>PIPELINE<< : executando {etapa.nome}')
+                    rodando[executor.submit(rodar, etapa)] = etapa.nome
+
+            if not rodando:
+                continue
+            prontos, _ = wait(rodando, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                etapa = etapas[rodando.pop(futuro)]
+                try:
+                    futuro.result()
+                    saidas = hash_arquivos(etapa.saidas)
+                    if saidas is None:
+                        raise FileNotFoundError(f'saída ausente: {etapa.saidas}')
+                except Exception as e:
+                    situacao[etapa.nome] = 'falhou'
+                    print(f'>>ERRO NA ETAPA {etapa.nome}<<: {e}')
+                    continue
+                situacao[etapa.nome] = 'executada'
+                estado[etapa.nome] = {'entradas': assinatura_entradas(etapa), 'saidas': saidas}
+                #grava a cada etapa: se o pipeline parar no meio, a próxima execução continua dali
+                salvar_estado(estado, arquivo_estado)
+                print(f'>>PIPELINE<< : {etapa.nome} executada em {tempos[etapa.nome]:.1f}s')
+
+    return {nome: situacao[nome] for nome in etapas}
+
+def main(inicio=None, somente=None, forcar=False, offline=False, canonizar=False, url_mercado_livre=questao4.url,
+         max_paralelas=MAX_PARALELAS, apenas_plano=False):
+    """
+    Roda as questões 1 a 4 como um pipeline incremental.
+
+    Args:
+    - inicio (str): Roda esta etapa (mesmo em dia) e as que dependem dela; as anteriores não são tocadas.
+    - somente (list): Roda só estas etapas (mesmo em dia).
+    - forcar (bool): Roda todas as etapas selecionadas, mesmo em dia.
+    - offline, canonizar, url_mercado_livre: Veja criar_etapas.
+    - max_paralelas (int): Etapas simultâneas no máximo.
+    - apenas_plano (bool): Só mostra o que seria feito.
+    """
+    etapas = criar_etapas(offline, canonizar, url_mercado_livre)
+    selecionadas = set(etapas)
+    forcadas = set(etapas) if forcar else set()
+    if inicio:
+        selecionadas = dependentes(etapas, inicio)
+        forcadas |= selecionadas
+    if somente:
+        selecionadas = set(somente)
+        forcadas |= selecionadas
+
+    situacao = executar_pipeline(etapas, selecionadas, forcadas, max_paralelas, apenas_plano=apenas_plano)
+    print('>>PIPELINE<< : ' + ', '.join(f'{nome} {valor}' for nome, valor in situacao.items()))
+
+if __name__ == "__main__":
+    nomes = list(criar_etapas())
+    parser = argparse.ArgumentParser(description='Roda as questões 1 a 4, pulando as etapas em dia.')
+    parser.add_argument('--from', dest='inicio', choices=nomes, help='recomeça desta etapa (e roda as seguintes)')
+    parser.add_argument('--only', dest='somente', nargs='+', choices=nomes, help='roda só estas etapas')
+    parser.add_argument('--forcar', action='store_true', help='roda todas as etapas, mesmo as em dia')
+    parser.add_argument('--offline', action='store_true', help='questão 1 usa só as páginas do cache')
+    parser.add_argument('--canonizar', action='store_true', help='questão 3 junta as grafias pelos catálogos')
+    parser.add_argument('--url', default=questao4.url, help='endereço da busca do Mercado Livre (ex.: o stub local)')
+    parser.add_argument('--paralelas', type=int, default=MAX_PARALELAS, help='etapas simultâneas')
+    parser.add_argument('--plano', action='store_true', help='só mostra o que seria executado')
+    parser.add_argument('--metricas', action='store_true', help="grava log JSON e métricas do Prometheus em 'Metricas/'")
+    args = parser.parse_args()
+    if args.metricas:
+        instrumentacao.ativar('pipeline')
+
+    main(inicio=args.inicio, somente=args.somente, forcar=args.forcar, offline=args.offline, canonizar=args.canonizar,
+         url_mercado_livre=args.url, max_paralelas=args.paralelas, apenas_plano=args.plano)
@@ -1,233 +1,659 @@
+import argparse
+import hashlib
+import json
+import os
+import re
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
 from bs4 import BeautifulSoup, FeatureNotFound
 import pandas as pd
 from io import StringIO
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from extracao_tabelas import extrair_dataframe, medir as medir_tempo_memoria
+from catalogo import PASTA_CATALOGO, exportar_catalogo
+from checkpoint_coleta import ARQUIVO_CHECKPOINT, CheckpointColeta
+import instrumentacao
+from instrumentacao import medir, tamanho
 
-#urls das páginas da Wikipédia
-urls = {
-    'ps5': 'https://pt.wikipedia.org/wiki/Lista_de_jogos_para_PlayStation_5',
-    'ps4': 'https://pt.wikipedia.org/wiki/Lista_de_jogos_para_PlayStation_4',
-    'xbox_x_s': 'https://pt.wikipedia.org/wiki/Lista_de_jogos_para_Xbox_Series_X_e_Series_S',
-    'xbox360': 'https://pt.wikipedia.org/wiki/Lista_de_jogos_para_Xbox_360',
-    'nin_switch': 'https://pt.wikipedia.org/wiki/Lista_de_jogos_para_Nintendo_Switch'
+#registro das páginas coletadas: console -> {'url', 'seletor' (id_tabela ou classe da tabela),
+#'limpeza' (nome de um esquema de ESQUEMAS ou o próprio esquema, {'remover': [...], 'renomear': {...}})}
+ARQUIVO_REGISTRO = 'consoles.json'
+
+def carregar_registro(arquivo=ARQUIVO_REGISTRO):
+    """
+    Lê o registro de consoles.
+
+    Args:
+    - arquivo (str): Caminho do JSON do registro.
+
+    Returns:
+    - dict: Console -> configuração da página. Vazio se o arquivo não existir ou for inválido.
+    """
+    try:
+        with open(arquivo, encoding='utf-8') as registro:
+            return json.load(registro)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f">>ERRO AO LER O REGISTRO DE CONSOLES<<: {arquivo}: {e}")
+        return {}
+
+registro = carregar_registro()
+
+#urls das páginas da Wikipédia (podem ser trocadas, como nos benchmarks; o resto da configuração vem do registro)
+urls = {console: pagina['url'] for console, pagina in registro.items()}
+
+#tempo maximo (em segundos) para conectar e para ler a resposta de cada requisição
+TIMEOUT = (5, 30)
+
+#numero maximo de paginas baixadas ao mesmo tempo
+MAX_CONEXOES = 5
+
+#pasta onde ficam as páginas baixadas e os cabeçalhos de validação (ETag/Last-Modified)
+PASTA_CACHE = 'Cache_Http'
+
+#retornado quando a página não mudou desde a última execução (HTTP 304)
+NAO_MODIFICADO = object()
+
+#como encontrar a tabela de jogos em cada tipo de página (motor 'streaming')
+seletores = {
+    'generico': {'id_tabela': 'softwarelist'},
+    #ps4 nao tem uma table com id 'software list' entao tem que pesquisar pela classe
+    'ps4': {'classe': 'wikitable sortable'}
 }
 
-def fazer_requisicao(url):
+def criar_sessao_http(max_conexoes=MAX_CONEXOES):
     """
-    Faz uma requisição HTTP para a URL fornecida e retorna o conteúdo HTML parseado com BeautifulSoup.
+    Cria uma sessão HTTP com um pool de conexões keep-alive, compartilhado por todas as páginas.
+    
+    Args:
+    - max_conexoes (int): Número máximo de conexões abertas ao mesmo tempo no pool.
+    
+    Returns:
+    - requests.Session: Sessão configurada com o pool de conexões.
+    """
+    sessao = requests.Session()
+    
+    #pool_maxsize define quantas conexões por host ficam abertas para reuso (evita um handshake TLS por página)
+    adaptador = HTTPAdapter(pool_connections=max_conexoes, pool_maxsize=max_conexoes)
+    sessao.mount('https://', adaptador)
+    sessao.mount('http://', adaptador)
+    return sessao
+
+def caminho_cache(url, pasta=PASTA_CACHE):
+    """
+    Retorna o caminho base (sem extensão) dos arquivos de cache de uma URL.
+    
+    Args:
+    - url (str): URL da página.
+    - pasta (str): Pasta do cache.
+    
+    Returns:
+    - str: Caminho base dos arquivos '.html' e '.json' da URL.
+    """
+    chave = hashlib.sha256(url.encode('utf-8')).hexdigest()
+    return os.path.join(pasta, chave)
+
+def ler_cache(url, pasta=PASTA_CACHE):
+    """
+    Lê do cache o corpo e os cabeçalhos de validação de uma URL.
+    
+    Args:
+    - url (str): URL da página.
+    - pasta (str): Pasta do cache.
+    
+    Returns:
+    - tuple: (html, metadados). (None, {}) se a URL não estiver no cache.
+    """
+    base = caminho_cache(url, pasta)
+    try:
+        with open(f'{base}.json', encoding='utf-8') as arquivo:
+            metadados = json.load(arquivo)
+        with open(f'{base}.html', encoding='utf-8') as arquivo:
+            html = arquivo.read()
+        return html, metadados
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None, {}
+
+def salvar_cache(url, resposta, pasta=PASTA_CACHE):
+    """
+    Salva no cache o corpo e os cabeçalhos ETag/Last-Modified de uma resposta.
+    
+    Args:
+    - url (str): URL da página.
+    - resposta (requests.Response): Resposta HTTP bem-sucedida.
+    - pasta (str): Pasta do cache.
+    """
+    try:
+        os.makedirs(pasta, exist_ok=True)
+        base = caminho_cache(url, pasta)
+        metadados = {
+            'url': url,
+            'etag': resposta.headers.get('ETag'),
+            'last_modified': resposta.headers.get('Last-Modified')
+        }
+        
+        #escreve em arquivo temporário e depois renomeia, para nunca deixar um cache pela metade
+        for extensao, conteudo in (('html', resposta.text), ('json', json.dumps(metadados, ensure_ascii=False))):
+            with open(f'{base}.{extensao}.tmp', 'w', encoding='utf-8') as arquivo:
+                arquivo.write(conteudo)
+            os.replace(f'{base}.{extensao}.tmp', f'{base}.{extensao}')
+    except OSError as e:
+        print(f">>ERRO AO SALVAR CACHE<<: {url}: {e}")
+
+@medir('questao1.baixar_pagina')
+def baixar_pagina(url, sessao=None, timeout=TIMEOUT, usar_cache=True, offline=False):
+    """
+    Baixa o HTML de uma página, revalidando a cópia do cache com uma requisição condicional.
     
     Args:
     - url (str): URL da página a ser requisitada.
+    - sessao (requests.Session): Sessão HTTP compartilhada. Se None, faz uma requisição avulsa.
+    - timeout (float ou tuple): Tempo máximo de conexão/leitura da requisição, em segundos.
+    - usar_cache (bool): Se True, envia If-None-Match/If-Modified-Since e guarda a resposta no cache.
+    - offline (bool): Se True, não acessa a rede e devolve a página do cache.
     
     Returns:
-    - BeautifulSoup object: Objeto BeautifulSoup contendo o conteúdo HTML da página.
-    - None: Em caso de erro na requisição.
+    - str: HTML da página.
+    - NAO_MODIFICADO: Se o servidor respondeu 304 (a página do cache continua válida).
+    - None: Em caso de erro na requisição ou página fora do cache no modo offline.
     """
+    html_cache, metadados = ler_cache(url) if (usar_cache or offline) else (None, {})
+    
+    if offline:
+        if html_cache is None:
+            print(f">>ERRO: PÁGINA NÃO ESTÁ NO CACHE<<: {url}")
+        return html_cache
+    
+    #cabeçalhos da requisição condicional, só se a página já estiver no cache
+    cabecalhos = {}
+    if html_cache is not None:
+        if metadados.get('etag'):
+            cabecalhos['If-None-Match'] = metadados['etag']
+        if metadados.get('last_modified'):
+            cabecalhos['If-Modified-Since'] = metadados['last_modified']
+    
     try:
-        resposta = requests.get(url)
+        cliente = sessao if sessao is not None else requests
+        resposta = cliente.get(url, headers=cabecalhos, timeout=timeout)
+        if resposta.status_code == 304:
+            return NAO_MODIFICADO
         resposta.raise_for_status()  #lança exceção se a requisição não for bem-sucedida
         
-        soup = BeautifulSoup(resposta.text, 'html.parser')
-        return soup
+        if usar_cache:
+            salvar_cache(url, resposta)
+        return resposta.text
         
     except RequestException as e:
         print(f">>ERRO DE REQUISIÇÃO<<: {url}: {e}")
+        instrumentacao.erro('questao1.baixar_pagina', e)
         return None
+
+@medir('questao1.fazer_requisicao')
+def fazer_requisicao(url, sessao=None, timeout=TIMEOUT, usar_cache=True, offline=False):
+    """
+    Faz uma requisição HTTP para a URL fornecida e retorna o conteúdo HTML parseado com BeautifulSoup.
+    
+    Args:
+    - url (str): URL da página a ser requisitada.
+    - sessao (requests.Session): Sessão HTTP compartilhada. Se None, faz uma requisição avulsa.
+    - timeout (float ou tuple): Tempo máximo de conexão/leitura da requisição, em segundos.
+    - usar_cache (bool): Se True, revalida a página com o cache em disco.
+    - offline (bool): Se True, lê a página do cache sem acessar a rede.
+    
+    Returns:
+    - BeautifulSoup object: Objeto BeautifulSoup contendo o conteúdo HTML da página.
+    - NAO_MODIFICADO: Se a página não mudou desde a última execução.
+    - None: Em caso de erro na requisição.
+    """
+    try:
+        html = baixar_pagina(url, sessao, timeout, usar_cache, offline)
+        if html is None or html is NAO_MODIFICADO:
+            return html
+        
+        soup = BeautifulSoup(html, 'html.parser')
+        return soup
+        
     except FeatureNotFound as e:
         print(f">>ERRO DO BEAUTIFULSOUP<<: {e}")
+        instrumentacao.erro('questao1.fazer_requisicao', e)
         return None
     except Exception as e:
         print(f">>ERRO<<: {e}")
+        instrumentacao.erro('questao1.fazer_requisicao', e)
 
+@medir('questao1.extrair_tabela', linhas=lambda tabela: len(tabela.find_all('tr')) if tabela is not None else 0)
 def extrair_tabela(sopa, tipo):
     """
     Extrai a tabela específica de jogos de um console a partir do objeto BeautifulSoup fornecido.
     
     Args:
     - sopa (BeautifulSoup object): Objeto BeautifulSoup da página da Wikipédia.
-    - tipo (str): Tipo de tabela ('generico' ou 'ps4').
+    - tipo (str ou dict): Tipo de tabela ('generico' ou 'ps4') ou o seletor do registro ({'id_tabela'} ou {'classe'}).
     
     Returns:
     - BeautifulSoup object: Objeto BeautifulSoup contendo a tabela de jogos.
     - None: Em caso de erro na extração da tabela.
     """
     try:
-        if tipo == 'generico':
-            tabela = sopa.find('table', id='softwarelist')
+        seletor = seletores.get(tipo) if isinstance(tipo, str) else tipo
+        if not seletor:
+            tabela = None
+        elif seletor.get('id_tabela'):
+            tabela = sopa.find('table', id=seletor['id_tabela'])
         #ps4 nao tem uma table com id 'software list' entao tem que pesquisar pela classe
-        elif tipo == 'ps4':
-            tabela = sopa.find('table', {'class': 'wikitable sortable'})
         else:
-            tabela = None
+            tabela = sopa.find('table', {'class': seletor.get('classe')})
         
         return tabela
     except AttributeError as e:
         print(f">>ERRO: TABELA NÃO ENCONTRADA<< {e}")
+        instrumentacao.erro('questao1.extrair_tabela', e)
         return None
     except Exception as e:
         print(f">>ERRO<<: {e}")
+        instrumentacao.erro('questao1.extrair_tabela', e)
 
-def limpar_dados_ps5(dataframe):
+#colunas a remover e colunas a renomear de cada console (os nomes são os do cabeçalho já achatado)
+ESQUEMAS = {
+    'ps5': {
+        'remover': ['Addons', 'Ref.']
+    },
+    'ps4': {
+        'remover': ['Referências'],
+        #no ps4 as datas de lançamento não ficam embaixo de um cabeçalho 'Data de lançamento'
+        'renomear': {'Europa': 'Lançamento EU', 'Japão': 'Lançamento JP', 'América Do Norte': 'Lançamento NA', 'Brasil': 'Lançamento BR'}
+    },
+    'xbox_x_s': {
+        'remover': ['Complementos', 'Ref.', 'Ref']
+    },
+    'xbox360': {
+        'remover': ['Addons', 'Ref.', 'Xbox One']
+    },
+    'nin_switch': {
+        'remover': ['Obs.', 'Ref.']
+    }
+}
+
+def esquema_limpeza(console):
+    """
+    Esquema de limpeza do console: o do registro (pelo nome em ESQUEMAS ou escrito no próprio registro)
+    ou, para consoles fora do registro, o de ESQUEMAS com o mesmo nome.
+
+    Returns:
+    - dict: Esquema com 'remover' e/ou 'renomear'; None se o console não tiver esquema.
     """
-    Limpa os dados específicos da tabela de jogos do PlayStation 5.
+    perfil = registro.get(console, {}).get('limpeza', console)
+    return ESQUEMAS.get(perfil) if isinstance(perfil, str) else perfil
+
+#nomes padronizados das colunas, iguais para todos os consoles
+NOMES_COLUNAS = {
+    'Género(s)': 'Gênero',
+    'Gênero(s)': 'Gênero',
+    'Desenvolvedor(es)': 'Desenvolvedor',
+    'Desenvolvedora(s)': 'Desenvolvedor',
+    'Desenvolvedora': 'Desenvolvedor',
+    'Publicadora(s)': 'Publicadora',
+    'Publicador': 'Publicadora'
+}
+
+#siglas das regiões nas colunas de data de lançamento
+REGIOES = {'AN': 'NA', 'América Do Norte': 'NA', 'Europa': 'EU', 'Japão': 'JP', 'Brasil': 'BR'}
+
+#número do mês a partir das três primeiras letras do nome em português
+MESES = {'jan': 1, 'fev': 2, 'mar': 3, 'abr': 4, 'mai': 5, 'jun': 6,
+         'jul': 7, 'ago': 8, 'set': 9, 'out': 10, 'nov': 11, 'dez': 12}
+
+#formatos de data das tabelas: '19 de fevereiro de 2021', '21 de outubro 2014', 'fevereiro de 2021', '12/Abr/2018',
+#'2021', '2021 Q4', 'Q4 2021' e previsões só com o ano ('TBA 2012', 'Festividades de 2020')
+_RE_DATA = (r'^\s*(?:'
+            r'(?:TBA|TBD|Festividades\s+de)\s+(?P<ano_previsto>\d{4})'
+            r'|(?:(?P<dia_extenso>\d{1,2})\.?º?\s+de\s+)?(?P<mes_extenso>[^\W\d_]{3,})\s+(?:de\s+)?(?P<ano_extenso>\d{4})'
+            r'|(?P<dia_barra>\d{1,2})/(?P<mes_barra>[^\W\d_]{3})[^\W\d_]*\.?/+(?P<ano_barra>\d{4})'
+            r'|(?:Q(?P<trimestre_antes>[1-4])\s+)?(?P<ano>\d{4})(?:\s*Q(?P<trimestre>[1-4]))?'
+            r')')
+
+#notas de rodapé da Wikipédia nos cabeçalhos, como 'Data de Lançamento[b]'
+_RE_NOTA = r'\[\w+\]'
+
+def achatar_colunas(dataframe):
+    """
+    Transforma o cabeçalho de dois níveis (MultiIndex) em nomes simples e padronizados.
+    
+    As colunas de data viram 'Lançamento <região>' (por exemplo 'Lançamento JP') e as
+    demais usam os nomes de NOMES_COLUNAS.
     
     Args:
-    - dataframe (pandas DataFrame): DataFrame contendo os dados da tabela de jogos do PS5.
+    - dataframe (pandas DataFrame): DataFrame com o cabeçalho lido da Wikipédia.
     
     Returns:
-    - pandas DataFrame: DataFrame limpo do PS5.
+    - list: Nomes das colunas achatados, na mesma ordem do DataFrame.
     """
-    if dataframe is not None:
-        try:
-            #retira do dataframe as colunas que nao queremos. level se refere ao level do index, e inplace para nao precisarmos criar outro dataframe
-            dataframe.drop(columns=['Addons', 'Ref.'], errors='ignore', inplace=True, level=0)
-            
-            #remove duplicatas
-            dataframe.drop_duplicates(inplace=True)
-            
-            #preenche campos vazios com "Nao Encontrado"
-            dataframe.fillna('Nao Encontrado', inplace=True)
-        except Exception as e:
-            print(f">>ERRO AO LIMPAR DADOS PS5<<: {e}")
-    
-    return dataframe
+    nomes = []
+    for coluna in dataframe.columns:
+        niveis = coluna if isinstance(coluna, tuple) else (coluna,)
+        niveis = [re.sub(_RE_NOTA, '', str(nivel)).strip() for nivel in niveis]
+        
+        #níveis repetidos (células com rowspan) viram um só nome
+        principal, detalhe = niveis[0], niveis[-1]
+        if principal == detalhe:
+            nome = principal
+        elif principal.lower().startswith('data de lan'):
+            nome = f"Lançamento {REGIOES.get(detalhe, detalhe)}"
+        else:
+            nome = f"{principal} {detalhe}"
+        
+        nomes.append(NOMES_COLUNAS.get(nome, nome))
+    return nomes
 
-def limpar_dados_ps4(dataframe):
+def converter_datas(serie):
     """
-    Limpa os dados específicos da tabela de jogos do PlayStation 4.
+    Converte as datas de lançamento escritas em português para datetime, de uma vez só para a série inteira.
+    
+    Datas só com mês e ano caem no dia 1, só com ano (ou previstas para um ano, como 'TBA 2012')
+    em 1º de janeiro e com trimestre ('2021 Q4') no primeiro dia do trimestre. Textos sem ano,
+    como 'Não lançado' ou 'TBA', viram NaT.
     
     Args:
-    - dataframe (pandas DataFrame): DataFrame contendo os dados da tabela de jogos do PS4.
+    - serie (pandas Series): Série com as datas em texto.
     
     Returns:
-    - pandas DataFrame: DataFrame limpo do PS4.
+    - pandas Series: Série de datetime64 com o mesmo índice.
     """
-    if dataframe is not None:
-        try:
-            #retira do dataframe as colunas que nao queremos. level se refere ao level do index, e inplace para nao precisarmos criar outro dataframe
-            dataframe.drop(columns=['Referências'], errors='ignore', inplace=True)
-            
-            #remove duplicatas
-            dataframe.drop_duplicates(inplace=True)
-            
-            #preenche campos vazios com "Nao Encontrado"
-            dataframe.fillna('Nao Encontrado', inplace=True)
-        except Exception as e:
-            print(f">>ERRO AO LIMPAR DADOS PS4<<: {e}")
+    partes = serie.astype('string').str.extract(_RE_DATA, flags=re.IGNORECASE)
     
-    return dataframe
+    #nome do mês (por extenso ou abreviado) -> número
+    nome_mes = partes['mes_extenso'].fillna(partes['mes_barra']).str[:3].str.lower()
+    mes = nome_mes.map(MESES).astype(float)
+    
+    #só ano: primeiro mês do trimestre, ou janeiro se não houver trimestre
+    trimestre = pd.to_numeric(partes['trimestre'].fillna(partes['trimestre_antes']), errors='coerce').astype(float).fillna(1)
+    mes = mes.mask(partes['ano'].notna() | partes['ano_previsto'].notna(), (trimestre - 1) * 3 + 1)
+    
+    ano = partes['ano_extenso'].fillna(partes['ano_barra']).fillna(partes['ano']).fillna(partes['ano_previsto'])
+    dia = partes['dia_extenso'].fillna(partes['dia_barra'])
+    componentes = pd.DataFrame({
+        'year': pd.to_numeric(ano, errors='coerce').astype(float),
+        'month': mes,
+        'day': pd.to_numeric(dia, errors='coerce').astype(float).fillna(1)
+    })
+    
+    #linhas sem ano ou com mês desconhecido ficam NaT
+    return pd.to_datetime(componentes, errors='coerce')
 
-def limpar_dados_xbox_x_s(dataframe):
+@medir('questao1.limpar_dados', linhas=tamanho)
+def limpar_dados(dataframe, console):
     """
-    Limpa os dados específicos da tabela de jogos do Xbox Series X/S.
+    Limpa a tabela de jogos de um console usando o esquema de limpeza do registro (esquema_limpeza).
+    
+    Achata o cabeçalho, remove as colunas que não queremos, padroniza os nomes das colunas,
+    remove duplicatas, converte as datas de lançamento para datetime e preenche os campos
+    de texto vazios com "Nao Encontrado".
     
     Args:
-    - dataframe (pandas DataFrame): DataFrame contendo os dados da tabela de jogos do Xbox Series X/S.
+    - dataframe (pandas DataFrame): DataFrame contendo os dados da tabela de jogos do console.
+    - console (str): Nome do console (chave do registro).
     
     Returns:
-    - pandas DataFrame: DataFrame limpo do Xbox Series X/S.
+    - pandas DataFrame: DataFrame limpo do console.
     """
-    if dataframe is not None:
-        try:
-            dataframe.drop(columns=['Complementos', 'Ref.'], errors='ignore', level=0, inplace=True)
-            dataframe.drop_duplicates(inplace=True)
-            dataframe.fillna('Nao Encontrado', inplace=True)
-        except Exception as e:
-            print(f">>ERRO AO LIMPAR DADOS XBOX X/S<<: {e}")
+    if dataframe is None:
+        return None
+    
+    esquema = esquema_limpeza(console) or {}
+    try:
+        dataframe = dataframe.copy()
+        dataframe.columns = achatar_colunas(dataframe)
+        
+        #retira do dataframe as colunas que nao queremos
+        dataframe = dataframe.drop(columns=esquema.get('remover', []), errors='ignore')
+        dataframe = dataframe.rename(columns=esquema.get('renomear', {}))
+        
+        #remove duplicatas
+        dataframe = dataframe.drop_duplicates()
+        
+        #converte todas as colunas de lançamento numa única passada e devolve cada uma para o seu lugar
+        colunas_data = [coluna for coluna in dataframe.columns if coluna.startswith('Lançamento')]
+        if colunas_data:
+            datas = converter_datas(pd.concat([dataframe[coluna] for coluna in colunas_data], keys=colunas_data))
+            for coluna in colunas_data:
+                dataframe[coluna] = datas.loc[coluna].values
+        
+        #preenche campos de texto vazios com "Nao Encontrado"
+        colunas_texto = [coluna for coluna in dataframe.columns if coluna not in colunas_data]
+        dataframe[colunas_texto] = dataframe[colunas_texto].fillna('Nao Encontrado')
+    except Exception as e:
+        print(f">>ERRO AO LIMPAR DADOS {console}<<: {e}")
+        instrumentacao.erro('questao1.limpar_dados', e)
     
     return dataframe
 
-def limpar_dados_xbox_360(dataframe):
+@medir('questao1.exportar_dados', linhas_entrada=tamanho)
+def exportar_dados(dataframe, nome_do_arquivo, formato='csv'):
     """
-    Limpa os dados específicos da tabela de jogos do Xbox 360.
+    Exporta os dados de um DataFrame para CSV e/ou para o catálogo colunar unificado.
     
     Args:
-    - dataframe (pandas DataFrame): DataFrame contendo os dados da tabela de jogos do Xbox 360.
+    - dataframe (pandas DataFrame): DataFrame contendo os dados a serem exportados.
+    - nome_do_arquivo (str): Nome base do arquivo de saída (sem extensão), que também é o nome do console.
+    - formato (str): 'csv' (um arquivo por console), 'catalogo' (partição do catálogo em PASTA_CATALOGO) ou 'ambos'.
     
     Returns:
-    - pandas DataFrame: DataFrame limpo do Xbox 360.
+    - bool: True se os dados foram exportados.
     """
-    if dataframe is not None:
-        try:
-            dataframe.drop(columns=['Addons', 'Ref.', 'Xbox One'], errors='ignore', level=0, inplace=True)
-            dataframe.drop_duplicates(inplace=True)
-            dataframe.fillna('Nao Encontrado', inplace=True)
-        except Exception as e:
-            print(f">>ERRO AO LIMPAR DADOS XBOX 360<<: {e}")
+    try:
+        if dataframe is not None:
+            if formato in ('csv', 'ambos'):
+                dataframe.to_csv(f"Dados_Jogos/{nome_do_arquivo}.csv", index=False)        
+                print(f">>DADOS EXPORTADOS<< : {nome_do_arquivo}.csv")
+            if formato in ('catalogo', 'ambos'):
+                return exportar_catalogo(dataframe, nome_do_arquivo)
+            return True
+    except Exception as e:
+        print(f">>ERRO NO EXPORTAR<< :  {e}") 
+        instrumentacao.erro('questao1.exportar_dados', e)
+    return False
+
+def saida_existe(nome, formato='csv'):
+    """
+    Verifica se a saída de um console já foi gerada no formato pedido.
     
-    return dataframe
+    Args:
+    - nome (str): Nome do console.
+    - formato (str): 'csv', 'catalogo' ou 'ambos'.
+    
+    Returns:
+    - bool: True se todos os arquivos de saída do console existem.
+    """
+    existe_csv = os.path.exists(f"Dados_Jogos/{nome}.csv")
+    existe_catalogo = os.path.isdir(os.path.join(PASTA_CATALOGO, f'console={nome}'))
+    if formato == 'csv':
+        return existe_csv
+    if formato == 'catalogo':
+        return existe_catalogo
+    return existe_csv and existe_catalogo
 
-def limpar_dados_nin_switch(dataframe):
+@medir('questao1.ler_tabela', linhas=tamanho)
+def ler_tabela(nome, html, motor='streaming'):
     """
-    Limpa os dados específicos da tabela de jogos do Nintendo Switch.
+    Cria o DataFrame com a tabela de jogos de um console a partir do HTML da página.
     
     Args:
-    - dataframe (pandas DataFrame): DataFrame contendo os dados da tabela de jogos do Nintendo Switch.
+    - nome (str): Nome do console (chave do objeto urls).
+    - html (str): HTML da página.
+    - motor (str): 'streaming' lê o HTML numa única passada até o fim da tabela;
+      'bs4' faz o parse completo com BeautifulSoup e depois pd.read_html na tabela.
     
     Returns:
-    - pandas DataFrame: DataFrame limpo do Nintendo Switch.
+    - pandas DataFrame: DataFrame com a tabela de jogos, ou None se a tabela não for encontrada.
     """
-    if dataframe is not None:
-        try:
-            dataframe.drop(columns=['Obs.', 'Ref.'], errors='ignore', level=0, inplace=True)
-            dataframe.drop_duplicates(inplace=True)
-            dataframe.fillna('Nao Encontrado', inplace=True)
-        except Exception as e:
-            print(f">>ERRO AO LIMPAR DADOS NINTENDO SWITCH<<: {e}")
+    #seletor do registro; fora do registro, o tipo é generico se nome não for igual a ps4
+    seletor = registro.get(nome, {}).get('seletor') or seletores['generico' if nome != 'ps4' else 'ps4']
     
-    return dataframe
+    if motor == 'streaming':
+        return extrair_dataframe(html, **seletor)
+    
+    sopa = BeautifulSoup(html, 'html.parser')
+    tabela = extrair_tabela(sopa, seletor)
+    if tabela is None:
+        return None
+    
+    #cria o dataframe usando a tabela
+    return pd.read_html(StringIO(str(tabela)))[0]
 
-def exportar_dados(dataframe, nome_do_arquivo):
+def processar_pagina(nome, html, motor='streaming', medir_extracao=False, formato_saida='csv'):
     """
-    Exporta os dados de um DataFrame para CSV.
+    Extrai, limpa e exporta a tabela de jogos de um console a partir da página já baixada.
     
     Args:
-    - dataframe (pandas DataFrame): DataFrame contendo os dados a serem exportados.
-    - nome_do_arquivo (str): Nome base do arquivo de saída (sem extensão).
+    - nome (str): Nome do console (chave do objeto urls).
+    - html (str): HTML da página do console, ou NAO_MODIFICADO.
+    - motor (str): Motor de extração da tabela ('streaming' ou 'bs4').
+    - medir_extracao (bool): Se True, mostra o tempo e o pico de memória da extração.
+    - formato_saida (str): Formato de exportação ('csv', 'catalogo' ou 'ambos').
+    
+    Returns:
+    - tuple: (estado alcançado pela página, erro ou None); estados de checkpoint_coleta.ESTADOS.
     """
+    if html is NAO_MODIFICADO:
+        #página igual à do cache: se a saída já existe não há nada para refazer
+        if saida_existe(nome, formato_saida):
+            print(f">>PÁGINA NÃO MODIFICADA<< : {nome}")
+            return 'exportada', None
+        html = ler_cache(urls[nome])[0]
+    
+    if not html:
+        return 'pendente', 'página não baixada'
+    
+    estado = 'baixada'
     try:
-        if dataframe is not None:
-            dataframe.to_csv(f"Dados_Jogos/{nome_do_arquivo}.csv", index=False)        
-            print(f">>DADOS EXPORTADOS<< : {nome_do_arquivo}.csv")
+        if medir_extracao:
+            dataframe, tempo, pico = medir_tempo_memoria(ler_tabela, nome, html, motor)
+            print(f">>EXTRAÇÃO {nome} ({motor})<< : {tempo:.3f}s, pico de memória {pico / 1024 / 1024:.1f} MB")
+        else:
+            dataframe = ler_tabela(nome, html, motor)
+        
+        if dataframe is None:
+            return estado, 'tabela não encontrada'
+        
+        #aplica o esquema de limpeza correspondente ao console
+        dataframe_limpo = limpar_dados(dataframe, nome) if esquema_limpeza(nome) is not None else None
+        if dataframe_limpo is None:
+            return estado, 'console sem esquema de limpeza'
+        estado = 'extraida'
+        
+        if exportar_dados(dataframe_limpo, nome, formato_saida):
+            return 'exportada', None
+        return estado, 'falha ao exportar'
     except Exception as e:
-        print(f">>ERRO NO EXPORTAR<< :  {e}") 
+        print(f">>ERRO AO PROCESSAR {nome}<<: {e}")
+        instrumentacao.erro('questao1.processar_pagina', e)
+        return estado, str(e)
 
-def main():
+def assinatura_pagina(console, formato_saida='csv'):
+    """
+    Resumo da configuração de uma página: se mudar, a página volta para 'pendente' no checkpoint.
+    """
+    configuracao = {'url': urls[console], 'seletor': registro.get(console, {}).get('seletor'),
+                    'limpeza': esquema_limpeza(console), 'formato': formato_saida}
+    return hashlib.sha256(json.dumps(configuracao, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def concluir_pagina(checkpoint, nome, html, motor='streaming', medir_extracao=False, formato_saida='csv'):
+    """
+    Processa a página baixada e grava no checkpoint o estado que ela alcançou.
+    """
+    if html is not None:
+        checkpoint.marcar(nome, 'baixada')
+    estado, erro = processar_pagina(nome, html, motor, medir_extracao, formato_saida)
+    checkpoint.marcar(nome, estado, erro)
+
+def _resumir_coleta(checkpoint):
+    """
+    Mostra o estado da rodada e devolve se ela terminou (todas as páginas exportadas).
+    """
+    resumo = checkpoint.resumo()
+    print(f">>COLETA (RODADA {checkpoint.rodada})<< : " + ', '.join(f'{quantidade} {estado}' for estado, quantidade in resumo['estados'].items()))
+    for console, erro in resumo['erros'].items():
+        print(f">>PÁGINA INCOMPLETA<< : {console}: {erro}")
+    completa = all(quantidade == 0 for estado, quantidade in resumo['estados'].items() if estado != 'exportada')
+    if not completa:
+        print('>>RODE DE NOVO PARA RETOMAR SÓ AS PÁGINAS QUE FALTAM<<')
+    return completa
+
+@medir('questao1.main')
+def main(concorrente=True, max_conexoes=MAX_CONEXOES, timeout=TIMEOUT, usar_cache=True, offline=False,
+         motor='streaming', medir_extracao=False, formato_saida='csv', recomecar=False, arquivo_checkpoint=ARQUIVO_CHECKPOINT):
     """
     Função principal que coordena todo o processo de leitura, limpeza e exportação de dados de jogos de consoles.
+    
+    Args:
+    - concorrente (bool): Se True, baixa as páginas em paralelo; se False, uma de cada vez.
+    - max_conexoes (int): Número máximo de páginas baixadas ao mesmo tempo.
+    - timeout (float ou tuple): Tempo máximo de conexão/leitura de cada requisição, em segundos.
+    - usar_cache (bool): Se True, revalida as páginas com o cache e pula as que não mudaram.
+    - offline (bool): Se True, reprocessa as páginas do cache sem acessar a rede.
+    - motor (str): Motor de extração das tabelas ('streaming' ou 'bs4').
+    - medir_extracao (bool): Se True, mostra o tempo e o pico de memória da extração de cada página.
+    - formato_saida (str): 'csv' (um arquivo por console), 'catalogo' (catálogo colunar unificado) ou 'ambos'.
+    - recomecar (bool): Se True, começa uma coleta nova mesmo que a anterior tenha ficado incompleta.
+    - arquivo_checkpoint (str): Banco SQLite com o estado de cada página (checkpoint_coleta).
+
+    Returns:
+    - bool: True se todas as páginas foram exportadas; False se a coleta ficou incompleta
+      (o pipeline não marca a etapa como executada e a próxima execução retoma as que faltam).
     """
     print('>>IMPORTANDO DADOS...ESPERE UM MINUTO...<<')
     
-    
-    #loop nos itens do objeto urls.
-    for nome, url in urls.items():
-        sopa = fazer_requisicao(url)
-        if sopa:
-            #tipo é generico se nome não for igual a ps4
-            tipo = 'generico' if nome != 'ps4' else 'ps4'
-            tabela = extrair_tabela(sopa, tipo)
-            
-            #cria o dataframe usando a tabela
-            dataframe = pd.read_html(StringIO(str(tabela)))[0]
-            
-            #aplica a função de limpeza correspondente ao tipo de console
-            if nome == 'ps5':
-                dataframe_limpo = limpar_dados_ps5(dataframe)
-            elif nome == 'ps4':
-                dataframe_limpo = limpar_dados_ps4(dataframe)
-            elif nome == 'xbox_x_s':
-                dataframe_limpo = limpar_dados_xbox_x_s(dataframe)
-            elif nome == 'xbox360':
-                dataframe_limpo = limpar_dados_xbox_360(dataframe)
-            elif nome == 'nin_switch':
-                dataframe_limpo = limpar_dados_nin_switch(dataframe)
+    checkpoint = CheckpointColeta(arquivo_checkpoint)
+    try:
+        #coleta anterior incompleta: só as páginas que ainda não foram exportadas
+        estados = checkpoint.iniciar({nome: (url, assinatura_pagina(nome, formato_saida)) for nome, url in urls.items()}, recomecar)
+        faltando = {nome: url for nome, url in urls.items() if estados[nome] != 'exportada'}
+        if len(faltando) < len(urls):
+            print(f">>RETOMANDO COLETA (RODADA {checkpoint.rodada})<< : {len(urls) - len(faltando)} páginas já exportadas, "
+                  f"{len(faltando)} faltando")
+            instrumentacao.contar('questao1.paginas_puladas', len(urls) - len(faltando))
+        
+        #páginas já baixadas nesta rodada são reprocessadas do cache, sem acessar a rede
+        for nome in list(faltando):
+            html = ler_cache(faltando[nome])[0] if estados[nome] != 'pendente' else None
+            if html is not None:
+                del faltando[nome]
+                concluir_pagina(checkpoint, nome, html, motor, medir_extracao, formato_saida)
+        
+        with criar_sessao_http(max_conexoes) as sessao:
+            if not concorrente:
+                #loop nos itens do objeto urls.
+                for nome, url in faltando.items():
+                    html = baixar_pagina(url, sessao, timeout, usar_cache, offline)
+                    concluir_pagina(checkpoint, nome, html, motor, medir_extracao, formato_saida)
             else:
-                dataframe_limpo = None
-            
-            #armazena o dataframe limpo no dicionário de dataframes
-            if dataframe_limpo is not None:
-                exportar_dados(dataframe_limpo, nome)
+                #baixa as páginas em paralelo e processa cada uma assim que chega,
+                #assim o tempo total acompanha a página mais lenta e não a soma de todas
+                with ThreadPoolExecutor(max_workers=max_conexoes) as executor:
+                    futuros = {executor.submit(baixar_pagina, url, sessao, timeout, usar_cache, offline): nome for nome, url in faltando.items()}
+                    for futuro in as_completed(futuros):
+                        concluir_pagina(checkpoint, futuros[futuro], futuro.result(), motor, medir_extracao, formato_saida)
+        completa = _resumir_coleta(checkpoint)
+    finally:
+        checkpoint.fechar()
+    return completa
     
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description='Importa as listas de jogos de consoles da Wikipédia.')
+    parser.add_argument('--sequencial', action='store_true', help='baixa uma página de cada vez')
+    parser.add_argument('--max-conexoes', type=int, default=MAX_CONEXOES, help='número máximo de downloads simultâneos')
+    parser.add_argument('--timeout', type=float, default=TIMEOUT[1], help='tempo máximo de leitura de cada requisição (segundos)')
+    parser.add_argument('--sem-cache', action='store_true', help='ignora o cache e baixa todas as páginas de novo')
+    parser.add_argument('--offline', action='store_true', help='reprocessa as páginas do cache sem acessar a rede')
+    parser.add_argument('--motor', choices=['streaming', 'bs4'], default='streaming', help='motor de extração das tabelas')
+    parser.add_argument('--medir', action='store_true', help='mostra tempo e pico de memória da extração de cada página')
+    parser.add_argument('--saida', choices=['csv', 'catalogo', 'ambos'], default='csv', help='formato de exportação dos dados')
+    parser.add_argument('--recomecar', action='store_true', help='começa uma coleta nova em vez de retomar a anterior incompleta')
+    parser.add_argument('--metricas', action='store_true', help="grava log JSON e métricas do Prometheus em 'Metricas/'")
+    args = parser.parse_args()
+    if args.metricas:
+        instrumentacao.ativar('questao1')
+    
+    main(concorrente=not args.sequencial, max_conexoes=args.max_conexoes, timeout=(TIMEOUT[0], args.timeout),
+         usar_cache=not args.sem_cache, offline=args.offline, motor=args.motor, medir_extracao=args.medir,
+         formato_saida=args.saida, recomecar=args.recomecar)
@@ -1,5 +1,28 @@
+import argparse
+import glob
+import json
+import os
+import re
+import time
 import pandas as pd
+import numpy as np
 from datetime import datetime
+from openpyxl import Workbook, load_workbook
+from concurrent.futures import ProcessPoolExecutor
+from deduplicacao import chaves_usuario, deduplicar
+from ids_usuarios import ARQUIVO_IDS, IdsUsuarios
+import instrumentacao
+from instrumentacao import medir, tamanho
+from usuarios_colunar import ARQUIVO_USUARIOS, ARQUIVO_EXCEL, EscritorUsuarios, exportar_usuarios
+
+#número de linhas lidas e limpas de cada vez no modo em blocos
+TAMANHO_BLOCO = 50_000
+
+#caracteres lidos de cada vez de um arquivo JSON no modo em blocos
+TAMANHO_LEITURA = 64 * 1024
+
+#tamanho máximo (em caracteres) de um registro JSON no modo em blocos: acima disso o arquivo é rejeitado
+MAX_REGISTRO = 1024 * 1024
 
 def ler_arquivos():
     """
@@ -40,30 +63,277 @@ def ler_arquivos():
 
     return dataframe_csv, dataframe_json, dataframe_excel
 
-def limpar_dados(dataframe):
+def ler_csv_em_blocos(caminho, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Lê um arquivo CSV em blocos de tamanho fixo.
+
+    Args:
+    - caminho (str): Caminho do arquivo CSV.
+    - tamanho_bloco (int): Número de linhas de cada bloco.
+
+    Yields:
+    - pandas DataFrame: Um bloco de linhas do arquivo.
+    """
+    with pd.read_csv(caminho, chunksize=tamanho_bloco) as leitor:
+        yield from leitor
+
+def _cortado_no_fim(erro, buffer):
+    """
+    Se o erro de decodificação pode ser só um objeto cortado no fim do buffer, e não JSON inválido:
+    uma string sem fim ou um erro depois do qual o buffer não tem mais nenhum separador.
+    """
+    if erro.msg.startswith('Unterminated string'):
+        return True
+    return not re.search(r'[\s,:\[\]{}"]', buffer[erro.pos:])
+
+def ler_json_em_blocos(caminho, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Lê um arquivo JSON em blocos de tamanho fixo, sem carregar o arquivo inteiro.
+
+    Aceita JSON por linha (um objeto por linha) e também uma lista JSON ('[{...}, {...}]'),
+    que é decodificada objeto por objeto a partir de um buffer.
+
+    O buffer só guarda o registro atual: um registro maior que MAX_REGISTRO ou um erro de sintaxe
+    no meio do buffer (não no fim, onde o objeto pode estar só cortado) gera ValueError na hora.
+
+    Args:
+    - caminho (str): Caminho do arquivo JSON.
+    - tamanho_bloco (int): Número de registros de cada bloco.
+
+    Yields:
+    - pandas DataFrame: Um bloco de registros do arquivo.
+    """
+    decodificador = json.JSONDecoder()
+    separadores = re.compile(r'[\s,]*')
+    registros = []
+    with open(caminho, encoding='utf-8') as arquivo:
+        buffer = arquivo.read(TAMANHO_LEITURA).lstrip()
+        posicao = 1 if buffer.startswith('[') else 0
+
+        while True:
+            #pula espaços e vírgulas entre os objetos
+            posicao = separadores.match(buffer, posicao).end()
+            if buffer.startswith(']', posicao):
+                break
+            try:
+                registro, posicao_final = decodificador.raw_decode(buffer, posicao)
+            except json.JSONDecodeError as erro:
+                if not _cortado_no_fim(erro, buffer):
+                    raise
+                if len(buffer) - posicao > MAX_REGISTRO:
+                    raise ValueError(f"registro JSON com mais de {MAX_REGISTRO} caracteres em '{caminho}'") from erro
+                #objeto cortado no fim do buffer: descarta o que já foi lido e lê mais um pedaço
+                #(do tamanho do que sobrou, no mínimo: um registro grande é decodificado O(log n) vezes)
+                pedaco = arquivo.read(max(TAMANHO_LEITURA, len(buffer) - posicao))
+                if not pedaco:
+                    if buffer[posicao:].strip():
+                        raise
+                    break
+                buffer = buffer[posicao:] + pedaco
+                posicao = 0
+                continue
+
+            registros.append(registro)
+            posicao = posicao_final
+            if len(registros) >= tamanho_bloco:
+                yield pd.DataFrame(registros)
+                registros = []
+
+    if registros:
+        yield pd.DataFrame(registros)
+
+def ler_excel_em_blocos(caminho, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Lê a primeira planilha de um arquivo Excel em blocos, com o openpyxl em modo somente leitura.
+
+    Args:
+    - caminho (str): Caminho do arquivo Excel.
+    - tamanho_bloco (int): Número de linhas de cada bloco.
+
+    Yields:
+    - pandas DataFrame: Um bloco de linhas da planilha.
+    """
+    #read_only => as linhas são lidas do arquivo conforme são percorridas, sem montar a planilha na memória
+    planilha = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        linhas = planilha.active.iter_rows(values_only=True)
+        colunas = next(linhas, None)
+        if colunas is None:
+            return
+
+        bloco = []
+        for linha in linhas:
+            bloco.append(linha)
+            if len(bloco) >= tamanho_bloco:
+                yield pd.DataFrame(bloco, columns=colunas)
+                bloco = []
+        if bloco:
+            yield pd.DataFrame(bloco, columns=colunas)
+    finally:
+        planilha.close()
+
+#leitor em blocos de cada extensão de arquivo de usuários
+LEITORES_EM_BLOCOS = {
+    '.csv': ler_csv_em_blocos,
+    '.json': ler_json_em_blocos,
+    '.jsonl': ler_json_em_blocos,
+    '.xlsx': ler_excel_em_blocos
+}
+
+def ler_arquivos_em_blocos(tamanho_bloco=TAMANHO_BLOCO, arquivos=None):
+    """
+    Lê os arquivos de usuários em blocos, um arquivo depois do outro.
+
+    Args:
+    - tamanho_bloco (int): Número de linhas de cada bloco.
+    - arquivos (list): Caminhos dos arquivos, na ordem de leitura. Se None, lê os mesmos
+      arquivos CSV, JSON e Excel de ler_arquivos.
+
+    Yields:
+    - pandas DataFrame: Um bloco de linhas de um dos arquivos.
+    """
+    if arquivos is None:
+        arquivos = ['Usuarios/usuarios.csv', 'Usuarios/usuarios.json', 'Usuarios/usuarios.xlsx']
+
+    for caminho in arquivos:
+        extensao = os.path.splitext(caminho)[1].lower()
+        leitor = LEITORES_EM_BLOCOS.get(extensao)
+        if leitor is None:
+            print(f">>ERROR: FORMATO NÃO SUPORTADO<< {caminho}")
+            continue
+        try:
+            yield from leitor(caminho, tamanho_bloco)
+        except FileNotFoundError:
+            print(f">>ERROR: '{caminho}' NÃO ENCONTRADO<<")
+        except Exception as e:
+            print(f">>ERROR: ERRO NA LEITURA DE ARQUIVO {extensao[1:].upper()}<< {str(e)}")
+
+def ler_json(caminho):
+    """
+    Lê um arquivo JSON de usuários, seja uma lista JSON ou um objeto por linha.
+
+    Args:
+    - caminho (str): Caminho do arquivo JSON.
+
+    Returns:
+    - pandas DataFrame: DataFrame com os registros do arquivo.
+    """
+    with open(caminho, encoding='utf-8') as arquivo:
+        inicio = arquivo.read(1024).lstrip()
+    return pd.read_json(caminho, lines=not inicio.startswith('['))
+
+#leitor de cada extensão de arquivo de usuários
+LEITORES = {
+    '.csv': pd.read_csv,
+    '.json': ler_json,
+    '.jsonl': ler_json,
+    '.xlsx': pd.read_excel
+}
+
+def descobrir_arquivos(diretorio='Usuarios', padrao=None, manifesto=None, ignorar=('usuarios_final.xlsx', 'usuarios_final.parquet')):
+    """
+    Encontra os arquivos de usuários a serem unificados.
+
+    A ordem é determinística: a do manifesto, se houver; senão, a ordem alfabética dos caminhos.
+
+    Args:
+    - diretorio (str): Pasta onde procurar arquivos com extensão conhecida (de LEITORES).
+    - padrao (str): Padrão glob (por exemplo 'Entregas/2024-*/*.csv'); substitui o diretório.
+    - manifesto (str): Arquivo texto com um caminho por linha (linhas com '#' são comentários);
+      caminhos relativos são relativos à pasta do manifesto. Substitui diretório e padrão.
+    - ignorar (tuple): Nomes de arquivo que nunca são lidos (por exemplo, a própria saída).
+
+    Returns:
+    - list: Caminhos dos arquivos encontrados.
+    """
+    if manifesto:
+        pasta_manifesto = os.path.dirname(manifesto)
+        with open(manifesto, encoding='utf-8') as arquivo:
+            linhas = [linha.strip() for linha in arquivo]
+        arquivos = [os.path.join(pasta_manifesto, linha) for linha in linhas if linha and not linha.startswith('#')]
+    elif padrao:
+        arquivos = sorted(glob.glob(padrao, recursive=True))
+    else:
+        arquivos = sorted(os.path.join(diretorio, nome) for nome in os.listdir(diretorio))
+
+    return [caminho for caminho in arquivos
+            if os.path.splitext(caminho)[1].lower() in LEITORES
+            and os.path.basename(caminho) not in ignorar]
+
+def ler_fonte(caminho):
+    """
+    Lê um arquivo de usuários com o leitor da sua extensão e mede o tempo gasto.
+
+    Roda dentro dos processos de carregar_fontes, então não imprime nada: os erros voltam na resposta.
+
+    Args:
+    - caminho (str): Caminho do arquivo.
+
+    Returns:
+    - tuple: (DataFrame lido ou None, tempo em segundos, mensagem de erro ou None).
+    """
+    inicio = time.perf_counter()
+    try:
+        leitor = LEITORES[os.path.splitext(caminho)[1].lower()]
+        return leitor(caminho), time.perf_counter() - inicio, None
+    except FileNotFoundError:
+        return None, time.perf_counter() - inicio, 'NÃO ENCONTRADO'
+    except Exception as e:
+        return None, time.perf_counter() - inicio, str(e)
+
+def carregar_fontes(arquivos, processos=None):
+    """
+    Lê vários arquivos de usuários em paralelo, num pool de processos.
+
+    Os DataFrames voltam na mesma ordem de 'arquivos', independente de qual terminou antes.
+
+    Args:
+    - arquivos (list): Caminhos dos arquivos (por exemplo, a saída de descobrir_arquivos).
+    - processos (int): Número de processos. Se None, usa o número de CPUs; 1 lê tudo no processo atual.
+
+    Returns:
+    - list: DataFrames lidos (arquivos com erro são deixados de fora).
+    """
+    if processos == 1 or len(arquivos) <= 1:
+        resultados = map(ler_fonte, arquivos)
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            #map devolve os resultados na ordem dos arquivos
+            resultados = list(executor.map(ler_fonte, arquivos))
+
+    dataframes = []
+    for caminho, (dataframe, tempo, erro) in zip(arquivos, resultados):
+        if erro is not None:
+            print(f">>ERROR: ERRO NA LEITURA DE '{caminho}'<< {erro}")
+            continue
+        print(f">>ARQUIVO LIDO<< : {caminho} ({len(dataframe)} linhas, {tempo:.3f}s)")
+        dataframes.append(dataframe)
+    return dataframes
+
+@medir('questao2.limpar_dados', linhas=tamanho)
+def limpar_dados(dataframe, aceitar_dia_mes_ano=True):
     """
     Limpa e padroniza a coluna 'data_nascimento' do DataFrame.
 
-    Aplica a função data_nova para padronizar e validar datas,
-    converte para objetos datetime e formata para o formato 'YYYY/MM/DD'.
+    Converte as datas com normalizar_datas (todas de uma vez, sem apply linha a linha)
+    e formata para o formato 'YYYY/MM/DD'.
     Remove linhas onde a data não pôde ser padronizada.
 
     Args:
     - dataframe (pandas DataFrame): DataFrame contendo a coluna 'data_nascimento' a ser limpa.
+    - aceitar_dia_mes_ano (bool): Se True, também lê datas 'DD-MM-YYYY' (ver normalizar_datas).
 
     Returns:
     - dataframe_limpo (pandas DataFrame): DataFrame com a coluna 'data_nascimento' limpa e padronizada.
     """
     try:
         dataframe = dataframe.astype(str)
-        #aplica a função data_nova em todas as datas da coluna 'data_nascimento'
-        dataframe['data_nascimento'] = dataframe['data_nascimento'].apply(data_nova)
+        #converte a coluna 'data_nascimento' inteira para datetime; datas inválidas viram NaT
+        dataframe['data_nascimento'] = normalizar_datas(dataframe['data_nascimento'], aceitar_dia_mes_ano)
         
-        #to_datetime => converte para datetime do pandas; com erro 'coerce' para tratamento de datas inválidas
-        dataframe['data_nascimento'] = pd.to_datetime(dataframe['data_nascimento'], errors='coerce')
-        
-        #strftime => formata a data para 'YYYY/MM/DD'
-        dataframe['data_nascimento'] = dataframe['data_nascimento'].dt.strftime('%Y/%m/%d')
+        #formata a data para 'YYYY/MM/DD' (astype(str) gera 'YYYY-MM-DD' bem mais rápido que strftime)
+        datas = dataframe['data_nascimento']
+        dataframe['data_nascimento'] = datas.astype(str).str.replace('-', '/').where(datas.notna())
 
         #remove linhas sem dados.
         dataframe = dataframe.dropna()
@@ -76,9 +346,52 @@ def limpar_dados(dataframe):
     
     except Exception as e:
         print(f">>ERROR<< {str(e)}")
+        instrumentacao.erro('questao2.limpar_dados', e)
         return pd.DataFrame()
 
+def normalizar_datas(serie, aceitar_dia_mes_ano=True):
+    """
+    Converte uma coluna de datas em texto para datetime com operações na coluna inteira.
+    
+    Formatos aceitos:
+    - 'YYYY-MM-DD' é lido direto;
+    - 'YY/MM/DD' vira 19YY se YY > 20, senão 20YY (o mesmo pivô de data_nova);
+    - 'DD-MM-YYYY' (como '22-11-1992' em usuarios.json), se aceitar_dia_mes_ano;
+    - datas que não existem (como 2000-02-30) e formatos desconhecidos viram NaT.
+
+    Mudança de comportamento: o caminho antigo (data_nova seguida de pd.to_datetime(errors='coerce'))
+    usava o formato da primeira data da coluna para todas. Com a primeira data em 'YYYY-MM-DD', como nos
+    arquivos de 'Usuarios/', as datas 'DD-MM-YYYY' viravam NaT e o usuário era descartado; agora elas
+    são lidas. Com aceitar_dia_mes_ano=False o resultado é o do caminho antigo nesse caso (primeira data ISO).
+    
+    Args:
+    - serie (pandas Series): Série com as datas em texto.
+    - aceitar_dia_mes_ano (bool): Se True, também lê 'DD-MM-YYYY'.
+    
+    Returns:
+    - pandas Series: Série de datetime64 com o mesmo índice.
+    """
+    texto = serie.astype('string').str.strip()
+    
+    #formato principal: errors='coerce' => datas que não existem (30 de fevereiro, mês 13) viram NaT
+    datas = pd.to_datetime(texto, format='%Y-%m-%d', errors='coerce')
+    
+    #'YY/MM/DD': monta 'YYYY-MM-DD' com o mesmo pivô de século de data_nova e converte só essas linhas
+    curtas = texto.str.fullmatch(r'\d{2}/\d{2}/\d{2}').fillna(False).astype(bool)
+    if curtas.any():
+        ano = texto[curtas].str.slice(0, 2)
+        seculo = pd.Series(np.where(ano.astype(int) > 20, '19', '20'), index=ano.index)
+        completas = seculo + ano + '-' + texto[curtas].str.slice(3, 5) + '-' + texto[curtas].str.slice(6, 8)
+        datas[curtas] = pd.to_datetime(completas, format='%Y-%m-%d', errors='coerce')
+    
+    if aceitar_dia_mes_ano:
+        faltando = datas.isna()
+        datas[faltando] = pd.to_datetime(texto[faltando], format='%d-%m-%Y', errors='coerce')
+    
+    return datas
+
 #OBRIGADO ESTAGIARIO!!!!
+#(substituída por normalizar_datas; mantida como referência do comportamento original)
 def data_nova(data):
     try:
         if len(data) == 8 and '/' in data:
@@ -100,32 +413,52 @@ def data_nova(data):
     except (ValueError, IndexError):
         return None
     
-def unificar_dados(df_csv, df_json, df_excel):
+@medir('questao2.unificar_dados', linhas=tamanho)
+def unificar_dados(*dataframes, remover_duplicatas=False, arquivo_ids=ARQUIVO_IDS, aceitar_dia_mes_ano=True):
     """
-    Unifica os DataFrames df_csv, df_json e df_excel em um único DataFrame.
+    Unifica os DataFrames (por exemplo df_csv, df_json e df_excel) em um único DataFrame, na ordem recebida.
     Limpa a coluna 'data_nascimento' e adiciona uma nova coluna 'id' única para cada usuário.
 
+    O id vem das chaves naturais do usuário (ids_usuarios): o mesmo usuário mantém o id entre execuções,
+    mesmo que registros sejam inseridos ou removidos antes dele.
+
     Args:
-    - df_csv (pandas DataFrame): DataFrame contendo dados lidos do arquivo CSV.
-    - df_json (pandas DataFrame): DataFrame contendo dados lidos do arquivo JSON.
-    - df_excel (pandas DataFrame): DataFrame contendo dados lidos do arquivo Excel.
+    - *dataframes (pandas DataFrame): DataFrames lidos dos arquivos de usuários.
+    - remover_duplicatas (bool): Se True, junta os registros do mesmo usuário (deduplicacao.deduplicar)
+      antes de gerar os ids.
+    - arquivo_ids (str): Banco SQLite com o id de cada chave natural.
+    - aceitar_dia_mes_ano (bool): Se True, também lê datas de nascimento 'DD-MM-YYYY'.
 
     Returns:
     - dataframe_unificado_limpo (pandas DataFrame): DataFrame unificado e limpo com colunas reorganizadas.
     """
     try:
         #concatena os dataframes em um único dataframe
-        dataframe_unificado = pd.concat([df_csv, df_json, df_excel], ignore_index=True)
+        dataframe_unificado = pd.concat(dataframes, ignore_index=True)
         
         #remove a coluna 'id' se existir
         if 'id' in dataframe_unificado.columns:
             dataframe_unificado.drop(columns=['id'], inplace=True)
         
         #limpa e padronizar a coluna 'data_nascimento'
-        dataframe_unificado = limpar_dados(dataframe_unificado)
+        dataframe_unificado = limpar_dados(dataframe_unificado, aceitar_dia_mes_ano)
+        
+        #junta registros repetidos do mesmo usuário, comparando só candidatos do mesmo bloco
+        if remover_duplicatas:
+            total = len(dataframe_unificado)
+            dataframe_unificado, pares = deduplicar(dataframe_unificado, manter_chaves=True)
+            chaves = dataframe_unificado.pop('_chaves').tolist()
+            print(f">>DEDUPLICAÇÃO<< : {pares} pares candidatos avaliados, {total} -> {len(dataframe_unificado)} usuários")
+        else:
+            chaves = chaves_usuario(dataframe_unificado)
         
-        #gera um novo ID único para cada usuário
-        dataframe_unificado['id'] = range(1, len(dataframe_unificado) + 1)
+        #id de cada usuário pelas chaves naturais, o mesmo das execuções anteriores
+        ids = IdsUsuarios(arquivo_ids)
+        try:
+            dataframe_unificado['id'] = ids.atribuir(chaves)
+            print(f">>IDS<< : {ids.novos} usuários novos")
+        finally:
+            ids.fechar()
 
         #reorganiza as colunas no dataframe final (reindex)
         nova_ordem = ['id'] + [col for col in dataframe_unificado.columns if col != 'id']
@@ -135,41 +468,189 @@ def unificar_dados(df_csv, df_json, df_excel):
     
     except Exception as e:
         print(f">>ERROR: FALHA NA UNIFICAÇÃO<< {str(e)}")
+        instrumentacao.erro('questao2.unificar_dados', e)
         return pd.DataFrame()
 
         
-def exportar_dados(df, nome_arquivo):
+@medir('questao2.exportar_dados', linhas_entrada=tamanho)
+def exportar_dados(df, nome_arquivo=ARQUIVO_USUARIOS, nome_excel=None):
     """
-    Exporta o DataFrame para um arquivo Excel.
+    Exporta o DataFrame para Parquet (consoles e jogos_preferidos como listas de verdade)
+    e, opcionalmente, para Excel.
 
     Args:
     - df (pandas DataFrame): DataFrame a ser exportado.
-    - nome_arquivo (str): Nome do arquivo de saída.
+    - nome_arquivo (str): Nome do arquivo Parquet de saída (lido pela questão 3).
+    - nome_excel (str): Nome do arquivo Excel de saída; None = não gera o Excel.
 
+    Returns:
+    - bool: True se os arquivos foram exportados.
     """
     try:
-        df.to_excel(nome_arquivo, index=False, engine='openpyxl')
+        if not exportar_usuarios(df, nome_arquivo):
+            return False
         print(f'>>SUCESSO: DADOS EXPORTADOS PARA: {nome_arquivo} <<')
+        if nome_excel:
+            df.to_excel(nome_excel, index=False, engine='openpyxl')
+            print(f'>>SUCESSO: DADOS EXPORTADOS PARA: {nome_excel} <<')
+        return True
     except Exception as e:
         print(f'>>ERROR: FALHA NA EXPORTAÇÃO<< {str(e)}')    
+        instrumentacao.erro('questao2.exportar_dados', e)
+        return False
     
-def main():
+@medir('questao2.processar_em_blocos', linhas=lambda usuarios: usuarios)
+def processar_em_blocos(nome_arquivo=ARQUIVO_USUARIOS, tamanho_bloco=TAMANHO_BLOCO, arquivos=None, nome_excel=None,
+                        arquivo_ids=ARQUIVO_IDS, aceitar_dia_mes_ano=True):
+    """
+    Lê, limpa e exporta os usuários bloco a bloco, sem juntar todos os dados na memória.
+
+    Cada bloco é limpo com limpar_dados e gravado logo em seguida (um row group do Parquet
+    por bloco). Os ids vêm das chaves naturais (ids_usuarios), como em unificar_dados sem
+    deduplicação, então o arquivo final tem os mesmos ids e a mesma ordem. As colunas do
+    arquivo são as do primeiro bloco.
+
+    Args:
+    - nome_arquivo (str): Nome do arquivo Parquet de saída.
+    - tamanho_bloco (int): Número de linhas de cada bloco.
+    - arquivos (list): Arquivos de usuários, na ordem de leitura (None = os de ler_arquivos).
+    - nome_excel (str): Nome do arquivo Excel de saída; None = não gera o Excel.
+    - arquivo_ids (str): Banco SQLite com o id de cada chave natural.
+    - aceitar_dia_mes_ano (bool): Se True, também lê datas de nascimento 'DD-MM-YYYY'.
+
+    Returns:
+    - int: Número de usuários exportados.
+    """
+    exportados = 0
+    colunas = None
+
+    ids = IdsUsuarios(arquivo_ids)
+    escritor = EscritorUsuarios(nome_arquivo)
+    #write_only => as linhas vão para o arquivo conforme são adicionadas
+    planilha = Workbook(write_only=True) if nome_excel else None
+    aba = planilha.create_sheet() if planilha else None
     try:
-        #le arquivos CSV, JSON e Excel
-        df_csv, df_json, df_excel = ler_arquivos()
+        for bloco in ler_arquivos_em_blocos(tamanho_bloco, arquivos):
+            #remove a coluna 'id' se existir
+            bloco = bloco.drop(columns=['id'], errors='ignore')
+            if colunas is not None:
+                bloco = bloco.reindex(columns=colunas[1:])
+
+            bloco = limpar_dados(bloco, aceitar_dia_mes_ano)
+            if bloco.empty:
+                continue
+
+            #ids pelas chaves naturais (as repetições são contadas de um bloco para o outro)
+            bloco.insert(0, 'id', ids.atribuir(chaves_usuario(bloco)))
+            exportados += len(bloco)
+
+            if colunas is None:
+                colunas = list(bloco.columns)
+                if aba is not None:
+                    aba.append(colunas)
+
+            escritor.escrever(bloco)
+
+            #no Excel as listas são gravadas como texto, igual ao to_excel
+            if aba is not None:
+                for linha in bloco.itertuples(index=False, name=None):
+                    aba.append([str(valor) if isinstance(valor, list) else (None if pd.isna(valor) else valor) for valor in linha])
+
+        if colunas is None:
+            print(">>NENHUM DADO ENCONTRADO PARA EXPORTAÇÃO<<")
+            return 0
+
+        escritor.fechar()
+        print(f'>>SUCESSO: DADOS EXPORTADOS PARA: {nome_arquivo} <<')
+        if planilha is not None:
+            planilha.save(nome_excel)
+            print(f'>>SUCESSO: DADOS EXPORTADOS PARA: {nome_excel} <<')
+        return exportados
+    except Exception as e:
+        print(f'>>ERROR: FALHA NO PROCESSAMENTO EM BLOCOS<< {str(e)}')
+        instrumentacao.erro('questao2.processar_em_blocos', e)
+        return 0
+    finally:
+        ids.fechar()
+
+@medir('questao2.main')
+def main(em_blocos=False, tamanho_bloco=TAMANHO_BLOCO, diretorio=None, padrao=None, manifesto=None, processos=None,
+         remover_duplicatas=True, excel=False, aceitar_dia_mes_ano=True):
+    """
+    Lê os arquivos de usuários, unifica, limpa e exporta o resultado para Parquet (e Excel, se pedido).
+
+    Sem diretório, padrão ou manifesto, lê os três arquivos fixos de ler_arquivos.
+
+    Args:
+    - em_blocos (bool): Se True, processa os arquivos em blocos de tamanho fixo (memória constante).
+    - tamanho_bloco (int): Número de linhas de cada bloco no modo em blocos.
+    - diretorio (str): Pasta com os arquivos de usuários (todas as extensões conhecidas).
+    - padrao (str): Padrão glob dos arquivos de usuários.
+    - manifesto (str): Arquivo com a lista de arquivos de usuários.
+    - processos (int): Número de processos usados para ler os arquivos em paralelo.
+    - remover_duplicatas (bool): Se True, junta os registros do mesmo usuário antes de gerar os ids.
+      Não se aplica ao modo em blocos, que nunca tem todos os usuários na memória.
+    - excel (bool): Se True, também gera 'usuarios_final.xlsx'.
+    - aceitar_dia_mes_ano (bool): Se True, também lê datas de nascimento 'DD-MM-YYYY'; False descarta
+      esses usuários, como a versão original.
+
+    Returns:
+    - bool: True se os usuários foram exportados; False em caso de erro ou sem dados.
+    """
+    try:
+        nome_excel = ARQUIVO_EXCEL if excel else None
+        arquivos = None
+        if diretorio or padrao or manifesto:
+            arquivos = descobrir_arquivos(diretorio or 'Usuarios', padrao, manifesto)
+            print(f">>{len(arquivos)} ARQUIVOS ENCONTRADOS<<")
+
+        if em_blocos:
+            if remover_duplicatas:
+                print(">>AVISO: DEDUPLICAÇÃO NÃO É FEITA NO MODO EM BLOCOS<<")
+            return processar_em_blocos(ARQUIVO_USUARIOS, tamanho_bloco, arquivos, nome_excel,
+                                       aceitar_dia_mes_ano=aceitar_dia_mes_ano) > 0
+
+        if arquivos is None:
+            #le arquivos CSV, JSON e Excel
+            dataframes = ler_arquivos()
+        else:
+            #le todos os arquivos encontrados em paralelo
+            dataframes = carregar_fontes(arquivos, processos)
 
         #unifica dados dos dataframes
-        dataframe_unificado = unificar_dados(df_csv, df_json, df_excel)
+        dataframe_unificado = unificar_dados(*dataframes, remover_duplicatas=remover_duplicatas,
+                                             aceitar_dia_mes_ano=aceitar_dia_mes_ano)
 
-        #exportar dados unificados para Excel
+        #exportar dados unificados para Parquet (e Excel)
         if not dataframe_unificado.empty:
-            exportar_dados(dataframe_unificado, 'Usuarios/usuarios_final.xlsx')
-        else:
-            print(">>NENHUM DADO ENCONTRADO PARA EXPORTAÇÃO<<")
+            return exportar_dados(dataframe_unificado, ARQUIVO_USUARIOS, nome_excel)
+        print(">>NENHUM DADO ENCONTRADO PARA EXPORTAÇÃO<<")
+        return False
 
     except Exception as e:
         print(f">>ERROR<< {str(e)}")
+        instrumentacao.erro('questao2.main', e)
+        return False
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Unifica e limpa os arquivos de usuários.')
+    parser.add_argument('--em-blocos', action='store_true', help='processa os arquivos em blocos, com memória constante')
+    parser.add_argument('--tamanho-bloco', type=int, default=TAMANHO_BLOCO, help='linhas por bloco no modo em blocos')
+    parser.add_argument('--diretorio', help='lê todos os arquivos de usuários desta pasta')
+    parser.add_argument('--padrao', help="lê os arquivos que casam com este padrão glob (ex.: 'Entregas/*/*.csv')")
+    parser.add_argument('--manifesto', help='lê os arquivos listados neste arquivo (um por linha)')
+    parser.add_argument('--processos', type=int, default=None, help='processos usados para ler os arquivos em paralelo')
+    parser.add_argument('--manter-duplicatas', action='store_true', help='não junta registros repetidos do mesmo usuário')
+    parser.add_argument('--descartar-dia-mes-ano', action='store_true',
+                        help="descarta datas de nascimento 'DD-MM-YYYY', como a versão original")
+    parser.add_argument('--excel', action='store_true', help="também gera 'usuarios_final.xlsx'")
+    parser.add_argument('--metricas', action='store_true', help="grava log JSON e métricas do Prometheus em 'Metricas/'")
+    args = parser.parse_args()
+    if args.metricas:
+        instrumentacao.ativar('questao2')
+
     print('>>IMPORTANDO DADOS...ESPERE UM MINUTO...<<')
-    main()
+    main(em_blocos=args.em_blocos, tamanho_bloco=args.tamanho_bloco, diretorio=args.diretorio,
+         padrao=args.padrao, manifesto=args.manifesto, processos=args.processos,
+         remover_duplicatas=not args.manter_duplicatas, excel=args.excel,
+         aceitar_dia_mes_ano=not args.descartar_dia_mes_ano)
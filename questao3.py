@@ -1,116 +1,237 @@
-import pandas as pd
-from sqlalchemy import create_engine
-
-def ler_excel(nome_arquivo):
-    """
-    Lê um arquivo Excel e retorna um DataFrame.
-
-    Args:
-    - nome_arquivo (str): Caminho do arquivo Excel a ser lido.
-
-    Returns:
-    - dataframe (pandas DataFrame): DataFrame contendo os dados do arquivo Excel.
-      None se ocorrer algum erro durante a leitura.
-    """
-    try:
-        dataframe = pd.read_excel(nome_arquivo, engine='openpyxl')
-        return dataframe
-    except FileNotFoundError:
-        print(f"Erro: O arquivo '{nome_arquivo}' não foi encontrado.")
-        return None
-    except Exception as e:
-        print(f"Erro ao ler o arquivo '{nome_arquivo}': {str(e)}")
-        return None
-
+import argparse
+from banco_jogos import BANCO_JOGOS, atualizar_contagens, gravar_contagens, gravar_contagens_aproximadas
+from canonizacao_titulos import CanonizadorTitulos
+import instrumentacao
+from instrumentacao import medir, tamanho
+from frequencia_jogos import ContagemAproximada, FrequenciaJogos
+from matriz_jogos import ARQUIVO_MATRIZ, MatrizJogos
+from usuarios_colunar import ARQUIVO_USUARIOS, ler_usuarios, ler_usuarios_em_blocos
+
+@medir('questao3.processar_jogos', linhas_entrada=tamanho)
 def processar_jogos(dataframe):
     """
     Processa os dados do DataFrame para extrair informações sobre os jogos preferidos.
+
+    A contagem de usuários por jogo é feita de uma vez só (frequencia_jogos.contar_jogos),
+    sem percorrer o DataFrame linha a linha.
     
     Args:
-    - dataframe (pandas DataFrame): DataFrame contendo a coluna 'jogos_preferidos'.
+    - dataframe (pandas DataFrame): DataFrame contendo a coluna 'jogos_preferidos' (listas de títulos).
 
     Returns:
     - jogos_totais (set): Conjunto com todos os jogos relatados.
     - jogos_um_usuario (set): Conjunto com jogos relatados por apenas um usuário.
     - jogos_max (set): Conjunto com jogos com mais aparições.
     """
-    
-    #inicializa conjunto de todos os jogos e dicionário de frequência
-    jogos_totais = set() #set => constroi uma coleção nao ordenada de de elementos unicos
-    frequencia_jogos = {}
-
-    #itera sobre cada linha do dataframe
-    for _, row in dataframe.iterrows():
-        jogos_usuario = row['jogos_preferidos'].strip('[]').replace("'", "").split(', ')
-        jogos_set = set(jogos_usuario)
-        
-        #atualizar o conjunto de todos os jogos
-        jogos_totais.update(jogos_set)
+    frequencia = FrequenciaJogos.de_listas(dataframe['jogos_preferidos'])
+    return frequencia.todos(), frequencia.unicos(), frequencia.mais_frequentes()
 
-        #atualizar a frequência de cada jogo
-        for jogo in jogos_set:
-            if jogo in frequencia_jogos:
-                frequencia_jogos[jogo] += 1
-            else:
-                frequencia_jogos[jogo] = 1
+def processar_jogos_aproximado(blocos):
+    """
+    Conta os jogos preferidos de forma aproximada, bloco a bloco e com memória limitada.
 
-    #filtrar jogos relatados por apenas um usuário
-    jogos_um_usuario = {jogo for jogo, freq in frequencia_jogos.items() if freq == 1}
+    Só os jogos mais frequentes podem ser obtidos assim: os conjuntos de todos os jogos e dos
+    jogos de um só usuário exigiriam guardar todos os títulos.
 
-    #encontrar jogos com mais aparições
-    max_aparicoes = max(frequencia_jogos.values())
-    jogos_max = {jogo for jogo, freq in frequencia_jogos.items() if freq == max_aparicoes}
+    Args:
+    - blocos (iterável de pandas DataFrame): Blocos de usuários com a coluna 'jogos_preferidos'.
 
-    return jogos_totais, jogos_um_usuario, jogos_max
+    Returns:
+    - ContagemAproximada: Contagem com os jogos mais frequentes e as estimativas.
+    """
+    contagem = ContagemAproximada()
+    for bloco in blocos:
+        contagem.adicionar(bloco['jogos_preferidos'])
+    return contagem
 
-def exportar_para_sqlite(jogos_totais, jogos_um_usuario, jogos_max):
+@medir('questao3.exportar_para_sqlite', linhas_entrada=tamanho)
+def exportar_para_sqlite(contagens, nome_banco=BANCO_JOGOS, aproximado=False):
     """
-    Exporta conjuntos de jogos para um banco de dados SQLite.
+    Exporta a contagem de usuários por jogo para o banco de dados SQLite.
+
+    Os títulos vão para a tabela games e as contagens para game_counts, numa só transação
+    (banco_jogos.gravar_contagens). jogos_totais, jogos_um_usuario e jogos_max_aparicoes são
+    views calculadas a partir dessas tabelas.
 
     Args:
-    - jogos_totais (set): Conjunto com todos os jogos relatados.
-    - jogos_um_usuario (set): Conjunto com jogos relatados por apenas um usuário.
-    - jogos_max (set): Conjunto com jogos com mais aparições.
+    - contagens (pandas Series): Título -> número de usuários que citaram o jogo.
     - nome_banco (str): Nome do banco de dados SQLite para exportar os dados. Default é 'jogos.db'.
+    - aproximado (bool): Se True, as contagens são estimativas (modo aproximado) e vão para a tabela
+      contagens_aproximadas, que só muda jogos_max_aparicoes; as contagens exatas ficam como estão.
 
     Returns:
-    - None
+    - bool: True se as contagens foram gravadas.
     """
     try:
         print('>>SALVANDO DADOS...<<')
-        #cria o banco
-        #cria a engine do SQLAlchemy para o banco de dados SQLite
-        engine = create_engine(f'sqlite:///jogos.db')
-        
-        #criar dataframes a partir dos sets
-        dataframe_jogos_totais = pd.DataFrame(list(jogos_totais), columns=['jogo'])
-        dataframe_jogos_um_usuario = pd.DataFrame(list(jogos_um_usuario), columns=['jogo'])
-        dataframe_jogos_max_aparicoes = pd.DataFrame(list(jogos_max), columns=['jogo'])
-        
-        #exportar dataframes para SQLite, criando ou substituindo as tabelas
-        dataframe_jogos_totais.to_sql('jogos_totais', engine, index=False, if_exists='replace')
-        dataframe_jogos_um_usuario.to_sql('jogos_um_usuario', engine, index=False, if_exists='replace')
-        dataframe_jogos_max_aparicoes.to_sql('jogos_max_aparicoes', engine, index=False, if_exists='replace')
-
-        print(f'>>SUCESSO: DADOS EXPORTADOS PARA SQLITE: jogos.db <<')
+        if aproximado:
+            gravar_contagens_aproximadas(contagens, nome_banco)
+        else:
+            gravar_contagens(contagens, nome_banco)
+        print(f'>>SUCESSO: DADOS EXPORTADOS PARA SQLITE: {nome_banco} <<')
+        return True
     except Exception as e:
         print(f'>>ERROR: FALHA AO EXPORTAR PARA SQLITE<< {str(e)}')
+        instrumentacao.erro('questao3.exportar_para_sqlite', e)
+        return False
 
-def main():
+def canonizar_jogos(blocos, canonizador):
+    """
+    Troca os títulos informados pelos usuários pelos títulos dos catálogos de console,
+    para que grafias diferentes do mesmo jogo sejam contadas juntas.
+
+    Args:
+    - blocos (iterável de pandas DataFrame): DataFrames com a coluna 'jogos_preferidos'.
+    - canonizador (CanonizadorTitulos): Canonizador com o índice e o cache de títulos.
+
+    Yields:
+    - pandas DataFrame: Os mesmos DataFrames com os títulos canônicos.
+    """
+    for bloco in blocos:
+        bloco['jogos_preferidos'] = canonizador.canonizar_listas(bloco['jogos_preferidos'])
+        yield bloco
+
+@medir('questao3.main')
+def main(aproximado=False, top=None, incremental=False, canonizar=False, matriz=False, similares=None):
     """
     Função principal que executa o processamento dos dados principais.
-    Lê o arquivo Excel, processa os jogos preferidos e exporta para um banco de dados SQLite.
+    Lê os usuários gerados pela questão 2 (Parquet, ou o Excel antigo se ele não existir),
+    processa os jogos preferidos e exporta para um banco de dados SQLite.
+
+    Args:
+    - aproximado (bool): Se True, lê o Parquet em blocos e conta os jogos de forma aproximada
+      (memória limitada); só os jogos candidatos a mais frequentes são gravados, com as contagens estimadas.
+    - top (int): Se informado, mostra os 'top' jogos mais citados.
+    - incremental (bool): Se True, soma ao banco só os usuários novos, alterados ou removidos
+      desde a última execução incremental (banco_jogos.atualizar_contagens).
+    - canonizar (bool): Se True, junta as grafias diferentes do mesmo jogo usando os títulos
+      dos catálogos da questão 1 (canonizacao_titulos).
+    - matriz (bool): Se True, monta também a matriz esparsa usuário x jogo (matriz_jogos) e a salva
+      em 'jogos_matriz.npz', ao lado de jogos.db.
+    - similares (str): Se informado, mostra os jogos mais parecidos com este título ("quem gosta também gosta de"),
+      usando a matriz salva (ou a recém-montada).
+
+    Returns:
+    - bool: True se as contagens (e a matriz, se pedida) foram gravadas.
     """
     
-    #le o excel com dados do usuario
-    dataframe = ler_excel('Usuarios/usuarios_final.xlsx')
+    canonizador = CanonizadorTitulos() if canonizar else None
+
+    if aproximado:
+        blocos = ler_usuarios_em_blocos(ARQUIVO_USUARIOS, colunas=['jogos_preferidos'])
+        if canonizador:
+            blocos = canonizar_jogos(blocos, canonizador)
+        contagem = processar_jogos_aproximado(blocos)
+        _resumir_canonizacao(canonizador)
+        if top:
+            print(contagem.top_k(top).to_string())
+        return exportar_para_sqlite(contagem.top_k(contagem.capacidade), aproximado=True)
+
+    if incremental:
+        dataframe = ler_usuarios(ARQUIVO_USUARIOS, colunas=['id', 'jogos_preferidos'])
+        if dataframe is None:
+            return False
+        if canonizador:
+            dataframe = next(canonizar_jogos([dataframe], canonizador))
+            _resumir_canonizacao(canonizador)
+        try:
+            print('>>SALVANDO DADOS...<<')
+            resumo = atualizar_contagens(dataframe)
+            print(f">>INCREMENTAL<< : {resumo['novos']} novos, {resumo['alterados']} alterados, "
+                  f"{resumo['removidos']} removidos, {resumo['jogos']} jogos atualizados")
+            print(f'>>SUCESSO: DADOS EXPORTADOS PARA SQLITE: {BANCO_JOGOS} <<')
+            return True
+        except Exception as e:
+            print(f'>>ERROR: FALHA AO EXPORTAR PARA SQLITE<< {str(e)}')
+            instrumentacao.erro('questao3.atualizar_contagens', e)
+            return False
+
+    #le os dados do usuario; só a coluna de jogos é necessária (a matriz usa também id e consoles)
+    colunas = ['id', 'jogos_preferidos', 'consoles'] if matriz else ['jogos_preferidos']
+    dataframe = ler_usuarios(ARQUIVO_USUARIOS, colunas=colunas)
+    sucesso = dataframe is not None
     if dataframe is not None:
-        #processa os dados para conseguir os dados dos jogos
-        jogos_totais, jogos_um_usuario, jogos_max = processar_jogos(dataframe)
+        if canonizador:
+            dataframe = next(canonizar_jogos([dataframe], canonizador))
+            _resumir_canonizacao(canonizador)
+
+        #conta os usuários de cada jogo; os conjuntos de processar_jogos saem do banco, como views
+        with instrumentacao.span('questao3.contar_jogos'):
+            frequencia = FrequenciaJogos.de_listas(dataframe['jogos_preferidos'])
+        if top:
+            print(frequencia.top_k(top).to_string())
         
         #salva no banco
-        exportar_para_sqlite(jogos_totais, jogos_um_usuario, jogos_max)
+        sucesso = exportar_para_sqlite(frequencia.contagens)
+        if matriz:
+            sucesso = montar_matriz(dataframe) and sucesso
+
+    if similares:
+        mostrar_similares(similares, top or 10)
+    return sucesso
+
+@medir('questao3.montar_matriz', linhas_entrada=tamanho)
+def montar_matriz(dataframe, nome_arquivo=ARQUIVO_MATRIZ, nome_banco=BANCO_JOGOS):
+    """
+    Monta a matriz esparsa usuário x jogo e a salva ao lado do banco.
+
+    Args:
+    - dataframe (pandas DataFrame): Usuários com 'id', 'jogos_preferidos' e 'consoles'.
+    - nome_arquivo (str): Arquivo .npz da matriz.
+    - nome_banco (str): Banco cuja tabela games dá os ids dos jogos.
+
+    Returns:
+    - bool: True se a matriz foi salva.
+    """
+    try:
+        matriz = MatrizJogos.construir(dataframe, nome_banco)
+        matriz.salvar(nome_arquivo)
+        print(f'>>MATRIZ<< : {len(matriz.usuarios)} usuários x {len(matriz.titulos)} jogos, '
+              f'{len(matriz.indices)} preferências, salva em {nome_arquivo}')
+        return True
+    except Exception as e:
+        print(f'>>ERRO AO MONTAR A MATRIZ DE JOGOS<<: {e}')
+        instrumentacao.erro('questao3.montar_matriz', e)
+        return False
+
+def mostrar_similares(jogo, n=10, nome_arquivo=ARQUIVO_MATRIZ):
+    """
+    Mostra os jogos mais parecidos com 'jogo' e, para eles, quantos usuários de cada console os citaram.
+    """
+    try:
+        matriz = MatrizJogos.carregar(nome_arquivo)
+        parecidos = matriz.similares(jogo, n)
+    except FileNotFoundError:
+        print(f"Erro: a matriz '{nome_arquivo}' não foi encontrada; rode com --matriz antes.")
+        return
+    except KeyError as e:
+        print(f'>>ERRO<<: {e.args[0]}')
+        return
+    print(f'>>QUEM GOSTA DE {jogo} TAMBÉM GOSTA DE<<')
+    print(parecidos.to_string(index=False))
+    print(matriz.consoles_por_jogo([jogo] + parecidos['jogo'].tolist()).to_string())
+
+def _resumir_canonizacao(canonizador):
+    if canonizador is None:
+        return
+    canonizador.salvar_cache()
+    resolvidos = sum(1 for correspondencia in canonizador.mapa.values() if correspondencia)
+    print(f">>CANONIZAÇÃO<< : {canonizador.resolvidos_indice} títulos buscados no índice, "
+          f"{canonizador.resolvidos_cache} vindos do cache, {resolvidos}/{len(canonizador.mapa)} com correspondência")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Conta os jogos preferidos dos usuários e salva em jogos.db.')
+    parser.add_argument('--aproximado', action='store_true', help='contagem aproximada em blocos, com memória limitada')
+    parser.add_argument('--incremental', action='store_true', help='aplica só as mudanças desde a última execução')
+    parser.add_argument('--canonizar', action='store_true', help='junta grafias diferentes do mesmo jogo pelos catálogos de console')
+    parser.add_argument('--top', type=int, default=None, help='mostra os N jogos mais citados')
+    parser.add_argument('--matriz', action='store_true', help="monta a matriz usuário x jogo em 'jogos_matriz.npz'")
+    parser.add_argument('--similares', metavar='JOGO', default=None, help='mostra os jogos mais parecidos com JOGO (N = --top, padrão 10)')
+    parser.add_argument('--metricas', action='store_true', help="grava log JSON e métricas do Prometheus em 'Metricas/'")
+    args = parser.parse_args()
+    if args.metricas:
+        instrumentacao.ativar('questao3')
+
     print('>>PROCESSANDO DADOS...<<')
-    main()
+    main(aproximado=args.aproximado, top=args.top, incremental=args.incremental, canonizar=args.canonizar,
+         matriz=args.matriz, similares=args.similares)
@@ -1,10 +1,23 @@
-import requests
+import argparse
+import time
 import pandas as pd
-from sqlalchemy import create_engine, Column, Integer, String
+from sqlalchemy import create_engine, inspect, text, Column, Float, Integer, String
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.orm import sessionmaker, declarative_base
+from busca_mercado_livre import MAX_CONCORRENCIA, REQUISICOES_POR_SEGUNDO, TIMEOUT, URL_BUSCA, buscar_todos
+from cache_consultas import TTL_PADRAO, CacheConsultas
+from historico_precos import HistoricoPrecos
+import instrumentacao
+from instrumentacao import medir, tamanho
 
 #url base da API do Mercado Livre
-url = "https://api.mercadolibre.com/sites/MLB/search"
+url = URL_BUSCA
+
+#resultados gravados por transação
+TAMANHO_LOTE = 500
+
+#linhas das versões anteriores da tabela 'jogos' (sem o título buscado), guardadas em vez de apagadas
+TABELA_LEGADO = 'jogos_legado'
 
 Base = declarative_base()
 
@@ -13,10 +26,99 @@ class Jogo(Base):
     __tablename__ = 'jogos'
             
     id = Column(Integer, primary_key=True)
+    jogo = Column(String, unique=True)  #título buscado (de jogos.db); uma linha por jogo
     nome = Column(String)
-    preco = Column(String)
+    preco = Column(Float, index=True)
     permalink = Column(String)
 
+def migrar_tabela_jogos(engine):
+    """
+    Atualiza a tabela 'jogos' das versões anteriores (preço como texto e sem o título buscado).
+
+    Nada é apagado: sem o título buscado não dá para saber de qual jogo cada linha antiga é (a tabela
+    antiga ganhava uma linha nova por jogo a cada execução), então elas vão para a tabela TABELA_LEGADO
+    (id, nome, preco, permalink) em vez de aparecerem repetidas ao lado das novas. A tabela antiga é
+    renomeada para TABELA_LEGADO (ou, se ela já existir, as linhas são copiadas para ela) e a nova é
+    criada vazia; a próxima busca grava de novo uma linha por jogo. Linhas sem título que ficaram
+    de uma migração anterior também são movidas para TABELA_LEGADO.
+
+    Args:
+    - engine (sqlalchemy.engine.Engine): Engine do banco do Mercado Livre.
+    """
+    colunas = {coluna['name'] for coluna in inspect(engine).get_columns('jogos')} if inspect(engine).has_table('jogos') else set()
+    if not colunas:
+        return
+    if 'jogo' in colunas:
+        with engine.begin() as conexao:
+            if not conexao.execute(text('SELECT COUNT(*) FROM jogos WHERE jogo IS NULL')).scalar():
+                return
+            conexao.execute(text(f'CREATE TABLE IF NOT EXISTS {TABELA_LEGADO} '
+                                 '(id INTEGER PRIMARY KEY, nome VARCHAR, preco VARCHAR, permalink VARCHAR)'))
+            conexao.execute(text(f'INSERT INTO {TABELA_LEGADO} (nome, preco, permalink) '
+                                 'SELECT nome, preco, permalink FROM jogos WHERE jogo IS NULL ORDER BY id'))
+            antigas = conexao.execute(text('DELETE FROM jogos WHERE jogo IS NULL')).rowcount
+        print(f'>>TABELA jogos: {antigas} LINHAS ANTIGAS SEM TÍTULO MOVIDAS PARA {TABELA_LEGADO}<<')
+        return
+
+    with engine.begin() as conexao:
+        antigas = conexao.execute(text('SELECT COUNT(*) FROM jogos')).scalar()
+        if inspect(conexao).has_table(TABELA_LEGADO):
+            conexao.execute(text(f'INSERT INTO {TABELA_LEGADO} (nome, preco, permalink) '
+                                 'SELECT nome, preco, permalink FROM jogos ORDER BY id'))
+            conexao.execute(text('DROP TABLE jogos'))
+        else:
+            conexao.execute(text(f'ALTER TABLE jogos RENAME TO {TABELA_LEGADO}'))
+        Base.metadata.create_all(conexao)
+    print(f'>>TABELA jogos MIGRADA: PREÇO NUMÉRICO E TÍTULO BUSCADO ({antigas} LINHAS ANTIGAS EM {TABELA_LEGADO})<<')
+
+class GravadorResultados:
+    """
+    Acumula os resultados da busca e grava em lotes, numa transação por lote.
+
+    Cada lote é um único INSERT ... ON CONFLICT(jogo) DO UPDATE: buscar de novo o mesmo jogo
+    atualiza a linha dele em vez de criar outra.
+    """
+
+    def __init__(self, session, tamanho_lote=TAMANHO_LOTE):
+        self.session = session
+        self.tamanho_lote = tamanho_lote
+        self.pendentes = []
+        self.gravadas = 0
+        self.tempo = 0.0
+
+    def adicionar(self, jogo, nome, preco, permalink):
+        self.pendentes.append({
+            'jogo': jogo,
+            'nome': nome,
+            'preco': float(preco) if preco is not None else None,
+            'permalink': permalink
+        })
+        if len(self.pendentes) >= self.tamanho_lote:
+            self.descarregar()
+
+    @medir('questao4.gravar_lote')
+    def descarregar(self):
+        if not self.pendentes:
+            return
+        inicio = time.perf_counter()
+        comando = insert(Jogo)
+        comando = comando.on_conflict_do_update(
+            index_elements=[Jogo.jogo],
+            set_={coluna: comando.excluded[coluna] for coluna in ('nome', 'preco', 'permalink')}
+        )
+        try:
+            self.session.execute(comando, self.pendentes)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        self.tempo += time.perf_counter() - inicio
+        self.gravadas += len(self.pendentes)
+        self.pendentes = []
+
+    def linhas_por_segundo(self):
+        return self.gravadas / self.tempo if self.tempo else 0.0
+
 def criar_sessao(engine):
     """
     Cria e retorna uma sessão do SQLAlchemy a partir de uma engine.
@@ -38,7 +140,7 @@ def acessar_banco_jogos():
     """
     try:
         #cria a conexão com o banco de dados SQLite
-        engine = create_engine(f'sqlite:///jogos.db')
+        engine = create_engine('sqlite:///jogos.db')
 
         #consulta a tabela jogos_totais e cria um DataFrame
         df_jogos_totais = pd.read_sql_table('jogos_totais', con=engine)
@@ -52,31 +154,53 @@ def acessar_banco_jogos():
         #fecha a conexão com o banco de dados
         engine.dispose()
 
-def consumir_api(dataframe, session):
+@medir('questao4.consumir_api', linhas_entrada=tamanho)
+def consumir_api(dataframe, session, url=url, max_concorrencia=MAX_CONCORRENCIA, taxa=REQUISICOES_POR_SEGUNDO,
+                 timeout=TIMEOUT, tamanho_lote=TAMANHO_LOTE, cache=None, servir_vencidos=False, historico=None):
     """
     Consome a API do Mercado Livre para buscar informações de jogos e salvar no banco de dados.
 
+    As buscas são feitas ao mesmo tempo (busca_mercado_livre.buscar_todos), com limite de buscas
+    simultâneas e de requisições por segundo, timeout e novas tentativas em caso de 429/5xx.
+    Cada resultado é processado assim que fica pronto e gravado em lotes (GravadorResultados),
+    uma linha por jogo buscado. Com 'historico', todos os anúncios vindos da API entram no histórico
+    de preços (historico_precos), que só grava quando o preço de um anúncio muda.
+
     Args:
     - dataframe (pandas.DataFrame): DataFrame contendo os jogos a serem buscados na API.
     - session (sqlalchemy.orm.Session): Sessão do SQLAlchemy para interação com o banco de dados.
+    - url (str): Endereço da busca (pode apontar para o stub de benchmarks/stub_mercado_livre.py).
+    - max_concorrencia (int): Buscas simultâneas no máximo.
+    - taxa (float): Requisições por segundo no máximo.
+    - timeout (tuple): Timeout (conexão, leitura) de cada requisição.
+    - tamanho_lote (int): Resultados gravados por transação.
+    - cache (cache_consultas.CacheConsultas): Cache das buscas (None = sempre consulta a API).
+    - servir_vencidos (bool): Usa respostas vencidas do cache na hora e atualiza em segundo plano.
+    - historico (historico_precos.HistoricoPrecos): Histórico de preços (None = não registra).
 
     Returns:
-    - None
+    - bool: True se os resultados foram gravados; algumas buscas com erro não contam como falha,
+      mas todas com erro (ex.: sem rede) sim.
     """
-    for _, row in dataframe.iterrows():
-        #parâmetros da consulta à API do Mercado Livre
-        parametros = {
-            'category': 'MLB186456',  
-            'q': row['jogo']
-        }
-        
+    gravador = GravadorResultados(session, tamanho_lote)
+    falhas = []
+
+    def processar(resposta):
+        jogo_buscado = resposta['jogo']
+        if resposta['erro'] is not None:
+            print(f">>ERROR: FALHA NA SOLICITAÇÃO HTTP: '{jogo_buscado}': {resposta['erro']}<<")
+            instrumentacao.contar('questao4.buscas_com_erro')
+            falhas.append(jogo_buscado)
+            return
+        instrumentacao.contar(f"questao4.respostas_{resposta['origem']}")
+
         try:
-            #requisição à API do Mercado Livre
-            resposta = requests.get(url, params=parametros)
-            resposta.raise_for_status()
-            
             #extrai dados da resposta JSON
-            dados = resposta.json()
+            dados = resposta['dados']
+
+            #respostas do cache já foram registradas quando vieram da API
+            if historico is not None and resposta['origem'] == 'api':
+                historico.registrar(jogo_buscado, dados['results'])
             
             #verifica se há resultados na resposta
             if dados['results']:
@@ -87,30 +211,66 @@ def consumir_api(dataframe, session):
                 preco = resultado.get('price')
                 permalink = resultado.get('permalink')
                 
-                #cria novo objeto na tabela 'jogos'
-                jogo = Jogo(nome=nome, preco=str(preco), permalink=permalink)
-                
-                #adiciona o objeto à sessão e commita as alterações
-                session.add(jogo)
-                session.commit()
-                print(f'>>SUCESSO AO BUSCAR DADOS PARA O JOGO: {row['jogo']} <<')
+                #guarda o resultado; o gravador insere (ou atualiza) em lotes
+                gravador.adicionar(jogo_buscado, nome, preco, permalink)
+                origem = '' if resposta['origem'] == 'api' else f" ({resposta['origem'].upper()})"
+                print(f">>SUCESSO AO BUSCAR DADOS PARA O JOGO: {jogo_buscado}{origem} <<")
             else:
-                print(f">> NENHUM RESULTADO ENCONTRADO PARA O JOGO: {row['jogo']} <<")
+                print(f">> NENHUM RESULTADO ENCONTRADO PARA O JOGO: {jogo_buscado} <<")
         
-        except requests.exceptions.RequestException as e:
-            print(f">>ERROR: FALHA NA SOLICITAÇÃO HTTP: '{row['jogo']}': {str(e)}<<")
         except Exception as e:
-            print(f">>ERROR: FALHA AO PROCESSAR '{row['jogo']}': {str(e)}<<")
+            print(f">>ERROR: FALHA AO PROCESSAR '{jogo_buscado}': {str(e)}<<")
+            instrumentacao.erro('questao4.processar_resposta', e, falha_span=False)
+
+    buscar_todos(dataframe['jogo'], url=url, max_concorrencia=max_concorrencia, taxa=taxa, timeout=timeout,
+                 cache=cache, servir_vencidos=servir_vencidos, ao_receber=processar)
+
+    sucesso = len(falhas) < len(dataframe)
+    if not sucesso:
+        print('>>ERROR: TODAS AS BUSCAS FALHARAM<<')
+    try:
+        gravador.descarregar()
+        print(f">>GRAVAÇÃO<< : {gravador.gravadas} linhas em {gravador.tempo:.3f}s "
+              f"({gravador.linhas_por_segundo():.0f} linhas/s)")
+        if historico is not None:
+            historico.descarregar()
+            print(f">>HISTÓRICO DE PREÇOS<< : {historico.mudancas} mudanças em {historico.observados} anúncios observados")
+    except Exception as e:
+        print(f">>ERROR: FALHA AO GRAVAR RESULTADOS<< {str(e)}")
+        instrumentacao.erro('questao4.consumir_api', e)
+        sucesso = False
+    if cache is not None:
+        print(f">>CACHE<< : {cache.resumo()}")
+    return sucesso
         
-def main():
+@medir('questao4.main')
+def main(url=url, max_concorrencia=MAX_CONCORRENCIA, taxa=REQUISICOES_POR_SEGUNDO, timeout=TIMEOUT,
+         tamanho_lote=TAMANHO_LOTE, usar_cache=True, ttl=TTL_PADRAO, servir_vencidos=False):
     """
     Função principal que executa o processo de consulta à API do Mercado Livre e armazenamento no banco de dados.
+
+    Args:
+    - url (str): Endereço da busca.
+    - max_concorrencia (int): Buscas simultâneas no máximo.
+    - taxa (float): Requisições por segundo no máximo.
+    - timeout (tuple): Timeout (conexão, leitura) de cada requisição.
+    - tamanho_lote (int): Resultados gravados por transação.
+    - usar_cache (bool): Se True, reaproveita buscas recentes (cache_consultas).
+    - ttl (float): Validade de uma busca no cache, em segundos.
+    - servir_vencidos (bool): Usa buscas vencidas na hora e atualiza em segundo plano.
+
+    Returns:
+    - bool: True se as buscas foram feitas e gravadas.
     """
+    cache = None
+    historico = None
+    sucesso = False
     try:
         #cria o banco de dados do Mercado Livre
         engine_mercado_livre = create_engine('sqlite:///mercado_livre.db')
         
-        #cria as tabelas no banco de dados
+        #migra a tabela antiga, se for o caso, e cria as tabelas no banco de dados
+        migrar_tabela_jogos(engine_mercado_livre)
         Base.metadata.create_all(engine_mercado_livre)
         
         #cria a sessão do SQLAlchemy
@@ -121,14 +281,39 @@ def main():
         
         if dataframe_jogos is not None:
             #consome a API do Mercado Livre e salva no banco de dados
-            consumir_api(dataframe_jogos, session_mercado_livre)
+            cache = CacheConsultas(ttl=ttl) if usar_cache else None
+            historico = HistoricoPrecos()
+            sucesso = consumir_api(dataframe_jogos, session_mercado_livre, url, max_concorrencia, taxa, timeout, tamanho_lote,
+                         cache, servir_vencidos, historico)
         
         #fecha a sessão do SQLAlchemy
         session_mercado_livre.close()
 
     except Exception as e:
         print(f"Ocorreu um erro durante a execução do programa: {str(e)}")
+        instrumentacao.erro('questao4.main', e)
+    finally:
+        if cache is not None:
+            cache.fechar()
+        if historico is not None:
+            historico.fechar()
+    return sucesso
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Busca os jogos de jogos.db no Mercado Livre.')
+    parser.add_argument('--url', default=url, help='endereço da busca (ex.: o stub local)')
+    parser.add_argument('--concorrencia', type=int, default=MAX_CONCORRENCIA, help='buscas simultâneas')
+    parser.add_argument('--taxa', type=float, default=REQUISICOES_POR_SEGUNDO, help='requisições por segundo')
+    parser.add_argument('--timeout', type=float, default=TIMEOUT[1], help='timeout de leitura em segundos')
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='resultados gravados por transação')
+    parser.add_argument('--sem-cache', action='store_true', help='sempre consulta a API')
+    parser.add_argument('--ttl', type=float, default=TTL_PADRAO, help='validade de uma busca no cache, em segundos')
+    parser.add_argument('--servir-vencidos', action='store_true', help='usa buscas vencidas na hora e atualiza em segundo plano')
+    parser.add_argument('--metricas', action='store_true', help="grava log JSON e métricas do Prometheus em 'Metricas/'")
+    args = parser.parse_args()
+    if args.metricas:
+        instrumentacao.ativar('questao4')
+
     print('>> PROCESSANDO DADOS DO MERCADO LIVRE <<')
-    main()
+    main(url=args.url, max_concorrencia=args.concorrencia, taxa=args.taxa, timeout=(TIMEOUT[0], args.timeout),
+         tamanho_lote=args.lote, usar_cache=not args.sem_cache, ttl=args.ttl, servir_vencidos=args.servir_vencidos)
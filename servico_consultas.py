@@ -0,0 +1,361 @@
+import argparse
+import json
+import os
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+from banco_jogos import BANCO_JOGOS
+from historico_precos import BANCO_PRECOS
+
+#porta local padrão do serviço
+PORTA = 8780
+
+#conexões somente leitura abertas por banco (cada requisição usa uma e devolve)
+CONEXOES_POR_BANCO = 4
+
+#respostas guardadas no cache (as mais antigas saem primeiro)
+CAPACIDADE_CACHE = 256
+
+#paginação: itens por página quando 'limite' não é informado, e o máximo aceito
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 1000
+
+#rota -> view da questão 3 em jogos.db
+VISOES_JOGOS = {
+    'totais': 'jogos_totais',
+    'um_usuario': 'jogos_um_usuario',
+    'max_aparicoes': 'jogos_max_aparicoes'
+}
+
+#colunas da tabela 'jogos' da questão 4 e ordenações aceitas em /precos (todas seguem um índice;
+#as por preço listam só os jogos com anúncio, já que preço nulo viria antes de todos)
+COLUNAS_PRECOS = ['id', 'jogo', 'nome', 'preco', 'permalink']
+ORDENS_PRECOS = {'preco': 'preco, id', '-preco': 'preco DESC, id DESC', 'jogo': 'jogo', 'id': 'id'}
+
+class ErroConsulta(Exception):
+    """
+    Erro com o status HTTP da resposta (400 = parâmetro inválido, 404 = rota, 503 = banco indisponível).
+    """
+
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+class PoolLeitura:
+    """
+    Conexões somente leitura (mode=ro e query_only) com um banco SQLite, reaproveitadas entre requisições.
+
+    Com o banco em WAL, as leituras seguem durante as gravações do pipeline e veem o último commit;
+    o busy_timeout cobre os instantes em que o SQLite precisa de trava (checkpoint, bancos fora do WAL).
+    Cada conexão guarda os comandos já preparados (cached_statements), e as consultas usam sempre
+    o mesmo texto SQL com parâmetros, então cada comando é compilado uma vez por conexão.
+    """
+
+    def __init__(self, nome_banco, tamanho=CONEXOES_POR_BANCO, timeout=5.0):
+        self.nome_banco = nome_banco
+        self.uri = f'{Path(nome_banco).resolve().as_uri()}?mode=ro'
+        self.timeout = timeout
+        self.livres = queue.LifoQueue()
+        self.vagas = threading.BoundedSemaphore(tamanho)
+        self.trava = threading.Lock()
+        self.abertas = []
+
+    def _abrir(self):
+        conexao = sqlite3.connect(self.uri, uri=True, timeout=self.timeout, check_same_thread=False, cached_statements=128)
+        conexao.execute('PRAGMA query_only=1')
+        with self.trava:
+            self.abertas.append(conexao)
+        return conexao
+
+    @contextmanager
+    def conexao(self):
+        """
+        Empresta uma conexão (abre outra se ainda houver vaga; senão espera uma ser devolvida).
+        """
+        self.vagas.acquire()
+        try:
+            try:
+                conexao = self.livres.get_nowait()
+            except queue.Empty:
+                conexao = self._abrir()
+            try:
+                yield conexao
+            finally:
+                if conexao.in_transaction:
+                    conexao.rollback()
+                self.livres.put(conexao)
+        finally:
+            self.vagas.release()
+
+    def fechar(self):
+        with self.trava:
+            for conexao in self.abertas:
+                conexao.close()
+            self.abertas = []
+
+class CacheResultados:
+    """
+    Cache LRU de respostas prontas (JSON em bytes) e dos totais das consultas paginadas, cada item
+    marcado com a versão do banco de onde veio.
+
+    Uma resposta de versão diferente da atual é descartada na leitura: qualquer gravação no banco
+    invalida as respostas dele, sem precisar avisar o serviço.
+    """
+
+    def __init__(self, capacidade=CAPACIDADE_CACHE):
+        self.capacidade = capacidade
+        self.itens = OrderedDict()
+        self.trava = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+
+    def obter(self, chave, versao):
+        with self.trava:
+            item = self.itens.get(chave)
+            if item is None or item[0] != versao:
+                self.faltas += 1
+                return None
+            self.itens.move_to_end(chave)
+            self.acertos += 1
+            return item[1]
+
+    def guardar(self, chave, versao, valor):
+        with self.trava:
+            self.itens[chave] = (versao, valor)
+            self.itens.move_to_end(chave)
+            while len(self.itens) > self.capacidade:
+                self.itens.popitem(last=False)
+
+def versao_banco(nome_banco):
+    """
+    Versão do banco pelo mtime e tamanho do arquivo e do '-wal' (em WAL os commits vão primeiro para o '-wal';
+    o arquivo principal só muda no checkpoint).
+
+    Returns:
+    - tuple: Muda sempre que o banco recebe uma gravação; None se o banco não existe.
+    """
+    versao = []
+    for caminho in (nome_banco, f'{nome_banco}-wal'):
+        try:
+            estado = os.stat(caminho)
+            versao += [estado.st_mtime_ns, estado.st_size]
+        except FileNotFoundError:
+            if caminho == nome_banco:
+                return None
+            versao += [0, 0]
+    return tuple(versao)
+
+def _inteiro(parametros, nome, padrao, minimo=0, maximo=None):
+    valor = parametros.get(nome, padrao)
+    try:
+        valor = int(valor)
+    except (TypeError, ValueError):
+        raise ErroConsulta(400, f"parâmetro '{nome}' deve ser um número inteiro")
+    if valor < minimo or (maximo is not None and valor > maximo):
+        raise ErroConsulta(400, f"parâmetro '{nome}' fora do intervalo [{minimo}, {maximo if maximo is not None else '...'}]")
+    return valor
+
+def _numero(parametros, nome):
+    if nome not in parametros:
+        return None
+    try:
+        return float(parametros[nome])
+    except ValueError:
+        raise ErroConsulta(400, f"parâmetro '{nome}' deve ser um número")
+
+def _paginacao(parametros):
+    return _inteiro(parametros, 'limite', LIMITE_PADRAO, 1, LIMITE_MAXIMO), _inteiro(parametros, 'deslocamento', 0)
+
+def _contem(texto):
+    #LIKE com '%' e '_' do texto tratados como caracteres comuns
+    return '%' + texto.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+class ServicoConsultas:
+    """
+    Consultas somente leitura sobre os resultados das questões 3 (jogos.db) e 4 (mercado_livre.db),
+    com paginação, filtros e cache das respostas.
+
+    Rotas (GET, respostas em JSON):
+    - /jogos/totais, /jogos/um_usuario, /jogos/max_aparicoes: ?contem=&limite=&deslocamento=
+    - /precos: ?jogo=&contem=&preco_min=&preco_max=&ordem=preco|-preco|jogo|id&limite=&deslocamento=
+      (ordenado por preço, o padrão, só entram os jogos com anúncio)
+    - /saude: versões dos bancos e estatísticas do cache
+    """
+
+    def __init__(self, banco_jogos=BANCO_JOGOS, banco_precos=BANCO_PRECOS, conexoes=CONEXOES_POR_BANCO,
+                 capacidade_cache=CAPACIDADE_CACHE):
+        self.bancos = {'jogos': banco_jogos, 'precos': banco_precos}
+        self.pools = {nome: PoolLeitura(caminho, conexoes) for nome, caminho in self.bancos.items()}
+        self.cache = CacheResultados(capacidade_cache)
+
+    def responder(self, caminho, parametros):
+        """
+        Resposta de uma requisição, do cache se o banco não mudou desde que ela foi calculada.
+
+        Args:
+        - caminho (str): Rota ('/jogos/totais').
+        - parametros (dict): Parâmetros da query string (um valor por nome).
+
+        Returns:
+        - tuple: (corpo em bytes, True se veio do cache).
+
+        Raises:
+        - ErroConsulta: Rota desconhecida, parâmetro inválido ou banco indisponível.
+        """
+        caminho = caminho.rstrip('/') or '/'
+        if caminho == '/saude':
+            return self._saude(), False
+        partes = caminho.strip('/').split('/')
+        if partes[0] == 'jogos' and len(partes) == 2 and partes[1] in VISOES_JOGOS:
+            banco, consulta = 'jogos', lambda conexao, versao: self._jogos(conexao, versao, VISOES_JOGOS[partes[1]], parametros)
+        elif partes == ['precos']:
+            banco, consulta = 'precos', lambda conexao, versao: self._precos(conexao, versao, parametros)
+        else:
+            raise ErroConsulta(404, f'rota desconhecida: {caminho}')
+
+        versao = versao_banco(self.bancos[banco])
+        if versao is None:
+            raise ErroConsulta(503, f'banco não encontrado: {self.bancos[banco]}')
+        chave = (caminho, tuple(sorted(parametros.items())))
+        corpo = self.cache.obter(chave, versao)
+        if corpo is not None:
+            return corpo, True
+        try:
+            with self.pools[banco].conexao() as conexao:
+                resultado = consulta(conexao, versao)
+        except sqlite3.OperationalError as e:
+            raise ErroConsulta(503, f'banco indisponível: {e}')
+        corpo = json.dumps(resultado, ensure_ascii=False).encode('utf-8')
+        self.cache.guardar(chave, versao, corpo)
+        return corpo, False
+
+    def _pagina(self, conexao, versao, tabela, colunas, filtros, valores, ordem, parametros):
+        limite, deslocamento = _paginacao(parametros)
+        onde = f" WHERE {' AND '.join(filtros)}" if filtros else ''
+        #o total não depende da página: fica no cache à parte e serve para todas as páginas do mesmo filtro
+        chave_total = ('total', tabela, onde, tuple(valores))
+        total = self.cache.obter(chave_total, versao)
+        if total is None:
+            total = conexao.execute(f'SELECT COUNT(*) FROM {tabela}{onde}', valores).fetchone()[0]
+            self.cache.guardar(chave_total, versao, total)
+        linhas = conexao.execute(f"SELECT {', '.join(colunas)} FROM {tabela}{onde} ORDER BY {ordem} LIMIT ? OFFSET ?",
+                                 [*valores, limite, deslocamento]).fetchall()
+        return {'total': total, 'limite': limite, 'deslocamento': deslocamento,
+                'itens': [dict(zip(colunas, linha)) for linha in linhas]}
+
+    def _jogos(self, conexao, versao, visao, parametros):
+        filtros, valores = [], []
+        if parametros.get('contem'):
+            filtros.append("jogo LIKE ? ESCAPE '\\'")
+            valores.append(_contem(parametros['contem']))
+        return self._pagina(conexao, versao, visao, ['jogo'], filtros, valores, 'jogo', parametros)
+
+    def _precos(self, conexao, versao, parametros):
+        colunas = {linha[1] for linha in conexao.execute('PRAGMA table_info(jogos)')}
+        if not colunas:
+            raise ErroConsulta(503, "tabela 'jogos' não encontrada: rode a questão 4")
+        if 'jogo' not in colunas:
+            raise ErroConsulta(503, "tabela 'jogos' no formato antigo: rode a questão 4 para migrá-la")
+        ordem = parametros.get('ordem', 'preco')
+        if ordem not in ORDENS_PRECOS:
+            raise ErroConsulta(400, f"parâmetro 'ordem' deve ser um de: {', '.join(ORDENS_PRECOS)}")
+
+        filtros, valores = ['preco IS NOT NULL'] if ordem in ('preco', '-preco') else [], []
+        if parametros.get('jogo'):
+            filtros.append('jogo = ?')
+            valores.append(parametros['jogo'])
+        if parametros.get('contem'):
+            filtros.append("(jogo LIKE ? ESCAPE '\\' OR nome LIKE ? ESCAPE '\\')")
+            valores += [_contem(parametros['contem'])] * 2
+        for nome, operador in (('preco_min', '>='), ('preco_max', '<=')):
+            valor = _numero(parametros, nome)
+            if valor is not None:
+                filtros.append(f'preco {operador} ?')
+                valores.append(valor)
+        return self._pagina(conexao, versao, 'jogos', COLUNAS_PRECOS, filtros, valores, ORDENS_PRECOS[ordem], parametros)
+
+    def _saude(self):
+        cache = self.cache
+        return json.dumps({
+            'bancos': {nome: {'arquivo': caminho, 'versao': versao_banco(caminho)} for nome, caminho in self.bancos.items()},
+            'cache': {'itens': len(cache.itens), 'capacidade': cache.capacidade, 'acertos': cache.acertos, 'faltas': cache.faltas}
+        }, ensure_ascii=False).encode('utf-8')
+
+    def fechar(self):
+        for pool in self.pools.values():
+            pool.fechar()
+
+class ManipuladorConsultas(BaseHTTPRequestHandler):
+    """
+    Traduz GET em chamadas a ServicoConsultas.responder (o serviço fica em self.server.servico).
+    """
+
+    protocol_version = 'HTTP/1.1'
+    #cabeçalho e corpo saem em dois writes: sem isso o segundo espera o ACK atrasado do cliente (~40 ms)
+    disable_nagle_algorithm = True
+
+    def log_message(self, formato, *args):
+        pass
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        #um valor por parâmetro (o último, se repetido)
+        parametros = {nome: valores[-1] for nome, valores in parse_qs(url.query).items()}
+        try:
+            corpo, do_cache = self.server.servico.responder(url.path, parametros)
+            status = 200
+        except ErroConsulta as e:
+            corpo, do_cache, status = json.dumps({'erro': str(e)}, ensure_ascii=False).encode('utf-8'), False, e.status
+        except Exception as e:
+            print(f'>>ERRO NA CONSULTA {self.path}<<: {e}')
+            corpo, do_cache, status = json.dumps({'erro': 'erro interno'}).encode('utf-8'), False, 500
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.send_header('X-Cache', 'acerto' if do_cache else 'falta')
+        self.end_headers()
+        self.wfile.write(corpo)
+
+def servir(servico, porta=PORTA, endereco='127.0.0.1'):
+    """
+    Cria o servidor (sem iniciar): chame serve_forever(), ou rode numa thread nos testes.
+
+    Args:
+    - servico (ServicoConsultas): Serviço que responde as consultas.
+    - porta (int): Porta local (0 = qualquer porta livre).
+    - endereco (str): Interface de rede.
+
+    Returns:
+    - ThreadingHTTPServer: Servidor pronto.
+    """
+    servidor = ThreadingHTTPServer((endereco, porta), ManipuladorConsultas)
+    servidor.daemon_threads = True
+    servidor.servico = servico
+    return servidor
+
+def main(porta=PORTA, banco_jogos=BANCO_JOGOS, banco_precos=BANCO_PRECOS, conexoes=CONEXOES_POR_BANCO):
+    servico = ServicoConsultas(banco_jogos, banco_precos, conexoes)
+    servidor = servir(servico, porta)
+    print(f'>>SERVIÇO DE CONSULTAS EM http://127.0.0.1:{servidor.server_address[1]}/ (jogos/totais, precos, saude)<<')
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        servico.fechar()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serviço HTTP/JSON somente leitura sobre jogos.db e mercado_livre.db.')
+    parser.add_argument('--porta', type=int, default=PORTA)
+    parser.add_argument('--banco-jogos', default=BANCO_JOGOS)
+    parser.add_argument('--banco-precos', default=BANCO_PRECOS)
+    parser.add_argument('--conexoes', type=int, default=CONEXOES_POR_BANCO, help='conexões somente leitura por banco')
+    args = parser.parse_args()
+
+    main(porta=args.porta, banco_jogos=args.banco_jogos, banco_precos=args.banco_precos, conexoes=args.conexoes)
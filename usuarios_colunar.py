@@ -0,0 +1,189 @@
+import ast
+import os
+import pandas as pd
+
+#pyarrow é opcional: sem ele os usuários continuam saindo só em Excel
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+#arquivo intermediário entre a questão 2 (que grava) e a questão 3 (que lê)
+ARQUIVO_USUARIOS = 'Usuarios/usuarios_final.parquet'
+
+#saída antiga em Excel, ainda lida se o Parquet não existir
+ARQUIVO_EXCEL = 'Usuarios/usuarios_final.xlsx'
+
+#colunas com listas de valores (separados por '|' nos arquivos de origem)
+COLUNAS_LISTA = ['consoles', 'jogos_preferidos']
+
+def _verificar_pyarrow():
+    if pa is None:
+        print('>>ERRO: pyarrow NÃO INSTALADO, ARQUIVO PARQUET INDISPONÍVEL<<')
+        return False
+    return True
+
+def esquema_usuarios(colunas):
+    """
+    Monta o esquema Arrow dos usuários: id inteiro, data de nascimento como data,
+    listas como list<string> e o resto como texto.
+
+    Args:
+    - colunas (list): Colunas do DataFrame, na ordem em que serão gravadas.
+
+    Returns:
+    - pyarrow.Schema: Esquema da tabela.
+    """
+    campos = []
+    for nome in colunas:
+        if nome == 'id':
+            tipo = pa.int64()
+        elif nome == 'data_nascimento':
+            tipo = pa.date32()
+        elif nome in COLUNAS_LISTA:
+            tipo = pa.list_(pa.string())
+        else:
+            tipo = pa.string()
+        campos.append(pa.field(nome, tipo))
+    return pa.schema(campos)
+
+def montar_tabela(dataframe, esquema=None):
+    """
+    Converte o DataFrame de usuários (saída de questao2.unificar_dados) numa tabela Arrow tipada.
+
+    Args:
+    - dataframe (pandas DataFrame): Usuários limpos, com as listas já separadas.
+    - esquema (pyarrow.Schema): Esquema a usar (None = esquema_usuarios das colunas do DataFrame).
+
+    Returns:
+    - pyarrow.Table: Tabela pronta para ser gravada.
+    """
+    esquema = esquema or esquema_usuarios(list(dataframe.columns))
+    colunas = []
+    for campo in esquema:
+        serie = dataframe[campo.name]
+        if campo.name == 'data_nascimento':
+            serie = pd.to_datetime(serie, format='%Y/%m/%d', errors='coerce').dt.date
+        elif pa.types.is_list(campo.type):
+            serie = serie.map(lambda valor: valor if isinstance(valor, list) else None)
+        elif pa.types.is_string(campo.type):
+            serie = serie.astype('string')
+        colunas.append(pa.array(serie, type=campo.type, from_pandas=True))
+    return pa.Table.from_arrays(colunas, schema=esquema)
+
+def exportar_usuarios(dataframe, nome_arquivo=ARQUIVO_USUARIOS):
+    """
+    Grava os usuários em Parquet, com as listas como colunas list<string> de verdade.
+
+    Args:
+    - dataframe (pandas DataFrame): Usuários limpos.
+    - nome_arquivo (str): Caminho do arquivo Parquet.
+
+    Returns:
+    - bool: True se o arquivo foi gravado.
+    """
+    if not _verificar_pyarrow():
+        return False
+
+    #grava num temporário e renomeia, para a questão 3 nunca ler o arquivo pela metade
+    temporario = f'{nome_arquivo}.tmp'
+    pq.write_table(montar_tabela(dataframe), temporario)
+    os.replace(temporario, nome_arquivo)
+    return True
+
+class EscritorUsuarios:
+    """
+    Grava os usuários em Parquet bloco a bloco (um row group por bloco), sem juntar tudo na memória.
+
+    O esquema é definido pelo primeiro bloco; os blocos seguintes devem ter as mesmas colunas.
+    """
+
+    def __init__(self, nome_arquivo=ARQUIVO_USUARIOS):
+        self.nome_arquivo = nome_arquivo
+        self._temporario = f'{nome_arquivo}.tmp'
+        self._escritor = None
+
+    def escrever(self, bloco):
+        if self._escritor is None:
+            esquema = esquema_usuarios(list(bloco.columns))
+            self._escritor = pq.ParquetWriter(self._temporario, esquema)
+        self._escritor.write_table(montar_tabela(bloco, self._escritor.schema))
+
+    def fechar(self):
+        if self._escritor is None:
+            return
+        self._escritor.close()
+        self._escritor = None
+        os.replace(self._temporario, self.nome_arquivo)
+
+def _texto_para_lista(valor):
+    """
+    Reconstrói uma lista gravada como texto no Excel ("['GTA V', "Assassin's Creed"]").
+    """
+    if not isinstance(valor, str):
+        return valor
+    try:
+        lista = ast.literal_eval(valor)
+        return list(lista) if isinstance(lista, (list, tuple)) else [str(lista)]
+    except (ValueError, SyntaxError):
+        return [valor]
+
+def ler_usuarios_em_blocos(nome_arquivo=ARQUIVO_USUARIOS, colunas=None, tamanho_bloco=50_000):
+    """
+    Lê o Parquet de usuários em blocos de até tamanho_bloco linhas, sem carregar o arquivo inteiro.
+
+    Args:
+    - nome_arquivo (str): Caminho do arquivo Parquet.
+    - colunas (list): Colunas a serem lidas (None = todas).
+    - tamanho_bloco (int): Número máximo de linhas de cada bloco.
+
+    Yields:
+    - pandas DataFrame: Um bloco de usuários, com as listas como listas Python.
+    """
+    if not _verificar_pyarrow():
+        return
+    for lote in pq.ParquetFile(nome_arquivo).iter_batches(batch_size=tamanho_bloco, columns=colunas):
+        bloco = lote.to_pandas()
+        for coluna in COLUNAS_LISTA:
+            if coluna in bloco.columns:
+                bloco[coluna] = bloco[coluna].map(lambda valor: list(valor) if valor is not None else None)
+        yield bloco
+
+def ler_usuarios(nome_arquivo=ARQUIVO_USUARIOS, colunas=None, arquivo_excel=ARQUIVO_EXCEL):
+    """
+    Lê os usuários unificados, com as listas já como listas Python.
+
+    Lê o Parquet se ele existir e o pyarrow estiver instalado; senão, cai para o Excel antigo,
+    reconstruindo as listas com ast.literal_eval (títulos com apóstrofo ou vírgula continuam inteiros).
+
+    Args:
+    - nome_arquivo (str): Caminho do arquivo Parquet.
+    - colunas (list): Colunas a serem lidas (None = todas); no Parquet as outras nem são lidas do disco.
+    - arquivo_excel (str): Caminho do Excel usado como alternativa.
+
+    Returns:
+    - pandas DataFrame: Usuários lidos.
+    - None: Se nenhum dos arquivos puder ser lido.
+    """
+    try:
+        if pa is not None and os.path.exists(nome_arquivo):
+            tabela = pq.read_table(nome_arquivo, columns=colunas)
+            dataframe = tabela.to_pandas()
+            for coluna in COLUNAS_LISTA:
+                if coluna in dataframe.columns:
+                    dataframe[coluna] = dataframe[coluna].map(lambda valor: list(valor) if valor is not None else None)
+            return dataframe
+
+        print(f">>AVISO: '{nome_arquivo}' INDISPONÍVEL, LENDO '{arquivo_excel}'<<")
+        dataframe = pd.read_excel(arquivo_excel, engine='openpyxl', usecols=colunas)
+        for coluna in COLUNAS_LISTA:
+            if coluna in dataframe.columns:
+                dataframe[coluna] = dataframe[coluna].map(_texto_para_lista)
+        return dataframe
+    except FileNotFoundError:
+        print(f"Erro: O arquivo '{arquivo_excel}' não foi encontrado.")
+        return None
+    except Exception as e:
+        print(f"Erro ao ler os usuários: {str(e)}")
+        return None